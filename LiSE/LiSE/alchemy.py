@@ -392,6 +392,33 @@ def tables_for_meta(meta):
 		sqlite_with_rowid=True,
 	)
 
+	# Entities that have had rules handled, numbered for the bitmaps in
+	# rules_handled. Kind is the kind of rulebook, like "character_thing".
+	Table(
+		"rules_handled_entities",
+		meta,
+		Column("kind", TEXT, primary_key=True),
+		Column("idx", INT, primary_key=True),
+		Column("entity", TEXT),
+		sqlite_with_rowid=False,
+	)
+
+	# Rules handled at one tick, for those entities whose numbers are set
+	# in the bitmap. Supersedes the tables above ending in _rules_handled,
+	# which are only read.
+	Table(
+		"rules_handled",
+		meta,
+		Column("kind", TEXT),
+		Column("rulebook", TEXT),
+		Column("rule", TEXT),
+		Column("branch", TEXT, default="trunk"),
+		Column("turn", INT),
+		Column("tick", INT),
+		Column("entities", BINARY),
+		sqlite_with_rowid=True,
+	)
+
 	Table(
 		"turns_completed",
 		meta,
@@ -526,6 +553,7 @@ def queries(table):
 		"character_portal_rules_handled",
 		"node_rules_handled",
 		"portal_rules_handled",
+		"rules_handled",
 	):
 		ht = table[handledtab]
 		r["del_{}_turn".format(handledtab)] = ht.delete().where(
@@ -734,7 +734,9 @@ class ORM:
 
 	def _init_caches(self):
 		from collections import defaultdict
-		from .cache import EntitylessCache, Cache, NodesCache, EdgesCache
+		from .cache import (EntitylessCache, Cache, NodesCache, EdgesCache,
+							EdgeValCache)
+		from .window import ColumnarTurnDict, SettingsTurnDict
 		node_cls = self.node_cls
 		edge_cls = self.edge_cls
 		self._where_cached = defaultdict(list)
@@ -777,9 +779,11 @@ class ORM:
 		self._nodes_cache.name = 'nodes_cache'
 		self._edges_cache = EdgesCache(self)
 		self._edges_cache.name = 'edges_cache'
-		self._node_val_cache = Cache(self)
+		history_type = (ColumnarTurnDict
+						if self._columnar_history else SettingsTurnDict)
+		self._node_val_cache = Cache(self, history_type=history_type)
 		self._node_val_cache.name = 'node_val_cache'
-		self._edge_val_cache = Cache(self)
+		self._edge_val_cache = EdgeValCache(self, history_type=history_type)
 		self._edge_val_cache.name = 'edge_val_cache'
 		self._caches = [
 			self._graph_val_cache, self._nodes_cache, self._edges_cache,
@@ -815,7 +819,8 @@ class ORM:
 					connect_args: dict = None,
 					main_branch=None,
 					cache_arranger=False,
-					enforce_end_of_time=False):
+					enforce_end_of_time=False,
+					columnar_history=False):
 		"""Make a SQLAlchemy engine and begin a transaction
 
 		:arg dbstring: rfc1738 URL for a database connection.
@@ -823,6 +828,10 @@ class ORM:
 		:arg connect_args: Dictionary of
 		keyword arguments to be used for the database connection.
 
+		:arg columnar_history: Whether to keep the history of node and
+		edge stats in compact arrays, rather than dictionaries. Saves a lot
+		of memory in big worlds, but lookups are a little slower.
+
 		"""
 		self.world_lock = RLock()
 		connect_args = connect_args or {}
@@ -830,6 +839,7 @@ class ORM:
 		self._forward = False
 		self._no_kc = False
 		self._enforce_end_of_time = enforce_end_of_time
+		self._columnar_history = columnar_history
 		# in case this is the first startup
 		self._obranch = main_branch or 'trunk'
 		self._otick = self._oturn = 0
@@ -837,9 +847,12 @@ class ORM:
 		if hasattr(self, '_post_init_cache_hook'):
 			self._post_init_cache_hook()
 		if not hasattr(self, 'query'):
-			self.query = self.query_engine_cls(dbstring, connect_args,
-												getattr(self, 'pack', None),
-												getattr(self, 'unpack', None))
+			self.query = self.query_engine_cls(
+				dbstring,
+				connect_args,
+				getattr(self, 'pack', None),
+				getattr(self, 'unpack', None),
+				pack_many=getattr(self, 'pack_many', None))
 		if clear:
 			self.query.truncate_all()
 		self._edge_val_cache.setdb = self.query.edge_val_set
@@ -875,6 +888,8 @@ class ORM:
 		if main_branch not in self._branches:
 			self._branches[main_branch] = None, 0, 0, 0, 0
 		self._new_keyframes = []
+		self._keyframe_writer: Optional[Thread] = None
+		self._keyframe_writer_error: Optional[Exception] = None
 		self._nbtt_stuff = (self._btt, self._branch_end_plan,
 							self._turn_end_plan, self._turn_end,
 							self._plan_ticks, self._plan_ticks_uncommitted,
@@ -1347,13 +1362,18 @@ class ORM:
 		You need to do this occasionally in order to keep time travel
 		performant.
 
-		The keyframe will be saved to the database at the next call to
-		``flush``.
+		The keyframe will be packed and saved to the database in a
+		background thread. If the previous keyframe is still being saved,
+		this waits for it first.
 
 		"""
 		branch, turn, tick = self._btt()
 		if (branch, turn, tick) in self._keyframes_times:
 			return
+		self._snap_keyframe(branch, turn, tick)
+		self._write_keyframes_in_background()
+
+	def _snap_keyframe(self, branch: str, turn: int, tick: int) -> None:
 		kfd = self._keyframes_dict
 		the_kf: Optional[Tuple[str, int, int]] = None
 		if branch in kfd:
@@ -1379,6 +1399,72 @@ class ORM:
 		if the_kf[0] != branch:
 			self._alias_kf(the_kf[0], branch, turn, tick)
 
+	@world_locked
+	def prune_keyframes(self) -> None:
+		"""Delete all but the earliest keyframe in branches not loaded
+
+		Branches nobody has visited this session probably don't need quick
+		time travel, so this trades it for a smaller database. Their
+		keyframes can be snapped again if somebody does visit.
+
+		"""
+		self._join_keyframe_writer()
+		if self._new_keyframes:
+			self.query.keyframes_insert_many(self._new_keyframes)
+			self._new_keyframes = []
+		kfd = self._keyframes_dict
+		loaded = self._loaded
+		doomed = []
+		for branch, turns in kfd.items():
+			if branch in loaded:
+				continue
+			times = sorted((turn, tick) for (turn, ticks) in turns.items()
+							for tick in ticks)
+			doomed.extend((branch, turn, tick) for (turn, tick) in times[1:])
+		if not doomed:
+			return
+		self.query.keyframes_del_many(doomed)
+		doomed = set(doomed)
+		self._keyframes_times.difference_update(doomed)
+		self._keyframes_list[:] = [
+			kf for kf in self._keyframes_list if kf[1:] not in doomed
+		]
+		for branch, turn, tick in doomed:
+			ticks = kfd[branch][turn]
+			ticks.discard(tick)
+			if not ticks:
+				del kfd[branch][turn]
+
+	def _write_keyframes_in_background(self) -> None:
+		self._join_keyframe_writer()
+		if not self._new_keyframes:
+			return
+		# Snapped keyframes never get changed, so the writer can have them
+		# without copying
+		kfs = self._new_keyframes
+		self._new_keyframes = []
+		self._keyframe_writer = Thread(target=self._write_keyframes,
+										args=(kfs, ),
+										daemon=True)
+		self._keyframe_writer.start()
+
+	def _write_keyframes(self, kfs: list) -> None:
+		try:
+			self.query.keyframes_insert_many(kfs)
+		except Exception as ex:
+			self._keyframe_writer_error = ex
+
+	def _join_keyframe_writer(self) -> None:
+		"""Wait for keyframes to finish saving, and raise if they couldn't"""
+		if self._keyframe_writer is None:
+			return
+		self._keyframe_writer.join()
+		self._keyframe_writer = None
+		err = self._keyframe_writer_error
+		if err is not None:
+			self._keyframe_writer_error = None
+			raise err
+
 	def _build_loading_windows(
 			self, branch_from: str, turn_from: int, tick_from: int,
 			branch_to: str, turn_to: int,
@@ -2131,6 +2217,7 @@ class ORM:
 			self.query.plans_insert_many(self._plans_uncommitted)
 		if self._plan_ticks_uncommitted:
 			self.query.plan_ticks_insert_many(self._plan_ticks_uncommitted)
+		self._join_keyframe_writer()
 		if self._new_keyframes:
 			self.query.keyframes_insert_many(self._new_keyframes)
 			self._new_keyframes = []
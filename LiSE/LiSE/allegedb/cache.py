@@ -16,8 +16,9 @@
 """
 from typing import Tuple, Hashable, Optional
 
-from .window import WindowDict, HistoricKeyError, FuturistWindowDict, \
- TurnDict, SettingsTurnDict
+from .window import WindowDict, HistoricKeyError, TurnDict, \
+ SettingsTurnDict
+from bisect import bisect_left, bisect_right
 from collections import OrderedDict, defaultdict, deque
 from threading import RLock
 
@@ -188,12 +189,12 @@ class Cache:
 					'settings', 'presettings', 'time_entity', '_kc_lru',
 					'_store_stuff', '_remove_stuff', '_truncate_stuff',
 					'setdb', 'deldb', 'keyframe', 'name',
-					'_store_journal_stuff', '_lock')
+					'_store_journal_stuff', '_lock', 'store_listeners')
 
-	def __init__(self, db, kfkvs=None):
+	def __init__(self, db, kfkvs=None, history_type=SettingsTurnDict):
 		super().__init__()
 		self.db = db
-		self.parents = StructuredDefaultDict(3, SettingsTurnDict)
+		self.parents = StructuredDefaultDict(3, history_type)
 		"""Entity data keyed by the entities' parents.
 
 		An entity's parent is what it's contained in. When speaking of a node,
@@ -204,7 +205,7 @@ class Cache:
 		Deeper layers of this cache are keyed by branch and revision.
 
 		"""
-		self.keys = StructuredDefaultDict(2, SettingsTurnDict)
+		self.keys = StructuredDefaultDict(2, history_type)
 		"""Cache of entity data keyed by the entities themselves.
 
 		That means the whole tuple identifying the entity is the
@@ -216,7 +217,7 @@ class Cache:
 		"""
 		self.keycache = PickyDefaultDict(SettingsTurnDict)
 		"""Keys an entity has at a given turn and tick."""
-		self.branches = StructuredDefaultDict(1, SettingsTurnDict)
+		self.branches = StructuredDefaultDict(1, history_type)
 		"""A less structured alternative to ``keys``.
 
 		For when you already know the entity and the key within it,
@@ -235,6 +236,12 @@ class Cache:
 		self.time_entity = {}
 		self._kc_lru = OrderedDict()
 		self._lock = RLock()
+		self.store_listeners = []
+		"""Functions to call with the arguments to each new ``store``
+
+		Stores made while loading history from the database don't count.
+
+		"""
 		self._store_stuff = (self._lock, self.parents, self.branches,
 								self.keys, db.delete_plan, db._time_plan,
 								self._iter_future_contradictions, db._branches,
@@ -617,9 +624,7 @@ class Cache:
 				the_turn.truncate(tick)
 				the_turn[tick] = value
 			else:
-				new = FuturistWindowDict()
-				new[tick] = value
-				turns[turn] = new
+				turns.store_at(turn, tick, value)
 			self_time_entity[branch, turn, tick] = parent, entity, key
 			where_cached = db_where_cached[args[-4:-1]]
 			if self not in where_cached:
@@ -635,6 +640,9 @@ class Cache:
 					del keycache[keycache_key]
 			if not db._no_kc:
 				update_keycache(*args, forward=forward)
+		if not loading:
+			for listener in self.store_listeners:
+				listener(args)
 
 	def remove_character(self, character):
 		(lock, time_entity, parents, branches, keys, settings, presettings,
@@ -823,20 +831,20 @@ class Cache:
 
 		with lock:
 			for entities in parents.values():
-				for keys in entities.values():
-					for branches in keys.values():
-						if branch not in branches:
+				for entkeys in entities.values():
+					for entbranches in entkeys.values():
+						if branch not in entbranches:
 							continue
-						truncate_branhc(branches[branch])
-			for branches in branches.values():
-				if branch not in branches:
+						truncate_branhc(entbranches[branch])
+			for entbranches in branches.values():
+				if branch not in entbranches:
 					continue
-				truncate_branhc(branches[branch])
-			for keys in keys.values():
-				for branches in keys.values():
-					if branch not in branches:
+				truncate_branhc(entbranches[branch])
+			for entkeys in keys.values():
+				for entbranches in entkeys.values():
+					if branch not in entbranches:
 						continue
-					truncate_branhc(branches[branch])
+					truncate_branhc(entbranches[branch])
 			truncate_branhc(settings[branch])
 			truncate_branhc(presettings[branch])
 			self.shallowest = OrderedDict()
@@ -1122,6 +1130,68 @@ class Cache:
 	contains_entity = contains_key = contains_entity_key = contains_entity_or_key
 
 
+class ChangeTimesMixin:
+	"""Remember when things changed, to tell whether they could have
+
+	Subclasses call ``_mark_change`` when they store something, under
+	whatever key they like. Then ``last_change`` tells you the time of
+	the latest change under that key as of a given time. If that's the
+	same at two times, nothing changed between them.
+
+	That only covers what gets stored. Anything that adds or takes away
+	data some other way, such as loading or truncation, increments
+	``epoch`` instead.
+
+	"""
+	__slots__ = ()
+
+	def _mark_change(self, key: Hashable, branch: str, turn: int, tick: int):
+		times = self.changes[key].setdefault(branch, [])
+		i = bisect_left(times, (turn, tick))
+		if i == len(times) or times[i] != (turn, tick):
+			times.insert(i, (turn, tick))
+
+	def last_change(self, key: Hashable, branch: str, turn: int,
+					tick: int) -> Optional[Tuple[str, int, int]]:
+		"""Return the time of the latest change to ``key``, as of the given
+		time, or ``None`` if there's been none
+
+		"""
+		if key not in self.changes:
+			return
+		branches = self.changes[key]
+		for b, r, t in self.db._iter_parent_btt(branch, turn, tick):
+			times = branches.get(b)
+			if times:
+				i = bisect_right(times, (r, t))
+				if i:
+					return (b, *times[i - 1])
+
+	def load(self, data):
+		self.epoch += 1
+		super().load(data)
+
+	def set_keyframe(self, *args):
+		self.epoch += 1
+		super().set_keyframe(*args)
+
+	def remove(self, branch: str, turn: int, tick: int):
+		self.epoch += 1
+		super().remove(branch, turn, tick)
+
+	def remove_branch(self, branch: str):
+		self.epoch += 1
+		super().remove_branch(branch)
+
+	def remove_character(self, character):
+		self.epoch += 1
+		super().remove_character(character)
+
+	def truncate(self, branch: str, turn: int, tick: int, direction='forward'):
+		self.epoch += 1
+		super().truncate(branch, turn, tick, direction)
+
+
 class NodesCache(Cache):
 	"""A cache for remembering whether nodes exist at a given time."""
 	__slots__ = ()
@@ -1179,11 +1249,12 @@ class NodesCache(Cache):
 			branch, turn, tick, entity, key)
 
 
-class EdgesCache(Cache):
+class EdgesCache(ChangeTimesMixin, Cache):
 	"""A cache for remembering whether edges exist at a given time."""
 	__slots__ = ('destcache', 'origcache', 'predecessors', '_origcache_lru',
 					'_destcache_lru', '_get_destcache_stuff',
-					'_get_origcache_stuff', '_additional_store_stuff')
+					'_get_origcache_stuff', '_additional_store_stuff',
+					'_kf_index', 'changes', 'epoch')
 
 	@property
 	def successors(self):
@@ -1208,6 +1279,10 @@ class EdgesCache(Cache):
 		self.predecessors = StructuredDefaultDict(3, TurnDict)
 		self._origcache_lru = OrderedDict()
 		self._destcache_lru = OrderedDict()
+		self._kf_index = None
+		self.changes = PickyDefaultDict(dict)
+		"""Times that edges were stored, by graph and branch"""
+		self.epoch = 0
 		self._get_destcache_stuff: Tuple[PickyDefaultDict, OrderedDict,
 											callable, StructuredDefaultDict,
 											callable] = (
@@ -1280,6 +1355,24 @@ class EdgesCache(Cache):
 								(graph, node, dest, idx, branch, turn, tick)):
 								yield trn, tck
 
+	def _keyframe_index(self) -> Tuple[dict, dict]:
+		"""Return the keyframed edges, indexed by origin and by destination
+
+		Each index maps ``(graph, node)`` to a list of pairs of the other
+		node and the edge's keyframes. Keyframes are never taken out of
+		the cache, so this only needs rebuilding when there are more.
+
+		"""
+		kf = self.keyframe
+		if self._kf_index is None or self._kf_index[0] != len(kf):
+			by_orig = defaultdict(list)
+			by_dest = defaultdict(list)
+			for (graph, orig, dest), kfg in kf.items():
+				by_orig[graph, orig].append((dest, kfg))
+				by_dest[graph, dest].append((orig, kfg))
+			self._kf_index = (len(kf), by_orig, by_dest)
+		return self._kf_index[1:]
+
 	def _adds_dels_successors(self,
 								parentity: tuple,
 								branch: str,
@@ -1305,14 +1398,9 @@ class EdgesCache(Cache):
 					deleted.add(dest)
 		if stoptime:
 			return added, deleted
-		kf = self.keyframe
 		itparbtt = self.db._iter_parent_btt
-		its = list(kf.items())
-		for ks, v in its:
-			assert len(ks) == 3, "Bad key in keyframe: " + repr(ks)
-		for (grap, org, dest), kfg in its:  # too much iteration!
-			if (grap, org) != (graph, orig):
-				continue
+		by_orig, _ = self._keyframe_index()
+		for dest, kfg in by_orig.get((graph, orig), ()):
 			for branc, trn, tck in itparbtt(branch, turn, tick):
 				if branc not in kfg:
 					continue
@@ -1326,8 +1414,6 @@ class EdgesCache(Cache):
 				if kfgb.rev_gettable(trn):
 					if kfgb[trn].final()[0] and dest not in deleted:
 						added.add(dest)
-		for ks in kf.keys():
-			assert len(ks) == 3, "BBadd key in keyframe: " + repr(ks)
 		return added, deleted
 
 	def _adds_dels_predecessors(self,
@@ -1356,11 +1442,9 @@ class EdgesCache(Cache):
 		else:
 			if stoptime:
 				return added, deleted
-			kf = self.keyframe
 			itparbtt = self.db._iter_parent_btt
-			for (grap, orig, dst), kfg in kf.items():  # too much iteration!
-				if (grap, dst) != (graph, dest):
-					continue
+			_, by_dest = self._keyframe_index()
+			for orig, kfg in by_dest.get((graph, dest), ()):
 				for branc, trn, tck in itparbtt(branch, turn, tick):
 					if branc not in kfg:
 						continue
@@ -1582,6 +1666,7 @@ class EdgesCache(Cache):
 					contra=contra)
 		predecessors[graph, dest][orig][idx][branch][turn] = successors[
 			graph, orig][dest][idx][branch][turn]
+		self._mark_change(graph, branch, turn, tick)
 
 	# if ex:
 	#	 assert self.retrieve(graph, orig, dest, idx, branch, turn, tick)
@@ -1597,6 +1682,22 @@ class EdgesCache(Cache):
 	#	 graph, dest, orig, branch, turn, tick)
 
 
+class EdgeValCache(ChangeTimesMixin, Cache):
+	"""A cache for the stats of edges, remembering when each stat changed"""
+	__slots__ = ('changes', 'epoch')
+
+	def __init__(self, db, kfkvs=None, history_type=SettingsTurnDict):
+		super().__init__(db, kfkvs, history_type)
+		self.changes = PickyDefaultDict(dict)
+		"""Times that edge stats were stored, by graph, key, and branch"""
+		self.epoch = 0
+
+	def store(self, *args, **kwargs):
+		super().store(*args, **kwargs)
+		graph, orig, dest, idx, key, branch, turn, tick, value = args
+		self._mark_change((graph, key), branch, turn, tick)
+
+
 class EntitylessCache(Cache):
 	__slots__ = ()
 
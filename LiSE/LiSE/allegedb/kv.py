@@ -0,0 +1,497 @@
+# This file is part of allegedb, an object relational mapper for graphs.
+# Copyright (c) Zachary Spector. public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Storage backends that keep the tables in an ordered key-value store
+
+Connect to ``memory://`` to keep everything in a dictionary that goes
+away when you close the database, or to ``lmdb:///some/path`` to use
+an LMDB environment there (requires the ``lmdb`` package).
+
+These answer the same named queries that the SQL backend does, using
+the table definitions in :mod:`allegedb.alchemy` to decide how to lay
+out the keys. Each row's key is the table name followed by its primary
+key, packed with msgpack one value at a time. Tables with ``branch``,
+``turn``, and ``tick`` in their primary key put those right after the
+first column, so that loading a window of time for one graph is a
+single range scan. That relies on turns and ticks never being negative,
+since msgpack only sorts non-negative integers in order.
+
+Arbitrary ``SELECT`` statements aren't supported. Historical queries
+like :meth:`LiSE.Engine.turns_when` go through ``stat_windows`` instead,
+which works out in Python what the SQL backend would select.
+
+"""
+from bisect import bisect_left
+from contextlib import nullcontext
+from operator import itemgetter
+
+from msgpack import packb, unpackb
+from sqlalchemy import MetaData
+from sqlalchemy.exc import IntegrityError
+
+TIME_COLUMNS = ('branch', 'turn', 'tick')
+
+
+class Result(list):
+	"""Rows returned by a query, quacking enough like SQLAlchemy's"""
+	returns_rows = True
+
+	def fetchone(self):
+		return self[0] if self else None
+
+	def fetchall(self):
+		return list(self)
+
+
+class NoRows(Result):
+	returns_rows = False
+
+
+class MemoryStore:
+	"""Ordered key-value store that lives in a dictionary
+
+	The keys are only sorted when someone scans them, so writing a lot
+	at once is cheap.
+
+	"""
+
+	def __init__(self, path=None):
+		self._data = {}
+		self._keys = []
+
+	def __contains__(self, k):
+		return k in self._data
+
+	def __getitem__(self, k):
+		return self._data[k]
+
+	def __setitem__(self, k, v):
+		if k not in self._data and self._keys is not None:
+			if not self._keys or self._keys[-1] < k:
+				self._keys.append(k)
+			else:
+				self._keys = None
+		self._data[k] = v
+
+	def __delitem__(self, k):
+		del self._data[k]
+		self._keys = None
+
+	def scan(self, prefix, start=b''):
+		"""Iterate over ``(key, value)`` pairs whose key starts with ``prefix``
+
+		In order of their keys, starting at ``start`` if that's later.
+
+		"""
+		if self._keys is None:
+			self._keys = sorted(self._data)
+		keys = self._keys
+		data = self._data
+		i = bisect_left(keys, max((prefix, start)))
+		while i < len(keys) and keys[i].startswith(prefix):
+			yield keys[i], data[keys[i]]
+			i += 1
+
+	def commit(self):
+		pass
+
+	def close(self):
+		self._data = {}
+		self._keys = []
+
+
+class LMDBStore:
+	"""Ordered key-value store in an LMDB environment on disk"""
+
+	def __init__(self, path, map_size=2**40):
+		import lmdb
+
+		self._env = lmdb.open(path, map_size=map_size)
+		self._txn = self._env.begin(write=True)
+
+	def __contains__(self, k):
+		return self._txn.get(k) is not None
+
+	def __getitem__(self, k):
+		ret = self._txn.get(k)
+		if ret is None:
+			raise KeyError(k)
+		return ret
+
+	def __setitem__(self, k, v):
+		self._txn.put(k, v)
+
+	def __delitem__(self, k):
+		if not self._txn.delete(k):
+			raise KeyError(k)
+
+	def scan(self, prefix, start=b''):
+		"""Iterate over ``(key, value)`` pairs whose key starts with ``prefix``
+
+		In order of their keys, starting at ``start`` if that's later.
+
+		"""
+		cursor = self._txn.cursor()
+		if not cursor.set_range(max((prefix, start))):
+			return
+		for k, v in cursor:
+			if not k.startswith(prefix):
+				return
+			yield k, v
+
+	def commit(self):
+		self._txn.commit()
+		self._txn = self._env.begin(write=True)
+
+	def close(self):
+		self._txn.abort()
+		self._env.close()
+
+
+class TableLayout:
+	"""How the rows of one table are arranged in the key-value store
+
+	Rows are tuples in the same order as the table's columns.
+
+	"""
+	__slots__ = ('name', 'columns', 'index', 'pk', 'key', 'value', 'prefix',
+					'timed', 'unique', 'order', '_header', '_key_of',
+					'_value_of', '_arrange')
+
+	def __init__(self, table):
+		self.name = table.name
+		self.columns = columns = tuple(table.c.keys())
+		self.index = {col: i for (i, col) in enumerate(columns)}
+		pk = tuple(c.name for c in table.primary_key)
+		self.unique = bool(pk)
+		self.pk = pk = pk or columns
+		self.timed = all(col in pk for col in TIME_COLUMNS)
+		if self.timed:
+			rest = tuple(col for col in pk if col not in TIME_COLUMNS)
+			self.key = rest[:1] + TIME_COLUMNS + rest[1:]
+			self.order = TIME_COLUMNS
+		else:
+			self.key = self.order = pk
+		self.value = tuple(col for col in columns if col not in self.key)
+		self.prefix = packb(self.name)
+		# the key is a run of msgpack values, so prefixing it with the
+		# header of an array that long lets msgpack read it in one go
+		self._header = bytes([0x90 | len(self.key)])
+		self._key_of = self.getter(self.key)
+		self._value_of = self.getter(self.value)
+		stored = self.key + self.value
+		self._arrange = self.getter(columns,
+									[stored.index(col) for col in columns])
+
+	def getter(self, cols, idxs=None):
+		"""Return a function to get a tuple of these columns from a row"""
+		if idxs is None:
+			idxs = [self.index[col] for col in cols]
+		if not idxs:
+			return lambda row: ()
+		if len(idxs) == 1:
+			i = idxs[0]
+			return lambda row: (row[i], )
+		return itemgetter(*idxs)
+
+	def pack_key(self, values):
+		return self.prefix + b''.join(map(packb, values))
+
+	def key_of(self, row):
+		return self.pack_key(self._key_of(row))
+
+	def value_of(self, row):
+		return packb(self._value_of(row))
+
+	def unpack(self, k, v):
+		"""Turn a stored key and value back into a row"""
+		return self._arrange(
+			unpackb(self._header + k[len(self.prefix):], use_list=False) +
+			unpackb(v, use_list=False))
+
+
+class KeyValueHolder:
+	"""Mixin for a ConnectionHolder that uses an ordered key-value store
+
+	Queries that can't be worked out from the name of the query alone
+	are described in the class attributes. ``selects`` map query names to
+	the table, the columns to return, and the columns to match against
+	the arguments; ``updates`` to the table and the columns to set, after
+	which come the arguments for the primary key; ``deletes`` to the
+	table and the columns to match; ``counts`` likewise.
+
+	"""
+	stores = {'memory://': MemoryStore, 'lmdb://': LMDBStore}
+	selects = {
+		'global_get': ('global', ('value', ), ('key', )),
+		'graph_type': ('graphs', ('type', ), ('graph', )),
+		'graphs_types': ('graphs', ('graph', 'type'), ()),
+		'keyframes_list':
+		('keyframes', ('graph', 'branch', 'turn', 'tick'), ()),
+		'get_keyframe': ('keyframes', ('nodes', 'edges', 'graph_val'),
+							('graph', 'branch', 'turn', 'tick')),
+	}
+	updates = {
+		'global_update': ('global', ('value', )),
+		'update_branches': ('branches', ('parent', 'parent_turn',
+											'parent_tick', 'end_turn',
+											'end_tick')),
+		'update_turns': ('turns', ('end_tick', 'plan_end_tick')),
+	}
+	deletes = {
+		'global_delete': ('global', ('key', )),
+		'del_edges_graph': ('edges', ('graph', )),
+	}
+	counts = {'graphs_named': ('graphs', ('graph', ))}
+
+	def connect(self):
+		for scheme, store_cls in self.stores.items():
+			if self._dbstring.startswith(scheme):
+				self.store = store_cls(self._dbstring[len(scheme):])
+				break
+		else:
+			raise ValueError(f"Not a key-value store: {self._dbstring}")
+		self.meta = MetaData()
+		self.sql = self.gather_sql(self.meta)
+		self.layouts = {
+			name: TableLayout(table)
+			for (name, table) in self.meta.tables.items()
+		}
+		self._queries = {}
+
+	def commit(self):
+		self.store.commit()
+
+	def disconnect(self):
+		self.store.close()
+
+	def select(self, stmt):
+		"""Refuse a ``SELECT`` statement, which needs an SQL database
+
+		Historical queries get their rows from ``stat_windows`` instead.
+
+		"""
+		raise NotImplementedError(
+			"Arbitrary queries only work on SQL databases")
+
+	def call_one(self, k, *largs):
+		return self.query(k)(largs)
+
+	def call_many(self, k, largs):
+		if k.endswith('_insert') and k[:-len('_insert')] in self.layouts:
+			return self._insert_many(self.layouts[k[:-len('_insert')]],
+										largs)
+		q = self.query(k)
+		for args in largs:
+			q(args)
+		return NoRows()
+
+	def _savepoint(self):
+		# inserts check every row before they write any, and the other
+		# queries come out the same if they're run again
+		return nullcontext()
+
+	def query(self, k):
+		"""Get a function that takes a tuple of arguments to the query ``k``"""
+		try:
+			return self._queries[k]
+		except KeyError:
+			ret = self._queries[k] = self._make_query(k)
+			return ret
+
+	def _make_query(self, k):
+		layouts = self.layouts
+		if k in self.selects:
+			tab, cols, where = self.selects[k]
+			return lambda args: self._select(layouts[tab], cols, where, args)
+		if k in self.updates:
+			tab, cols = self.updates[k]
+			return lambda args: self._update(layouts[tab], cols, args)
+		if k in self.deletes:
+			tab, where = self.deletes[k]
+			return lambda args: self._delete(layouts[tab], where, args)
+		if k in self.counts:
+			tab, where = self.counts[k]
+			return lambda args: Result([
+				(len(self._select(layouts[tab], (), where, args)), )
+			])
+		if k == 'stat_windows':
+			return lambda args: self._windows(*args)
+		if k.startswith('create_'):
+			return lambda args: NoRows()
+		if k.startswith('truncate_'):
+			layout = layouts[k[len('truncate_'):]]
+			return lambda args: self._delete(layout, (), ())
+		if k.startswith('load_'):
+			layout = layouts[k[len('load_'):].rsplit('_tick_to_', 1)[0]]
+			return lambda args: self._load(layout, *args)
+		if k.startswith('del_') and k.endswith('_after'):
+			layout = layouts[k[len('del_'):-len('_after')]]
+			return lambda args: self._del_after(layout, args)
+		if k.startswith('del_') and k.endswith('_turn'):
+			layout = layouts[k[len('del_'):-len('_turn')]]
+			return lambda args: self._delete(layout, ('branch', 'turn'), args)
+		for suffix in ('_insert', '_dump', '_count', '_del_time', '_del'):
+			if k.endswith(suffix) and k[:-len(suffix)] in layouts:
+				layout = layouts[k[:-len(suffix)]]
+				break
+		else:
+			raise KeyError(f"No such query: {k}")
+		if suffix == '_insert':
+			return lambda args: self._insert_many(layout, (args, ))
+		elif suffix == '_dump':
+			return lambda args: self._dump(layout)
+		elif suffix == '_count':
+			return lambda args: Result([(len(self._select(layout, (), (), ())),
+										)])
+		elif suffix == '_del_time':
+			return lambda args: self._delete(layout, TIME_COLUMNS, args)
+		return lambda args: self._delete(layout, layout.pk, args)
+
+	def _rows(self, layout, where=(), args=()):
+		"""Iterate over rows of the table where the columns match the args
+
+		If the columns are the first part of the key, only look at those
+		rows; otherwise look at every row in the table.
+
+		"""
+		match = dict(zip(where, args))
+		prefix = []
+		for col in layout.key:
+			if col not in match:
+				break
+			prefix.append(match.pop(col))
+		index = layout.index
+		match = [(index[col], val) for (col, val) in match.items()]
+		unpack = layout.unpack
+		for k, v in self.store.scan(layout.pack_key(prefix)):
+			row = unpack(k, v)
+			if all(row[i] == val for (i, val) in match):
+				yield k, row
+
+	def _select(self, layout, cols, where, args):
+		get = layout.getter(cols)
+		return Result(get(row) for (_, row) in self._rows(layout, where, args))
+
+	def _dump(self, layout):
+		rows = [row for (_, row) in self._rows(layout)]
+		rows.sort(key=layout.getter(layout.order))
+		return Result(rows)
+
+	def _insert_many(self, layout, largs):
+		store = self.store
+		todo = {}
+		for row in largs:
+			k = layout.key_of(row)
+			if layout.unique and (k in todo or k in store):
+				raise IntegrityError(f'{layout.name}_insert', row,
+										KeyError(k))
+			todo[k] = layout.value_of(row)
+		for k, v in todo.items():
+			store[k] = v
+		return NoRows()
+
+	def _update(self, layout, cols, args):
+		new = [(layout.index[col], val) for (col, val) in zip(cols, args)]
+		for k, row in list(self._rows(layout, layout.pk, args[len(cols):])):
+			row = list(row)
+			for i, val in new:
+				row[i] = val
+			self.store[k] = layout.value_of(row)
+		return NoRows()
+
+	def _delete(self, layout, where, args):
+		store = self.store
+		for k in [k for (k, _) in self._rows(layout, where, args)]:
+			del store[k]
+		return NoRows()
+
+	def _del_after(self, layout, args):
+		# the arguments are the key, except that turn is there twice
+		*entity, branch, turn, _, tick = args
+		where = tuple(col for col in layout.pk if col not in TIME_COLUMNS)
+		turn_idx = layout.index['turn']
+		tick_idx = layout.index['tick']
+		store = self.store
+		for k, row in list(
+			self._rows(layout, where + ('branch', ), (*entity, branch))):
+			if (row[turn_idx], row[tick_idx]) >= (turn, tick):
+				del store[k]
+		return NoRows()
+
+	def _windows(self, table, val_col, where, args, branches, mid_turn):
+		"""Return the windows of time when a stat had each of its values
+
+		Rows are ``(turn_from, tick_from, turn_to, tick_to, value)``, where
+		the ``_to`` columns are the time of the next value, or ``None``
+		for the last. Unless ``mid_turn``, only the last value in each
+		turn counts. This is what the SQL backend gets from the selects
+		in :mod:`LiSE.query`, with its ``lead`` window function.
+
+		"""
+		layout = self.layouts[table]
+		get = layout.getter(('branch', 'turn', 'tick', val_col))
+		branches = set(branches)
+		rows = [
+			get(row) for (_, row) in self._rows(layout, where, args)
+			if row[layout.index['branch']] in branches
+		]
+		if not mid_turn:
+			last = {}
+			for row in rows:
+				branch, turn, tick, _ = row
+				prev = last.get((branch, turn))
+				if prev is None or prev[2] < tick:
+					last[branch, turn] = row
+			rows = list(last.values())
+		rows.sort(key=itemgetter(1, 2))
+		ret = Result()
+		for i, (_, turn, tick, value) in enumerate(rows, 1):
+			if i < len(rows):
+				_, turn_to, tick_to, _ = rows[i]
+			else:
+				turn_to = tick_to = None
+			ret.append((turn, tick, turn_to, tick_to, value))
+		return ret
+
+	def _load(self,
+				layout,
+				graph,
+				branch,
+				turn_from,
+				_,
+				tick_from,
+				turn_to=None,
+				__=None,
+				tick_to=None):
+		get = layout.getter([
+			col for col in layout.columns
+			if col not in (layout.key[0], 'branch')
+		])
+		turn_idx = layout.index['turn']
+		tick_idx = layout.index['tick']
+		time_from = (turn_from, tick_from)
+		time_to = (turn_to, tick_to)
+		unpack = layout.unpack
+		prefix = layout.pack_key((graph, branch))
+		ret = Result()
+		for k, v in self.store.scan(prefix, prefix + packb(turn_from)):
+			row = unpack(k, v)
+			time = (row[turn_idx], row[tick_idx])
+			if time < time_from:
+				continue
+			if turn_to is not None and time > time_to:
+				break
+			ret.append(get(row))
+		return ret
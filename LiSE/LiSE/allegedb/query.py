@@ -22,15 +22,16 @@ from time import monotonic
 from typing import Tuple, Any, Iterator, Hashable
 from queue import Queue
 import os
-from collections.abc import MutableMapping
+from collections.abc import Mapping, MutableMapping
 
 from sqlalchemy.sql import Select
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.exc import ArgumentError, IntegrityError, OperationalError
 from sqlalchemy.pool import NullPool
 
 from . import wrap
+from .kv import KeyValueHolder
 from .wrap import DictWrapper, SetWrapper, ListWrapper
 
 wrappath = os.path.dirname(wrap.__file__)
@@ -87,8 +88,84 @@ class GlobalKeyValueStore(MutableMapping):
 		self.qe.global_del(k)
 
 
+class PackedStats(Mapping):
+	"""Stats from a keyframe, not unpacked until someone looks inside
+
+	Keyframes store each node's and edge's stats packed separately, so
+	loading a keyframe only has to unpack the names. Some keys may be
+	kept unpacked in ``eager``, so that they can be read without
+	unpacking the rest.
+
+	"""
+	__slots__ = ('_packed', '_unpack', '_eager', '_data')
+
+	def __init__(self, packed, unpack, eager=None):
+		self._packed = packed
+		self._unpack = unpack
+		self._eager = eager or {}
+		self._data = None
+
+	def _unpacked(self):
+		# Triggers may be checked on several threads at once. ``_data``
+		# is published before ``_packed`` is let go, so if I find no
+		# packed stats, someone else has finished unpacking them.
+		data = self._data
+		if data is None:
+			packed = self._packed
+			if packed is None:
+				return self._data
+			data = self._data = self._unpack(packed)
+			self._packed = None
+		return data
+
+	def __getitem__(self, k):
+		if self._data is None and k in self._eager:
+			return self._eager[k]
+		return self._unpacked()[k]
+
+	def __contains__(self, k):
+		if self._data is None and k in self._eager:
+			return True
+		return k in self._unpacked()
+
+	def __iter__(self):
+		return iter(self._unpacked())
+
+	def __len__(self):
+		return len(self._unpacked())
+
+	def __repr__(self):
+		if self._data is None:
+			return f'<PackedStats {self._eager}...>'
+		return f'<PackedStats {self._data}>'
+
+	def copy(self):
+		return dict(self._unpacked())
+
+
 class ConnectionHolder:
 	strings: dict
+	sqlite_pragmas = {
+		'journal_mode': 'wal',
+		'synchronous': 'normal',
+		'temp_store': 'memory',
+		'cache_size': -65536
+	}
+	"""Pragmas to set on every new SQLite connection
+
+	Write-ahead logging lets readers carry on while we write, and with
+	it, ``synchronous=normal`` is still safe against corruption.
+
+	"""
+	sqlite_functions = {}
+	"""Python functions to make callable from SQL on SQLite connections
+
+	As ``name: (number_of_arguments, function)``. They're only there if
+	``has_sqlite_functions`` is true after connecting, which it isn't
+	when you pass in a SQLAlchemy engine of your own.
+
+	"""
+	has_sqlite_functions = False
 
 	def __init__(self,
 					dbstring,
@@ -107,9 +184,21 @@ class ConnectionHolder:
 		self.inq = inq
 		self.outq = outq
 		self.tables = tables
+		self._compiled = {}
 		if gather is not None:
 			self.gather = gather
 
+	def _setup_sqlite(self, dbapi_connection, connection_record):
+		cursor = dbapi_connection.cursor()
+		for k, v in self.sqlite_pragmas.items():
+			cursor.execute(f'PRAGMA {k}={v}')
+		cursor.close()
+		for name, (nargs, fun) in self.sqlite_functions.items():
+			dbapi_connection.create_function(name,
+												nargs,
+												fun,
+												deterministic=True)
+
 	def commit(self):
 		self.transaction.commit()
 		self.transaction = self.connection.begin()
@@ -117,13 +206,10 @@ class ConnectionHolder:
 	def init_table(self, tbl):
 		return self.call_one('create_{}'.format(tbl))
 
-	def run(self):
+	def connect(self):
+		"""Open the database, and start a transaction"""
 		dbstring = self._dbstring
 		connect_args = self._connect_args
-		if hasattr(self, 'gather'):
-			gather_sql = self.gather
-		else:
-			from .alchemy import gather_sql
 		if isinstance(dbstring, Engine):
 			self.engine = dbstring
 		else:
@@ -135,17 +221,40 @@ class ConnectionHolder:
 				self.engine = create_engine('sqlite:///' + dbstring,
 											connect_args=connect_args,
 											poolclass=NullPool)
+			if self.engine.dialect.name == 'sqlite':
+				event.listen(self.engine, 'connect', self._setup_sqlite)
+				self.has_sqlite_functions = True
 		self.meta = MetaData()
-		self.sql = gather_sql(self.meta)
+		self.sql = self.gather_sql(self.meta)
 		self.connection = self.engine.connect()
 		self.transaction = self.connection.begin()
+
+	def disconnect(self):
+		"""Close the database, discarding anything not committed"""
+		self.transaction.close()
+		self.connection.close()
+		self.engine.dispose()
+
+	def gather_sql(self, meta):
+		if hasattr(self, 'gather'):
+			return self.gather(meta)
+		from .alchemy import gather_sql
+		return gather_sql(meta)
+
+	def select(self, stmt):
+		return self.connection.execute(stmt).fetchall()
+
+	def run(self):
+		self.connect()
+		pending = None
 		while True:
-			inst = self.inq.get()
+			if pending is None:
+				inst = self.inq.get()
+			else:
+				inst, pending = pending, None
 			if inst == 'shutdown':
 				self.commit()
-				self.transaction.close()
-				self.connection.close()
-				self.engine.dispose()
+				self.disconnect()
 				self.existence_lock.release()
 				return
 			if inst == 'commit':
@@ -155,13 +264,17 @@ class ConnectionHolder:
 				self.outq.put(self.initdb())
 				continue
 			if isinstance(inst, Select):
-				res = self.connection.execute(inst).fetchall()
-				self.outq.put(res)
+				try:
+					self.outq.put(self.select(inst))
+				except Exception as ex:
+					self.outq.put(ex)
 				continue
 			silent = False
 			if inst[0] == 'silent':
 				inst = inst[1:]
 				silent = True
+				if inst[0] == 'many':
+					inst, pending = self._coalesce(inst)
 			if inst[0] == 'echo':
 				self.outq.put(inst[1])
 			elif inst[0] == 'one':
@@ -180,6 +293,8 @@ class ConnectionHolder:
 				except Exception as ex:
 					if not silent:
 						self.outq.put(ex)
+			elif inst[0] == 'coalesced':
+				self._call_coalesced(inst[1], inst[2])
 			elif inst[0] != 'many':
 				raise ValueError(f"Invalid instruction: {inst[0]}")
 			else:
@@ -198,8 +313,64 @@ class ConnectionHolder:
 					if not silent:
 						self.outq.put(ex)
 
+	def _coalesce(self, inst):
+		"""Gather following silent ``many`` instructions for the same query
+
+		Returns a ``coalesced`` instruction with all their batches, or
+		``inst`` itself if there were none, and the next instruction
+		that didn't fit, if any.
+
+		"""
+		_, k, largs = inst
+		batches = [largs]
+		while not self.inq.empty():
+			nxt = self.inq.get_nowait()
+			if (isinstance(nxt, tuple) and nxt[:3] == ('silent', 'many', k)):
+				batches.append(nxt[3])
+				continue
+			if len(batches) == 1:
+				return inst, nxt
+			return ('coalesced', k, batches), nxt
+		if len(batches) == 1:
+			return inst, None
+		return ('coalesced', k, batches), None
+
+	def _call_coalesced(self, k, batches):
+		"""Run the query ``k`` on several batches of arguments at once
+
+		If that fails, none of it is kept, and the batches are run one
+		at a time instead, so that an error loses only the rows in its
+		own batch, same as if they had never been coalesced.
+
+		"""
+		merged = [largs for batch in batches for largs in batch]
+		try:
+			with self._savepoint():
+				self.call_many(k, merged)
+			return
+		except Exception:
+			pass
+		for batch in batches:
+			try:
+				self.call_many(k, batch)
+			except Exception:
+				pass
+
+	def _savepoint(self):
+		"""Return a context manager that undoes its writes if it fails"""
+		return self.connection.begin_nested()
+
+	def compiled(self, k):
+		"""Return the query named ``k``, compiled for our database"""
+		try:
+			return self._compiled[k]
+		except KeyError:
+			ret = self._compiled[k] = self.sql[k].compile(
+				dialect=self.engine.dialect)
+			return ret
+
 	def call_one(self, k, *largs):
-		statement = self.sql[k].compile(dialect=self.engine.dialect)
+		statement = self.compiled(k)
 		if hasattr(statement, 'positiontup'):
 			return self.connection.execute(
 				statement, dict(zip(statement.positiontup, largs)))
@@ -208,7 +379,7 @@ class ConnectionHolder:
 		return self.connection.execute(self.sql[k])
 
 	def call_many(self, k, largs):
-		statement = self.sql[k].compile(dialect=self.engine.dialect)
+		statement = self.compiled(k)
 		return self.connection.execute(
 			statement,
 			[dict(zip(statement.positiontup, larg)) for larg in largs])
@@ -227,9 +398,16 @@ class ConnectionHolder:
 		self.commit()
 
 
+class KeyValueConnectionHolder(KeyValueHolder, ConnectionHolder):
+	"""Connection holder for ``memory://`` and ``lmdb://`` databases"""
+
+
 class QueryEngine(object):
 	flush_edges_t = 0
 	holder_cls = ConnectionHolder
+	kv_holder_cls = KeyValueConnectionHolder
+	keyframe_eager_keys = ()
+	"""Stats to keep unpacked in keyframes, because loading needs them"""
 	tables = ('global', 'branches', 'turns', 'graphs', 'keyframes',
 				'graph_val', 'nodes', 'node_val', 'edges', 'edge_val', 'plans',
 				'plan_ticks', 'universals')
@@ -239,16 +417,28 @@ class QueryEngine(object):
 					connect_args,
 					pack=None,
 					unpack=None,
-					gather=None):
+					gather=None,
+					pack_many=None):
 		dbstring = dbstring or 'sqlite:///:memory:'
 		self._inq = Queue()
 		self._outq = Queue()
-		self._holder = self.holder_cls(dbstring, connect_args, self._inq,
-										self._outq, self.tables, gather)
+		if isinstance(dbstring, str) and dbstring.startswith(
+			tuple(KeyValueHolder.stores)):
+			holder_cls = self.kv_holder_cls
+		else:
+			holder_cls = self.holder_cls
+		self._holder = holder_cls(dbstring, connect_args, self._inq,
+									self._outq, self.tables, gather)
 
 		if unpack is None:
 			from ast import literal_eval as unpack
 		self.pack = pack or repr
+		if pack_many is None:
+
+			def pack_many(objs):
+				return list(map(self.pack, objs))
+
+		self.pack_many = pack_many
 		self.unpack = unpack
 		self._branches = {}
 		self._nodevals2set = []
@@ -288,25 +478,74 @@ class QueryEngine(object):
 		with self._holder.lock:
 			self.flush()
 			self._inq.put(stmt)
-			return self._outq.get()
+			ret = self._outq.get()
+		if isinstance(ret, Exception):
+			raise ret
+		return ret
 
 	def new_graph(self, graph, branch, turn, tick, typ):
 		"""Declare a new graph by this name of this type."""
 		graph = self.pack(graph)
 		return self.call_one('graphs_insert', graph, branch, turn, tick, typ)
 
+	def _pack_kf_stats(self, stats):
+		eager = {k: stats[k] for k in self.keyframe_eager_keys if k in stats}
+		if isinstance(stats, PackedStats):
+			packed = stats._packed
+			if packed is not None:
+				return [eager, packed]
+		return [eager, self.pack(dict(stats))]
+
+	def _unpack_kf_stats(self, stats):
+		if isinstance(stats, dict):
+			# keyframe from before stats were packed separately
+			return stats
+		eager, packed = stats
+		return PackedStats(packed, self.unpack, eager)
+
+	def _pack_kf_nodes(self, nodes):
+		pack_stats = self._pack_kf_stats
+		return self.pack(
+			{node: pack_stats(stats)
+				for (node, stats) in nodes.items()})
+
+	def _unpack_kf_nodes(self, nodes):
+		unpack_stats = self._unpack_kf_stats
+		return {
+			node: unpack_stats(stats)
+			for (node, stats) in self.unpack(nodes).items()
+		}
+
+	def _pack_kf_edges(self, edges):
+		pack_stats = self._pack_kf_stats
+		return self.pack({
+			orig: {dest: pack_stats(stats)
+					for (dest, stats) in dests.items()}
+			for (orig, dests) in edges.items()
+		})
+
+	def _unpack_kf_edges(self, edges):
+		unpack_stats = self._unpack_kf_stats
+		return {
+			orig: {dest: unpack_stats(stats)
+					for (dest, stats) in dests.items()}
+			for (orig, dests) in self.unpack(edges).items()
+		}
+
 	def keyframes_insert(self, graph, branch, turn, tick, nodes, edges,
 							graph_val):
-		graph, nodes, edges, graph_val = map(
-			self.pack, (graph, nodes, edges, graph_val))
-		return self.call_one('keyframes_insert', graph, branch, turn, tick,
-								nodes, edges, graph_val)
+		pack = self.pack
+		return self.call_one('keyframes_insert', pack(graph), branch, turn,
+								tick, self._pack_kf_nodes(nodes),
+								self._pack_kf_edges(edges), pack(graph_val))
 
 	def keyframes_insert_many(self, many):
 		pack = self.pack
+		pack_nodes = self._pack_kf_nodes
+		pack_edges = self._pack_kf_edges
 		return self.call_many('keyframes_insert', [
-			(pack(graph), branch, turn, tick, pack(nodes), pack(edges),
-				pack(graph_val))
+			(pack(graph), branch, turn, tick, pack_nodes(nodes),
+				pack_edges(edges), pack(graph_val))
 			for (graph, branch, turn, tick, nodes, edges, graph_val) in many
 		])
 
@@ -314,8 +553,13 @@ class QueryEngine(object):
 		unpack = self.unpack
 		for (graph, branch, turn, tick, nodes, edges,
 				graph_val) in self.call_one('keyframes_dump'):
-			yield unpack(graph), branch, turn, tick, unpack(nodes), unpack(
-				edges), unpack(graph_val)
+			yield (unpack(graph), branch, turn, tick,
+					self._unpack_kf_nodes(nodes),
+					self._unpack_kf_edges(edges), unpack(graph_val))
+
+	def keyframes_del_many(self, times):
+		"""Delete every graph's keyframe at each ``(branch, turn, tick)``"""
+		return self.call_many('keyframes_del_time', times)
 
 	def keyframes_list(self):
 		unpack = self.unpack
@@ -329,7 +573,8 @@ class QueryEngine(object):
 		if not stuff:
 			return
 		nodes, edges, graph_val = stuff[0]
-		return unpack(nodes), unpack(edges), unpack(graph_val)
+		return (self._unpack_kf_nodes(nodes), self._unpack_kf_edges(edges),
+				unpack(graph_val))
 
 	def graph_type(self, graph):
 		"""What type of graph is this?"""
@@ -478,14 +723,33 @@ class QueryEngine(object):
 		"""Send all new and changed graph values to the database."""
 		if not self._graphvals2set:
 			return
-		pack = self.pack
-		self.call_many(
-			'graph_val_insert',
-			((pack(graph), pack(key), branch, turn, tick, pack(value))
-				for (graph, key, branch, turn, tick,
-						value) in self._graphvals2set))
+		self.call_many('graph_val_insert', self._pack_graphvals2set())
 		self._graphvals2set = []
 
+	def _pack_columns(self, rows, packed):
+		"""Pack the columns of ``rows`` with the indices in ``packed``
+
+		A column at a time, so they can go to ``pack_many``.
+
+		"""
+		pack_many = self.pack_many
+		columns = list(zip(*rows))
+		for i in packed:
+			columns[i] = pack_many(columns[i])
+		return list(zip(*columns))
+
+	def _pack_graphvals2set(self):
+		# graph, key, branch, turn, tick, value
+		return self._pack_columns(self._graphvals2set, (0, 1, 5))
+
+	def _pack_nodevals2set(self):
+		# graph, node, key, branch, turn, tick, value
+		return self._pack_columns(self._nodevals2set, (0, 1, 2, 6))
+
+	def _pack_edgevals2set(self):
+		# graph, orig, dest, idx, key, branch, turn, tick, value
+		return self._pack_columns(self._edgevals2set, (0, 1, 2, 4, 8))
+
 	def graph_val_set(self, graph, key, branch, turn, tick, value):
 		if (branch, turn, tick) in self._btts:
 			raise TimeError
@@ -603,12 +867,7 @@ class QueryEngine(object):
 	def _flush_node_val(self):
 		if not self._nodevals2set:
 			return
-		pack = self.pack
-		self.call_many('node_val_insert',
-						((pack(graph), pack(node), pack(key), branch, turn,
-							tick, pack(value))
-							for (graph, node, key, branch, turn, tick,
-									value) in self._nodevals2set))
+		self.call_many('node_val_insert', self._pack_nodevals2set())
 		self._nodevals2set = []
 
 	def node_val_set(self, graph, node, key, branch, turn, tick, value):
@@ -716,17 +975,10 @@ class QueryEngine(object):
 			yield graph, unpack(orig), unpack(dest), idx, unpack(
 				key), branch, turn, tick, unpack(value)
 
-	def _pack_edgeval2set(self, tup):
-		graph, orig, dest, idx, key, branch, turn, tick, value = tup
-		pack = self.pack
-		return pack(graph), pack(orig), pack(dest), idx, pack(
-			key), branch, turn, tick, pack(value)
-
 	def _flush_edge_val(self):
 		if not self._edgevals2set:
 			return
-		self.call_many('edge_val_insert',
-						map(self._pack_edgeval2set, self._edgevals2set))
+		self.call_many('edge_val_insert', self._pack_edgevals2set())
 		self._edgevals2set = []
 
 	def edge_val_set(self, graph, orig, dest, idx, key, branch, turn, tick,
@@ -778,19 +1030,15 @@ class QueryEngine(object):
 			self._edges2set = []
 		if self._graphvals2set:
 			put(('silent', 'many', 'graph_val_insert',
-					[(pack(graph), pack(key), branch, turn, tick, pack(value))
-						for (graph, key, branch, turn, tick,
-								value) in self._graphvals2set]))
+					self._pack_graphvals2set()))
 			self._graphvals2set = []
 		if self._nodevals2set:
 			put(('silent', 'many', 'node_val_insert',
-					[(pack(graph), pack(node), pack(key), branch, turn, tick,
-						pack(value)) for (graph, node, key, branch, turn, tick,
-											value) in self._nodevals2set]))
+					self._pack_nodevals2set()))
 			self._nodevals2set = []
 		if self._edgevals2set:
 			put(('silent', 'many', 'edge_val_insert',
-					list(map(self._pack_edgeval2set, self._edgevals2set))))
+					self._pack_edgevals2set()))
 			self._edgevals2set = []
 
 	def commit(self):
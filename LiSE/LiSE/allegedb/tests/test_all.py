@@ -415,5 +415,25 @@ class SetStorageTest(AllegedTest):
 				self.assertEqual(entity[0], set(range(10)))
 
 
+class ColumnarHistoryTest(AllegedTest):
+
+	def setUp(self):
+		self.engine = ORM('sqlite:///:memory:', columnar_history=True)
+		self.graphmakers = (self.engine.new_digraph, )
+
+
+class ColumnarBranchLineageTest(AbstractBranchLineageTest,
+								ColumnarHistoryTest):
+	pass
+
+
+class ColumnarStorageTest(ColumnarHistoryTest, StorageTest):
+	pass
+
+
+class ColumnarDictStorageTest(ColumnarHistoryTest, DictStorageTest):
+	pass
+
+
 if __name__ == '__main__':
 	unittest.main()
@@ -1,6 +1,6 @@
 import pytest
 import os
-from LiSE.allegedb import ORM
+from LiSE.allegedb import ORM, query
 import networkx as nx
 
 testgraphs = [nx.chvatal_graph()]
@@ -182,3 +182,130 @@ def test_keyframe_unload(tmpdbfile):
 		assert (1, 2) in g.nodes
 		assert ('g', (1, 1), (1, 2)) in orm._edges_cache.keyframe \
                            and 'trunk' in orm._edges_cache.keyframe['g', (1, 1), (1, 2)]
+
+
+def test_coalesced_writes(tmpdbfile):
+	qe = query.QueryEngine('sqlite:///' + tmpdbfile, {})
+	qe.initdb()
+	for tick in range(100):
+		qe.node_val_set('g', tick % 7, 'stat', 'trunk', 0, tick, tick)
+		qe.flush()
+	qe.close()
+	assert not os.path.exists(tmpdbfile + '-wal')
+	qe = query.QueryEngine('sqlite:///' + tmpdbfile, {})
+	qe.initdb()
+	assert sorted(row[-1] for row in qe.node_val_dump()) == list(range(100))
+	qe.close()
+
+
+@pytest.mark.parametrize('kind', ['sqlite', 'memory'])
+def test_coalesced_writes_error(tmpdbfile, kind):
+	if kind == 'sqlite':
+		qe = query.QueryEngine('sqlite:///' + tmpdbfile, {})
+	else:
+		qe = query.QueryEngine('memory://', {})
+	qe.initdb()
+
+	def row(tick):
+		return (repr('g'), repr(0), repr('stat'), 'trunk', 0, tick, repr(tick))
+
+	# the second batch clashes with the first; put them all in the queue
+	# at once, so they get coalesced
+	inq = qe._inq
+	with inq.mutex:
+		for batch in ([row(0), row(1)], [row(0)], [row(2)]):
+			inq.queue.append(('silent', 'many', 'node_val_insert', batch))
+			inq.unfinished_tasks += 1
+		inq.not_empty.notify()
+	assert sorted(row[-1] for row in qe.node_val_dump()) == [0, 1, 2]
+	qe.close()
+
+
+def test_keyframe_stats_unpacked_lazily(tmpdbfile):
+	with ORM('sqlite:///' + tmpdbfile) as orm:
+		g = orm.new_digraph('g', nx.path_graph(3))
+		for node in g.node:
+			g.node[node]['n'] = node * 10
+		orm.snap_keyframe()
+		tick = orm.tick
+	with ORM('sqlite:///' + tmpdbfile) as orm:
+		kf = orm._node_val_cache.keyframe
+		assert isinstance(kf['g', 0]['trunk'][0][tick], query.PackedStats)
+		assert kf['g', 0]['trunk'][0][tick]._data is None
+		assert orm.graph['g'].node[1]['n'] == 10
+		assert kf['g', 0]['trunk'][0][tick]._data is None
+		assert kf['g', 2]['trunk'][0][tick] == {'name': 2, 'n': 20}
+	qe = query.QueryEngine('sqlite:///' + tmpdbfile, {})
+	qe.initdb()
+	# keyframes from older versions have their stats in plain dicts
+	qe.call_one('keyframes_insert', repr('h'), 'trunk', 5, 0,
+				repr({0: {'x': 1}}), repr({0: {1: {'y': 2}}}), repr({}))
+	assert qe.get_keyframe('h', 'trunk', 5, 0) == ({
+		0: {
+			'x': 1
+		}
+	}, {
+		0: {
+			1: {
+				'y': 2
+			}
+		}
+	}, {})
+	qe.close()
+
+
+def test_packed_stats_threads():
+	import msgpack
+	import sys
+	from concurrent.futures import ThreadPoolExecutor
+
+	def unpack(packed):
+		assert packed is not None, "Packed stats let go too soon"
+		return msgpack.unpackb(packed)
+
+	qe = query.QueryEngine('sqlite:///:memory:', {})
+	qe.initdb()
+	stats = {'x': 1, 'y': [2, 3], 'name': 'n'}
+	packed_stats = [
+		query.PackedStats(msgpack.packb(stats), unpack, {'name': 'n'})
+		for _ in range(2000)
+	]
+
+	def read(n):
+		for ps in packed_stats:
+			if n % 2:
+				assert qe._pack_kf_stats(ps)[1] is not None
+			assert ps['y'] == [2, 3]
+			assert dict(ps) == stats
+
+	switch_interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-6)
+	try:
+		with ThreadPoolExecutor(8) as pool:
+			list(pool.map(read, range(16)))
+	finally:
+		sys.setswitchinterval(switch_interval)
+		qe.close()
+
+
+def test_keyframe_written_in_background(tmpdbfile):
+	with ORM('sqlite:///' + tmpdbfile) as orm:
+		g = orm.new_digraph('g', nx.path_graph(3))
+		orm.flush()
+		g.node[0]['n'] = 0
+		orm.snap_keyframe()
+		kf_time = orm._btt()
+		assert not orm._new_keyframes
+		orm._join_keyframe_writer()
+		assert ('g', *kf_time) in set(orm.query.keyframes_list())
+		g.node[0]['n'] = 1
+		real_insert = orm.query.keyframes_insert_many
+
+		def broken_insert(many):
+			raise ValueError('no room')
+
+		orm.query.keyframes_insert_many = broken_insert
+		orm.snap_keyframe()
+		with pytest.raises(ValueError):
+			orm.flush()
+		orm.query.keyframes_insert_many = real_insert
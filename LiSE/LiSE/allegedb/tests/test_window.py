@@ -1,4 +1,5 @@
-from ..window import WindowDict
+from ..window import WindowDict, BisectWindowDict, SettingsTurnDict, \
+ ColumnarTurnDict
 from .. import HistoricKeyError, ORM
 from itertools import cycle
 import pytest
@@ -19,9 +20,14 @@ for k, v in zip(range(100), cycle(testvs)):
 		testdata.append((k, vv))
 
 
+@pytest.fixture(params=[WindowDict, BisectWindowDict])
+def windd_cls(request):
+	return request.param
+
+
 @pytest.fixture
-def windd():
-	return WindowDict(testdata)
+def windd(windd_cls):
+	return windd_cls(testdata)
 
 
 def test_keys(windd):
@@ -87,8 +93,8 @@ def test_future(windd):
 		assert item[1] not in windd.future().values()
 
 
-def test_empty():
-	empty = WindowDict()
+def test_empty(windd_cls):
+	empty = windd_cls()
 	items = empty.items()
 	past = empty.past()
 	future = empty.future()
@@ -135,8 +141,8 @@ def test_del(windd):
 		windd[1]
 
 
-def test_set():
-	wd = WindowDict()
+def test_set(windd_cls):
+	wd = windd_cls()
 	assert 0 not in wd
 	wd[0] = 'foo'
 	assert 0 in wd
@@ -168,3 +174,55 @@ def test_set():
 		wd[5] = g.node[5]['ham']
 		assert wd[5] == {'spam': 'beans'}
 		assert wd[5] == g.node[5]['ham']
+
+
+def test_random_access(windd):
+	for k in (99, 3, 70, 0, 42, 98, 1, 64):
+		assert windd[k] == testdata[k][1]
+		assert windd[k + 0.5] == testdata[k][1]
+		assert windd.rev_before(k + 0.5) == k
+		assert list(windd.past(k)) == list(reversed(range(k + 1)))
+		assert list(windd.future(k)) == list(range(k + 1, 100))
+
+
+def test_truncate(windd):
+	windd.truncate(80)
+	assert list(windd.keys()) == list(range(81))
+	windd.truncate(20, 'backward')
+	assert list(windd.keys()) == list(range(20, 81))
+	with pytest.raises(HistoricKeyError):
+		windd[19]
+
+
+@pytest.mark.parametrize('cls', [SettingsTurnDict, ColumnarTurnDict])
+def test_turn_dict(cls):
+	td = cls()
+	td.store_at(0, 0, 'a')
+	td.store_at(0, 5, 'b')
+	td.store_at(3, 1, 'c')
+	td.store_at(3, 0, 'd')
+	td[7] = {2: 'e', 1: 'f'}
+	assert list(td) == [0, 3, 7]
+	assert 3 in td and 4 not in td
+	assert td.retrieve(0, 3) == 'a'
+	assert td.retrieve(3, 0) == 'd'
+	assert td.retrieve(7, 1) == 'f'
+	assert td.retrieve_exact(3, 1) == 'c'
+	with pytest.raises(KeyError):
+		td.retrieve_exact(3, 2)
+	assert td[5].final() == 'c'
+	assert td.rev_before(5) == 3
+	assert td.rev_after(5) == 7
+	assert list(td.future(0)) == [3, 7]
+	assert list(td.past(5)) == [3, 0]
+	assert list(td[0].future(0).items()) == [(5, 'b')]
+	td[0].truncate(0)
+	assert list(td[0].items()) == [(0, 'a')]
+	td.truncate(3)
+	assert list(td) == [0, 3]
+	assert td.end == 3
+	assert td[3].end == 1
+	del td[3][0]
+	assert list(td[3].items()) == [(1, 'c')]
+	with pytest.raises(HistoricKeyError):
+		td[-1]
@@ -19,8 +19,13 @@ a key that isn't set will get the highest set key that is lower than the key
 you asked for (and thus, keys must be orderable). It is optimized for retrieval
 of the same key and neighboring ones repeatedly and in sequence.
 
+BisectWindowDict has the same interface, but is optimized for retrieval of
+arbitrary keys in no particular order.
+
 """
 from abc import abstractmethod, ABC
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import deque
 from collections.abc import Mapping, MutableMapping, KeysView, ItemsView, ValuesView
 from itertools import chain
@@ -435,6 +440,145 @@ class WindowDictReverseSlice:
 				yield from map(get1, reversed(stac))
 
 
+class BisectWindowDictPastFutureView(ABC, Mapping):
+	"""Abstract class for historical views on BisectWindowDict
+
+	Unlike :class:`WindowDictPastFutureView`, this doesn't hold a stack
+	of items; it looks up its bounds by bisection each time, so it stays
+	correct if the dict is read or written after the view was made.
+
+	"""
+	__slots__ = ('_dict', '_rev')
+	_dict: 'BisectWindowDict'
+	_rev: int
+
+	def __init__(self, dic: 'BisectWindowDict', rev: int) -> None:
+		self._dict = dic
+		self._rev = rev
+
+	@abstractmethod
+	def _bounds(self) -> Tuple[int, int]:
+		pass
+
+	def __len__(self) -> int:
+		start, stop = self._bounds()
+		return stop - start
+
+	def __contains__(self, key: int) -> bool:
+		start, stop = self._bounds()
+		revs = self._dict._revs
+		i = bisect_left(revs, key, start, stop)
+		return i < stop and revs[i] == key
+
+	def __getitem__(self, key: int) -> Any:
+		start, stop = self._bounds()
+		revs = self._dict._revs
+		i = bisect_left(revs, key, start, stop)
+		if i < stop and revs[i] == key:
+			return self._dict._vals[i]
+		raise KeyError
+
+
+class BisectWindowDictPastView(BisectWindowDictPastFutureView):
+	"""Read-only mapping of just the past of a BisectWindowDict
+
+	Iterates from the latest revision to the earliest, like
+	:class:`WindowDictPastView`.
+
+	"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		return 0, bisect_right(self._dict._revs, self._rev)
+
+	def __iter__(self) -> Iterable[int]:
+		start, stop = self._bounds()
+		revs = self._dict._revs
+		for i in range(stop - 1, start - 1, -1):
+			yield revs[i]
+
+
+class BisectWindowDictFutureView(BisectWindowDictPastFutureView):
+	"""Read-only mapping of just the future of a BisectWindowDict
+
+	Iterates from the earliest revision to the latest, like
+	:class:`WindowDictFutureView`.
+
+	"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		revs = self._dict._revs
+		return bisect_right(revs, self._rev), len(revs)
+
+	def __iter__(self) -> Iterable[int]:
+		start, stop = self._bounds()
+		yield from self._dict._revs[start:stop]
+
+
+class BisectWindowDictSlice:
+	"""A slice of a BisectWindowDict's history, in either direction
+
+	Follows the same conventions as :class:`WindowDictSlice` and
+	:class:`WindowDictReverseSlice`, but finds its endpoints by bisection.
+
+	"""
+	__slots__ = ['dic', 'slic', 'reverse']
+	dic: 'BisectWindowDict'
+	slic: slice
+	reverse: bool
+
+	def __init__(self,
+					dic: 'BisectWindowDict',
+					slic: slice,
+					reverse: bool = False):
+		self.dic = dic
+		self.slic = slic
+		self.reverse = reverse
+
+	def __reversed__(self) -> Iterable[Any]:
+		return iter(BisectWindowDictSlice(self.dic, self.slic,
+											not self.reverse))
+
+	def _indices(self) -> range:
+		"""Get the range of indices into the dict's values to iterate over"""
+		revs = self.dic._revs
+		start, stop = self.slic.start, self.slic.stop
+		if start is not None and stop is not None and start > stop:
+			# a slice running backward covers (stop, start]
+			lo = bisect_right(revs, stop)
+			hi = bisect_right(revs, start)
+			backward = True
+		else:
+			lo = 0 if start is None else bisect_left(revs, start)
+			hi = len(revs) if stop is None else bisect_left(revs, stop)
+			backward = False
+		if backward != self.reverse:
+			return range(hi - 1, lo - 1, -1)
+		return range(lo, hi)
+
+	def __iter__(self):
+		dic = self.dic
+		if not dic:
+			return
+		slic = self.slic
+		if slic.step is not None:
+			if self.reverse:
+				rnge = range(slic.start or dic.end, slic.stop
+								or dic.beginning, slic.step)
+			else:
+				rnge = range(slic.start or dic.beginning, slic.stop
+								or dic.end + 1, slic.step)
+			for i in rnge:
+				yield dic[i]
+			return
+		if slic.start is not None and slic.start == slic.stop:
+			yield dic[slic.stop]
+			return
+		with dic._lock:
+			vals = dic._vals
+			items = [vals[i] for i in self._indices()]
+		yield from items
+
+
 class WindowDict(MutableMapping):
 	"""A dict that keeps every value that a variable has had over time.
 
@@ -738,35 +882,278 @@ class FuturistWindowDict(WindowDict):
 			self._keys.add(rev)
 
 
-class TurnDict(FuturistWindowDict):
-	__slots__ = ('_future', '_past')
-	_future: List[Tuple[int, Any]]
-	_past: List[Tuple[int, Any]]
+class BisectWindowDict(MutableMapping):
+	"""A WindowDict that finds revisions by bisection.
+
+	:class:`WindowDict` is fastest when you look up the same revision
+	over and over, or its neighbors, but moving its cursor a long way
+	costs time proportional to the distance. This class keeps its
+	revisions in one sorted list, so looking up any revision takes
+	logarithmic time, no matter what you looked up last.
+
+	The API is the same as :class:`WindowDict`'s, including ``past``,
+	``future``, and slicing.
+
+	"""
+	__slots__ = ('_revs', '_vals', '_keys', '_last', '_lock')
+
+	_revs: List[int]
+	_vals: List[Any]
+	_keys: Set[int]
+	_last: Optional[int]
+
+	@property
+	def beginning(self) -> Optional[int]:
+		if not self._revs:
+			return None
+		return self._revs[0]
+
+	@property
+	def end(self) -> Optional[int]:
+		if not self._revs:
+			return None
+		return self._revs[-1]
+
+	def future(self, rev: int = None) -> BisectWindowDictFutureView:
+		"""Return a Mapping of items after the given revision.
+
+		Default revision is the last one looked up.
+
+		"""
+		if rev is None:
+			rev = self._last
+		else:
+			self._last = rev
+		if rev is None:
+			rev = self.end
+		return BisectWindowDictFutureView(self, rev)
+
+	def past(self, rev: int = None) -> BisectWindowDictPastView:
+		"""Return a Mapping of items at or before the given revision.
+
+		Default revision is the last one looked up.
+
+		"""
+		if rev is None:
+			rev = self._last
+		else:
+			self._last = rev
+		if rev is None:
+			rev = self.end
+		return BisectWindowDictPastView(self, rev)
+
+	def _seek(self, rev: int) -> None:
+		"""Remember ``rev`` as the last revision looked up.
+
+		No rearrangement is needed; this is for compatibility with
+		:class:`WindowDict`, whose ``past`` and ``future`` default to it.
+
+		"""
+		self._last = rev
+
+	def rev_gettable(self, rev: int) -> bool:
+		revs = self._revs
+		return bool(revs) and rev >= revs[0]
+
+	def rev_before(self, rev: int):
+		"""Return the latest past rev on which the value changed."""
+		with self._lock:
+			self._last = rev
+			i = bisect_right(self._revs, rev)
+			if i:
+				return self._revs[i - 1]
+
+	def rev_after(self, rev: int):
+		"""Return the earliest future rev on which the value will change."""
+		with self._lock:
+			self._last = rev
+			i = bisect_right(self._revs, rev)
+			if i < len(self._revs):
+				return self._revs[i]
+
+	def initial(self) -> Any:
+		"""Return the earliest value we have"""
+		if self._vals:
+			return self._vals[0]
+		raise KeyError("No data")
+
+	def final(self) -> Any:
+		"""Return the latest value we have"""
+		if self._vals:
+			return self._vals[-1]
+		raise KeyError("No data")
+
+	def truncate(self, rev: int, direction: Direction = 'forward') -> None:
+		"""Delete everything after the given revision, exclusive.
+
+		With direction='backward', delete everything before the revision,
+		exclusive, instead.
+
+		"""
+		with self._lock:
+			self._last = rev
+			if direction == 'forward':
+				i = bisect_right(self._revs, rev)
+				self._keys.difference_update(self._revs[i:])
+				del self._revs[i:]
+				del self._vals[i:]
+			elif direction == 'backward':
+				i = bisect_left(self._revs, rev)
+				self._keys.difference_update(self._revs[:i])
+				del self._revs[:i]
+				del self._vals[:i]
+			else:
+				raise ValueError("Need direction 'forward' or 'backward'")
+
+	def keys(self) -> KeysView:
+		return KeysView(self)
+
+	def items(self) -> ItemsView:
+		return ItemsView(self)
+
+	def values(self) -> ValuesView:
+		return ValuesView(self)
+
+	def __bool__(self) -> bool:
+		return bool(self._revs)
+
+	def copy(self):
+		with self._lock:
+			empty = self.__class__.__new__(self.__class__)
+			empty._lock = Lock()
+			empty._revs = self._revs.copy()
+			empty._vals = self._vals.copy()
+			empty._keys = self._keys.copy()
+			empty._last = self._last
+			return empty
+
+	def __init__(
+			self,
+			data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None) -> None:
+		self._lock = Lock()
+		with self._lock:
+			if not data:
+				items = []
+			elif isinstance(data, Mapping):
+				items = sorted(data.items(), key=get0)
+			else:
+				# assume it's an orderable sequence of pairs
+				items = sorted(data, key=get0)
+			self._revs = list(map(get0, items))
+			self._vals = list(map(get1, items))
+			self._keys = set(self._revs)
+			self._last = None
+
+	def __iter__(self) -> Iterable[int]:
+		yield from self._revs
+
+	def __contains__(self, item: int) -> bool:
+		return item in self._keys
+
+	def __len__(self) -> int:
+		return len(self._revs)
+
+	def __getitem__(self, rev: int) -> Any:
+		if isinstance(rev, slice):
+			return BisectWindowDictSlice(self, rev)
+		with self._lock:
+			self._last = rev
+			i = bisect_right(self._revs, rev)
+			if not i:
+				raise HistoricKeyError(
+					"Revision {} is before the start of history".format(rev))
+			return self._vals[i - 1]
+
+	def __setitem__(self, rev: int, v: Any) -> None:
+		with self._lock:
+			self._last = rev
+			revs = self._revs
+			if not revs or rev > revs[-1]:
+				revs.append(rev)
+				self._vals.append(v)
+			else:
+				i = bisect_left(revs, rev)
+				if revs[i] == rev:
+					self._vals[i] = v
+				else:
+					revs.insert(i, rev)
+					self._vals.insert(i, v)
+			self._keys.add(rev)
+
+	def __delitem__(self, rev: int) -> None:
+		if not self:
+			raise HistoricKeyError("Tried to delete from an empty WindowDict")
+		if not self.beginning <= rev <= self.end:
+			raise HistoricKeyError("Rev outside of history: {}".format(rev))
+		with self._lock:
+			self._last = rev
+			if rev not in self._keys:
+				raise HistoricKeyError("Rev not present: {}".format(rev))
+			i = bisect_left(self._revs, rev)
+			del self._revs[i]
+			del self._vals[i]
+			self._keys.remove(rev)
+
+	def __repr__(self) -> str:
+		return "{}({})".format(self.__class__.__name__,
+								dict(zip(self._revs, self._vals)))
+
+
+class BisectFuturistWindowDict(BisectWindowDict):
+	"""A BisectWindowDict that does not let you rewrite the past."""
+	__slots__ = ()
+
+	def __setitem__(self, rev: int, v: Any) -> None:
+		if hasattr(v, 'unwrap') and not hasattr(v, 'no_unwrap'):
+			v = v.unwrap()
+		with self._lock:
+			self._last = rev
+			revs = self._revs
+			if not revs or rev > revs[-1]:
+				revs.append(rev)
+				self._vals.append(v)
+			elif rev == revs[-1]:
+				self._vals[-1] = v
+			else:
+				raise HistoricKeyError(
+					"Already have some history after {}".format(rev))
+			self._keys.add(rev)
+
+
+class TurnDict(BisectFuturistWindowDict):
+	"""A FuturistWindowDict of turns, each of them a FuturistWindowDict of ticks
+
+	Turns are looked up by bisection, since callers tend to jump around
+	between them; ticks within a turn are usually read in sequence.
+
+	"""
+	__slots__ = ()
 	cls = FuturistWindowDict
 
 	def __setitem__(self, turn: int, value: Any) -> None:
 		if type(value) is not FuturistWindowDict:
 			value = FuturistWindowDict(value)
-		FuturistWindowDict.__setitem__(self, turn, value)
+		BisectFuturistWindowDict.__setitem__(self, turn, value)
 
 
-class SettingsTurnDict(WindowDict):
+class SettingsTurnDict(BisectWindowDict):
 	"""A WindowDict that contains a span of time, indexed as turns and ticks
 
 	Each turn is a series of ticks. Once a value is set at some turn and tick,
 	it's in effect at every tick in the turn after that one, and every
 	further turn.
 
+	Turns are looked up by bisection, since callers tend to jump around
+	between them; ticks within a turn are usually read in sequence.
+
 	"""
-	__slots__ = ('_future', '_past')
-	_future: List[Tuple[int, Any]]
-	_past: List[Tuple[int, Any]]
+	__slots__ = ()
 	cls = WindowDict
 
 	def __setitem__(self, turn: int, value: Any) -> None:
 		if type(value) is not WindowDict:
 			value = WindowDict(value)
-		WindowDict.__setitem__(self, turn, value)
+		BisectWindowDict.__setitem__(self, turn, value)
 
 	def retrieve(self, turn: int, tick: int) -> Any:
 		"""Retrieve the value that was in effect at this turn and tick
@@ -795,3 +1182,513 @@ class SettingsTurnDict(WindowDict):
 			self[turn][tick] = value
 		else:
 			self[turn] = {tick: value}
+
+
+class ColumnarTurnsView(ABC, Mapping):
+	"""Abstract class for historical views on a ColumnarTurnDict
+
+	Maps turns to :class:`ColumnarTickView` objects.
+
+	"""
+	__slots__ = ('_dict', '_rev')
+	_dict: 'ColumnarTurnDict'
+	_rev: int
+
+	def __init__(self, dic: 'ColumnarTurnDict', rev: int) -> None:
+		self._dict = dic
+		self._rev = rev
+
+	@abstractmethod
+	def _bounds(self) -> Tuple[int, int]:
+		pass
+
+	def __len__(self) -> int:
+		return sum(1 for _ in self._dict._iter_turns(*self._bounds()))
+
+	def __contains__(self, turn: int) -> bool:
+		start, stop = self._bounds()
+		turns = self._dict._turns
+		i = bisect_left(turns, turn, start, stop)
+		return i < stop and turns[i] == turn
+
+	def __getitem__(self, turn: int) -> 'ColumnarTickView':
+		if turn not in self:
+			raise KeyError
+		return ColumnarTickView(self._dict, turn)
+
+
+class ColumnarTurnsPastView(ColumnarTurnsView):
+	"""Read-only mapping of the turns at or before some turn, latest first"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		return 0, bisect_right(self._dict._turns, self._rev)
+
+	def __iter__(self) -> Iterable[int]:
+		yield from reversed(list(self._dict._iter_turns(*self._bounds())))
+
+
+class ColumnarTurnsFutureView(ColumnarTurnsView):
+	"""Read-only mapping of the turns after some turn, earliest first"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		turns = self._dict._turns
+		return bisect_right(turns, self._rev), len(turns)
+
+	def __iter__(self) -> Iterable[int]:
+		yield from self._dict._iter_turns(*self._bounds())
+
+
+class ColumnarTicksView(ABC, Mapping):
+	"""Abstract class for historical views on one turn of a ColumnarTurnDict"""
+	__slots__ = ('_dict', '_turn', '_rev')
+	_dict: 'ColumnarTurnDict'
+	_turn: int
+	_rev: int
+
+	def __init__(self, dic: 'ColumnarTurnDict', turn: int, rev: int) -> None:
+		self._dict = dic
+		self._turn = turn
+		self._rev = rev
+
+	@abstractmethod
+	def _bounds(self) -> Tuple[int, int]:
+		pass
+
+	def __len__(self) -> int:
+		start, stop = self._bounds()
+		return stop - start
+
+	def __contains__(self, tick: int) -> bool:
+		start, stop = self._bounds()
+		ticks = self._dict._ticks
+		i = bisect_left(ticks, tick, start, stop)
+		return i < stop and ticks[i] == tick
+
+	def __getitem__(self, tick: int) -> Any:
+		start, stop = self._bounds()
+		ticks = self._dict._ticks
+		i = bisect_left(ticks, tick, start, stop)
+		if i < stop and ticks[i] == tick:
+			return self._dict._vals[i]
+		raise KeyError
+
+
+class ColumnarTicksPastView(ColumnarTicksView):
+	"""Read-only mapping of the ticks at or before some tick, latest first"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		lo, hi = self._dict._turn_bounds(self._turn)
+		return lo, bisect_right(self._dict._ticks, self._rev, lo, hi)
+
+	def __iter__(self) -> Iterable[int]:
+		start, stop = self._bounds()
+		ticks = self._dict._ticks
+		for i in range(stop - 1, start - 1, -1):
+			yield ticks[i]
+
+
+class ColumnarTicksFutureView(ColumnarTicksView):
+	"""Read-only mapping of the ticks after some tick, earliest first"""
+
+	def _bounds(self) -> Tuple[int, int]:
+		lo, hi = self._dict._turn_bounds(self._turn)
+		return bisect_right(self._dict._ticks, self._rev, lo, hi), hi
+
+	def __iter__(self) -> Iterable[int]:
+		start, stop = self._bounds()
+		yield from self._dict._ticks[start:stop]
+
+
+class ColumnarTickView(MutableMapping):
+	"""The ticks of one turn in a :class:`ColumnarTurnDict`
+
+	Behaves like the :class:`WindowDict` of ticks that a
+	:class:`SettingsTurnDict` would give you for the turn, but
+	reads and writes the columns of the :class:`ColumnarTurnDict`
+	directly. If every tick is deleted, the turn is gone.
+
+	"""
+	__slots__ = ('_dict', '_turn')
+	_dict: 'ColumnarTurnDict'
+	_turn: int
+
+	def __init__(self, dic: 'ColumnarTurnDict', turn: int) -> None:
+		self._dict = dic
+		self._turn = turn
+
+	def _bounds(self) -> Tuple[int, int]:
+		return self._dict._turn_bounds(self._turn)
+
+	@property
+	def beginning(self) -> Optional[int]:
+		lo, hi = self._bounds()
+		if lo == hi:
+			return None
+		return self._dict._ticks[lo]
+
+	@property
+	def end(self) -> Optional[int]:
+		lo, hi = self._bounds()
+		if lo == hi:
+			return None
+		return self._dict._ticks[hi - 1]
+
+	def future(self, rev: int = None) -> ColumnarTicksFutureView:
+		"""Return a Mapping of ticks after the given one.
+
+		Default is the last tick of the turn.
+
+		"""
+		if rev is None:
+			rev = self.end
+		return ColumnarTicksFutureView(self._dict, self._turn, rev)
+
+	def past(self, rev: int = None) -> ColumnarTicksPastView:
+		"""Return a Mapping of ticks at or before the given one.
+
+		Default is the last tick of the turn.
+
+		"""
+		if rev is None:
+			rev = self.end
+		return ColumnarTicksPastView(self._dict, self._turn, rev)
+
+	def rev_gettable(self, rev: int) -> bool:
+		beg = self.beginning
+		return beg is not None and rev >= beg
+
+	def rev_before(self, rev: int):
+		"""Return the latest past tick on which the value changed."""
+		lo, hi = self._bounds()
+		i = bisect_right(self._dict._ticks, rev, lo, hi)
+		if i > lo:
+			return self._dict._ticks[i - 1]
+
+	def rev_after(self, rev: int):
+		"""Return the earliest future tick on which the value will change."""
+		lo, hi = self._bounds()
+		i = bisect_right(self._dict._ticks, rev, lo, hi)
+		if i < hi:
+			return self._dict._ticks[i]
+
+	def initial(self) -> Any:
+		"""Return the earliest value in the turn"""
+		lo, hi = self._bounds()
+		if lo == hi:
+			raise KeyError("No data")
+		return self._dict._vals[lo]
+
+	def final(self) -> Any:
+		"""Return the latest value in the turn"""
+		lo, hi = self._bounds()
+		if lo == hi:
+			raise KeyError("No data")
+		return self._dict._vals[hi - 1]
+
+	def truncate(self, rev: int, direction: Direction = 'forward') -> None:
+		"""Delete every tick after the given one, exclusive.
+
+		With direction='backward', delete every tick before it, exclusive,
+		instead.
+
+		"""
+		dic = self._dict
+		with dic._lock:
+			lo, hi = self._bounds()
+			if direction == 'forward':
+				dic._delete_rows(bisect_right(dic._ticks, rev, lo, hi), hi)
+			elif direction == 'backward':
+				dic._delete_rows(lo, bisect_left(dic._ticks, rev, lo, hi))
+			else:
+				raise ValueError("Need direction 'forward' or 'backward'")
+
+	def copy(self) -> WindowDict:
+		return WindowDict(list(self.items()))
+
+	def __bool__(self) -> bool:
+		lo, hi = self._bounds()
+		return lo < hi
+
+	def __len__(self) -> int:
+		lo, hi = self._bounds()
+		return hi - lo
+
+	def __iter__(self) -> Iterable[int]:
+		lo, hi = self._bounds()
+		yield from self._dict._ticks[lo:hi]
+
+	def __contains__(self, tick: int) -> bool:
+		lo, hi = self._bounds()
+		ticks = self._dict._ticks
+		i = bisect_left(ticks, tick, lo, hi)
+		return i < hi and ticks[i] == tick
+
+	def __getitem__(self, tick: int) -> Any:
+		if isinstance(tick, slice):
+			return WindowDict(list(self.items()))[tick]
+		dic = self._dict
+		with dic._lock:
+			lo, hi = self._bounds()
+			i = bisect_right(dic._ticks, tick, lo, hi)
+			if i == lo:
+				raise HistoricKeyError(
+					"Revision {} is before the start of history".format(tick))
+			return dic._vals[i - 1]
+
+	def __setitem__(self, tick: int, value: Any) -> None:
+		self._dict.store_at(self._turn, tick, value)
+
+	def __delitem__(self, tick: int) -> None:
+		dic = self._dict
+		with dic._lock:
+			lo, hi = self._bounds()
+			i = bisect_left(dic._ticks, tick, lo, hi)
+			if i == hi or dic._ticks[i] != tick:
+				raise HistoricKeyError("Rev not present: {}".format(tick))
+			dic._delete_rows(i, i + 1)
+
+	def __repr__(self) -> str:
+		return "{}({})".format(self.__class__.__name__, dict(self.items()))
+
+
+class ColumnarTurnDict(MutableMapping):
+	"""A SettingsTurnDict that keeps its history in typed arrays
+
+	Where a :class:`SettingsTurnDict` holds a :class:`WindowDict` for every
+	turn, this holds one array of turns, one array of ticks, and one list of
+	values, all sorted by turn and tick. This takes a small fraction of the
+	memory, at the cost of a little more arithmetic on every lookup.
+
+	Looking up a turn gets you a :class:`ColumnarTickView`, which has
+	the same API as the :class:`WindowDict` you'd get from a
+	:class:`SettingsTurnDict`.
+
+	"""
+	__slots__ = ('_turns', '_ticks', '_vals', '_lock')
+	_turns: array
+	_ticks: array
+	_vals: List[Any]
+	cls = WindowDict
+
+	def __init__(
+			self,
+			data: Union[List[Tuple[int, Any]], Dict[int, Any]] = None) -> None:
+		self._lock = Lock()
+		self._turns = array('q')
+		self._ticks = array('q')
+		self._vals = []
+		if not data:
+			return
+		if isinstance(data, Mapping):
+			data = data.items()
+		for turn, ticks in sorted(data, key=get0):
+			self[turn] = ticks
+
+	def _turn_bounds(self, turn: int) -> Tuple[int, int]:
+		"""Return the slice of my columns that holds the given turn"""
+		turns = self._turns
+		lo = bisect_left(turns, turn)
+		return lo, bisect_right(turns, turn, lo)
+
+	def _iter_turns(self, start: int, stop: int) -> Iterable[int]:
+		"""Iterate over the distinct turns in a slice of my columns"""
+		turns = self._turns
+		while start < stop:
+			turn = turns[start]
+			yield turn
+			start = bisect_right(turns, turn, start, stop)
+
+	def _delete_rows(self, start: int, stop: int) -> None:
+		if start >= stop:
+			return
+		del self._turns[start:stop]
+		del self._ticks[start:stop]
+		del self._vals[start:stop]
+
+	@property
+	def beginning(self) -> Optional[int]:
+		if not self._turns:
+			return None
+		return self._turns[0]
+
+	@property
+	def end(self) -> Optional[int]:
+		if not self._turns:
+			return None
+		return self._turns[-1]
+
+	def future(self, rev: int = None) -> ColumnarTurnsFutureView:
+		"""Return a Mapping of turns after the given one.
+
+		Default is the last turn.
+
+		"""
+		if rev is None:
+			rev = self.end
+		return ColumnarTurnsFutureView(self, rev)
+
+	def past(self, rev: int = None) -> ColumnarTurnsPastView:
+		"""Return a Mapping of turns at or before the given one.
+
+		Default is the last turn.
+
+		"""
+		if rev is None:
+			rev = self.end
+		return ColumnarTurnsPastView(self, rev)
+
+	def rev_gettable(self, rev: int) -> bool:
+		turns = self._turns
+		return bool(turns) and rev >= turns[0]
+
+	def rev_before(self, rev: int):
+		"""Return the latest past turn on which the value changed."""
+		i = bisect_right(self._turns, rev)
+		if i:
+			return self._turns[i - 1]
+
+	def rev_after(self, rev: int):
+		"""Return the earliest future turn on which the value will change."""
+		i = bisect_right(self._turns, rev)
+		if i < len(self._turns):
+			return self._turns[i]
+
+	def initial(self) -> ColumnarTickView:
+		"""Return the ticks of the earliest turn we have"""
+		if not self._turns:
+			raise KeyError("No data")
+		return ColumnarTickView(self, self._turns[0])
+
+	def final(self) -> ColumnarTickView:
+		"""Return the ticks of the latest turn we have"""
+		if not self._turns:
+			raise KeyError("No data")
+		return ColumnarTickView(self, self._turns[-1])
+
+	def truncate(self, rev: int, direction: Direction = 'forward') -> None:
+		"""Delete everything after the given turn, exclusive.
+
+		With direction='backward', delete everything before the turn,
+		exclusive, instead.
+
+		"""
+		with self._lock:
+			if direction == 'forward':
+				self._delete_rows(bisect_right(self._turns, rev),
+									len(self._turns))
+			elif direction == 'backward':
+				self._delete_rows(0, bisect_left(self._turns, rev))
+			else:
+				raise ValueError("Need direction 'forward' or 'backward'")
+
+	def retrieve(self, turn: int, tick: int) -> Any:
+		"""Retrieve the value that was in effect at this turn and tick
+
+		Whether or not it was *set* at this turn and tick
+
+		"""
+		with self._lock:
+			turns = self._turns
+			ticks = self._ticks
+			lo = bisect_left(turns, turn)
+			hi = bisect_right(turns, turn, lo)
+			i = bisect_right(ticks, tick, lo, hi)
+			if i:
+				return self._vals[i - 1]
+		raise KeyError(f"Can't retrieve turn {turn}, tick {tick}")
+
+	def retrieve_exact(self, turn: int, tick: int) -> Any:
+		"""Retrieve the value only if it was set at this exact turn and tick"""
+		with self._lock:
+			lo, hi = self._turn_bounds(turn)
+			if lo == hi:
+				raise KeyError(f"No data in turn {turn}")
+			i = bisect_left(self._ticks, tick, lo, hi)
+			if i == hi or self._ticks[i] != tick:
+				raise KeyError(f"No data for tick {tick} in turn {turn}")
+			return self._vals[i]
+
+	def store_at(self, turn: int, tick: int, value: Any) -> None:
+		"""Set a value at a time, creating the turn if needed"""
+		with self._lock:
+			turns = self._turns
+			ticks = self._ticks
+			if not turns or (turn, tick) > (turns[-1], ticks[-1]):
+				turns.append(turn)
+				ticks.append(tick)
+				self._vals.append(value)
+				return
+			lo, hi = self._turn_bounds(turn)
+			i = bisect_left(ticks, tick, lo, hi)
+			if i < hi and ticks[i] == tick:
+				self._vals[i] = value
+			else:
+				turns.insert(i, turn)
+				ticks.insert(i, tick)
+				self._vals.insert(i, value)
+
+	def copy(self):
+		with self._lock:
+			empty = self.__class__.__new__(self.__class__)
+			empty._lock = Lock()
+			empty._turns = self._turns[:]
+			empty._ticks = self._ticks[:]
+			empty._vals = self._vals.copy()
+			return empty
+
+	def keys(self) -> KeysView:
+		return KeysView(self)
+
+	def items(self) -> ItemsView:
+		return ItemsView(self)
+
+	def values(self) -> ValuesView:
+		return ValuesView(self)
+
+	def __bool__(self) -> bool:
+		return bool(self._turns)
+
+	def __len__(self) -> int:
+		return sum(1 for _ in self._iter_turns(0, len(self._turns)))
+
+	def __iter__(self) -> Iterable[int]:
+		yield from self._iter_turns(0, len(self._turns))
+
+	def __contains__(self, turn: int) -> bool:
+		turns = self._turns
+		i = bisect_left(turns, turn)
+		return i < len(turns) and turns[i] == turn
+
+	def __getitem__(self, turn: int) -> ColumnarTickView:
+		"""Get the ticks of the latest turn at or before this one"""
+		i = bisect_right(self._turns, turn)
+		if not i:
+			raise HistoricKeyError(
+				"Revision {} is before the start of history".format(turn))
+		return ColumnarTickView(self, self._turns[i - 1])
+
+	def __setitem__(self, turn: int, value: Any) -> None:
+		"""Replace all the ticks in a turn"""
+		if isinstance(value, Mapping):
+			value = value.items()
+		items = sorted(value, key=get0)
+		with self._lock:
+			lo, hi = self._turn_bounds(turn)
+			self._turns[lo:hi] = array('q', [turn] * len(items))
+			self._ticks[lo:hi] = array('q', map(get0, items))
+			self._vals[lo:hi] = map(get1, items)
+
+	def __delitem__(self, turn: int) -> None:
+		"""Delete all the ticks in a turn
+
+		Turns with no ticks don't exist, so deleting one does nothing.
+
+		"""
+		with self._lock:
+			self._delete_rows(*self._turn_bounds(turn))
+
+	def __repr__(self) -> str:
+		return "{}({})".format(
+			self.__class__.__name__,
+			{turn: dict(ticks.items())
+				for (turn, ticks) in self.items()})
@@ -12,6 +12,7 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from bisect import bisect_left, bisect_right
 from functools import partial
 from operator import sub, or_
 
@@ -24,8 +25,8 @@ from .allegedb.cache import (
 	HistoricKeyError,
 	EntitylessCache,
 )
-from .util import singleton_get, sort_set
-from collections import OrderedDict
+from .util import singleton_get, sort_set, set_bit, has_bit, iter_bits
+from threading import RLock
 
 
 class InitializedCache(Cache):
@@ -59,6 +60,42 @@ class InitializedEntitylessCache(EntitylessCache, InitializedCache):
 	__slots__ = ()
 
 
+class RulebookUsersCache(InitializedCache):
+	"""A cache of which rulebook each node or portal uses
+
+	Besides the usual, ``users`` maps each rulebook to the entities that
+	have ever been set to use it. Those might have changed rulebooks
+	since, so check with :meth:`retrieve` before trusting it.
+
+	"""
+
+	__slots__ = ("users",)
+
+	def __init__(self, db):
+		super().__init__(db)
+		self.users = {}
+
+	def store(self, *args, planning=None, loading=False, contra=True):
+		super().store(
+			*args, planning=planning, loading=loading, contra=contra
+		)
+		self.users.setdefault(args[-1], set()).add(args[:-4])
+
+	def iter_users(self, rulebook, branch, turn, tick):
+		"""Iterate over the entities set to use ``rulebook`` at the time
+
+		Not including those using it by default, having never been set to
+		use any rulebook.
+
+		"""
+		for entity in self.users.get(rulebook, ()):
+			try:
+				if self.retrieve(*entity, branch, turn, tick) == rulebook:
+					yield entity
+			except KeyError:
+				continue
+
+
 class UnitnessCache(Cache):
 	"""A cache for remembering when a node is a unit of a character."""
 
@@ -314,11 +351,27 @@ class UnitnessCache(Cache):
 
 
 class RulesHandledCache(object):
+	"""Which rules have been handled for which entities, in which turns
+
+	Each entity gets a number the first time it's found to have rules,
+	which doesn't change after. ``handled`` maps ``(rulebook, branch,
+	turn)`` to a dictionary holding a bitmap for each rule, in which the
+	numbers of the entities that had the rule handled are set.
+
+	``handled_deep`` has the last rule handled in each tick, for stepping
+	through a turn.
+
+	"""
+
+	kind = None
+
 	def __init__(self, engine):
 		self.engine = engine
+		self.entities = []
+		self.entity_index = {}
 		self.handled = {}
 		self.handled_deep = StructuredDefaultDict(1, type=WindowDict)
-		self.unhandled = {}
+		self._lock = RLock()
 
 	def get_rulebook(self, *args):
 		raise NotImplementedError
@@ -326,55 +379,108 @@ class RulesHandledCache(object):
 	def iter_unhandled_rules(self, branch, turn, tick):
 		raise NotImplementedError
 
+	def index_entity(self, entity) -> int:
+		"""Return the entity's number, giving it one if it lacks it"""
+		with self._lock:
+			if entity in self.entity_index:
+				return self.entity_index[entity]
+			i = self.entity_index[entity] = len(self.entities)
+			self.entities.append(entity)
+			self.engine.query.rules_handled_entity(self.kind, i, entity)
+			return i
+
+	def load_entity(self, i, entity):
+		"""Give the entity the number it had in the database"""
+		entities = self.entities
+		if i >= len(entities):
+			entities.extend([None] * (i + 1 - len(entities)))
+		entities[i] = entity
+		self.entity_index[entity] = i
+
 	def store(self, *args, loading=False):
+		"""Record that a rule was handled for an entity
+
+		Unless ``loading=True``, save it to the database as well.
+
+		"""
 		entity = args[:-5]
 		rulebook, rule, branch, turn, tick = args[-5:]
-		self.handled.setdefault(entity + (rulebook, branch, turn), set()).add(
-			rule
-		)
-		self.handled_deep[branch][turn][tick] = (entity, rulebook, rule)
-		unhandl = (
-			self.unhandled.setdefault(entity, {})
-			.setdefault(rulebook, {})
-			.setdefault(branch, {})
-		)
-		if turn not in unhandl:
-			unhandl[turn] = list(
-				self.unhandled_rulebook_rules(
-					entity, rulebook, branch, turn, tick
+		with self._lock:
+			i = self.index_entity(entity)
+			rules = self.handled.setdefault((rulebook, branch, turn), {})
+			if rule not in rules:
+				rules[rule] = bytearray()
+			set_bit(rules[rule], i)
+			self.handled_deep[branch][turn][tick] = (entity, rulebook, rule)
+			if not loading:
+				self.engine.query.handled_rule(
+					self.kind, rulebook, rule, branch, turn, tick, i
 				)
-			)
-		try:
-			unhandl[turn].remove(rule)
-		except ValueError:
+
+	def load_bitmap(self, rulebook, rule, branch, turn, tick, bitmap):
+		"""Record that a rule was handled at a tick, for all the entities
+		whose bits are set in ``bitmap``"""
+		rules = self.handled.setdefault((rulebook, branch, turn), {})
+		if rule not in rules:
+			rules[rule] = bytearray()
+		mine = rules[rule]
+		if len(mine) < len(bitmap):
+			mine.extend(bytes(len(bitmap) - len(mine)))
+		for byte, b in enumerate(bitmap):
+			mine[byte] |= b
+		last = None
+		for last in iter_bits(bitmap):
 			pass
+		if last is not None:
+			self.handled_deep[branch][turn][tick] = (
+				self.entities[last],
+				rulebook,
+				rule,
+			)
 
 	def retrieve(self, *args):
-		return self.handled[args]
+		"""Return the set of rules handled for the entity, in the rulebook,
+		in the turn"""
+		entity = args[:-3]
+		rulebook, branch, turn = args[-3:]
+		i = self.entity_index[entity]
+		return {
+			rule
+			for (rule, bitmap) in self.handled[rulebook, branch, turn].items()
+			if has_bit(bitmap, i)
+		}
 
 	def unhandled_rulebook_rules(self, *args):
+		"""Return a list of the rules in the rulebook not yet handled for
+		the entity in the turn
+
+		Number the entity, if there are any, so that entities are
+		numbered in the order they're found here, rather than the order
+		their rules happen to be handled in.
+
+		"""
 		entity = args[:-4]
 		rulebook, branch, turn, tick = args[-4:]
-		unh = self.unhandled
-		if entity in unh:
-			ue = unh[entity]
-			if rulebook in ue:
-				uer = ue[rulebook]
-				if branch in uer:
-					uerb = uer[branch]
-					if turn in uerb:
-						return uerb[turn]
 		rbc = self.engine._rulebooks_cache
 		if not rbc.contains_key(rulebook, branch, turn, tick):
 			return []
 		rulebook_rules = rbc.retrieve(rulebook, branch, turn, tick)[0]
-		handled_rules = self.handled.setdefault(
-			entity + (rulebook, branch, turn), set()
-		)
-		return [rule for rule in rulebook_rules if rule not in handled_rules]
+		if not rulebook_rules:
+			return []
+		i = self.index_entity(entity)
+		handled = self.handled.get((rulebook, branch, turn))
+		if not handled:
+			return list(rulebook_rules)
+		return [
+			rule
+			for rule in rulebook_rules
+			if rule not in handled or not has_bit(handled[rule], i)
+		]
 
 
 class CharacterRulesHandledCache(RulesHandledCache):
+	kind = "character"
+
 	def get_rulebook(self, character, branch, turn, tick):
 		try:
 			return self.engine._characters_rulebooks_cache.retrieve(
@@ -399,6 +505,8 @@ class CharacterRulesHandledCache(RulesHandledCache):
 
 
 class UnitRulesHandledCache(RulesHandledCache):
+	kind = "unit"
+
 	def get_rulebook(self, character, branch, turn, tick):
 		try:
 			return self.engine._units_rulebooks_cache.retrieve(
@@ -412,11 +520,13 @@ class UnitRulesHandledCache(RulesHandledCache):
 		for character in sort_set(charm.keys()):
 			rulebook = self.get_rulebook(character, branch, turn, tick)
 			try:
-				prio = self.engine._rulebooks_cache.retrieve(
+				rulebook_rules, prio = self.engine._rulebooks_cache.retrieve(
 					rulebook, branch, turn, tick
-				)[1]
+				)
 			except KeyError:
 				continue
+			if not rulebook_rules:
+				continue
 			charavm = charm[character].unit
 			for graph in sort_set(charavm.keys()):
 				for avatar in sort_set(charavm[graph].keys()):
@@ -437,6 +547,8 @@ class UnitRulesHandledCache(RulesHandledCache):
 
 
 class CharacterThingRulesHandledCache(RulesHandledCache):
+	kind = "character_thing"
+
 	def get_rulebook(self, character, branch, turn, tick):
 		try:
 			return self.engine._characters_things_rulebooks_cache.retrieve(
@@ -450,11 +562,13 @@ class CharacterThingRulesHandledCache(RulesHandledCache):
 		for character in charm.keys():
 			rulebook = self.get_rulebook(character, branch, turn, tick)
 			try:
-				prio = self.engine._rulebooks_cache.retrieve(
+				rulebook_rules, prio = self.engine._rulebooks_cache.retrieve(
 					rulebook, branch, turn, tick
-				)[1]
+				)
 			except KeyError:
 				continue
+			if not rulebook_rules:
+				continue
 			for thing in charm[character].thing.keys():
 				try:
 					rules = self.unhandled_rulebook_rules(
@@ -467,6 +581,8 @@ class CharacterThingRulesHandledCache(RulesHandledCache):
 
 
 class CharacterPlaceRulesHandledCache(RulesHandledCache):
+	kind = "character_place"
+
 	def get_rulebook(self, character, branch, turn, tick):
 		try:
 			return self.engine._characters_places_rulebooks_cache.retrieve(
@@ -480,11 +596,13 @@ class CharacterPlaceRulesHandledCache(RulesHandledCache):
 		for character in charm.keys():
 			rulebook = self.get_rulebook(character, branch, turn, tick)
 			try:
-				prio = self.engine._rulebooks_cache.retrieve(
+				rulebook_rules, prio = self.engine._rulebooks_cache.retrieve(
 					rulebook, branch, turn, tick
-				)[1]
+				)
 			except KeyError:
 				continue
+			if not rulebook_rules:
+				continue
 			for place in charm[character].place.keys():
 				try:
 					rules = self.unhandled_rulebook_rules(
@@ -497,6 +615,8 @@ class CharacterPlaceRulesHandledCache(RulesHandledCache):
 
 
 class CharacterPortalRulesHandledCache(RulesHandledCache):
+	kind = "character_portal"
+
 	def get_rulebook(self, character, branch, turn, tick):
 		try:
 			return self.engine._characters_portals_rulebooks_cache.retrieve(
@@ -540,6 +660,8 @@ class CharacterPortalRulesHandledCache(RulesHandledCache):
 
 
 class NodeRulesHandledCache(RulesHandledCache):
+	kind = "node"
+
 	def get_rulebook(self, character, node, branch, turn, tick):
 		try:
 			return self.engine._nodes_rulebooks_cache.retrieve(
@@ -549,48 +671,37 @@ class NodeRulesHandledCache(RulesHandledCache):
 			return character, node
 
 	def iter_unhandled_rules(self, branch, turn, tick):
-		charm = self.engine.character
-		nodes_with_rulebook_changed = {
-			(character, node)
-			for (
-				character,
-				node,
-				_,
-				_,
-				_,
-			) in self.engine._nodes_rulebooks_cache.shallowest
-		}
-		nodes_with_filled_default_rulebooks = {
-			(character, node)
-			for (_, (character, node)) in (
-				{
-					(None, (character, node))
-					for character in charm
-					for node in charm[character].node
-				}
-				& self.engine._rulebooks_cache.branches.keys()
-			)
-		}
-		for character, node in (
-			nodes_with_rulebook_changed | nodes_with_filled_default_rulebooks
-		):
+		engine = self.engine
+		rbcache = engine._rulebooks_cache
+		users = engine._nodes_rulebooks_cache
+		for _, rulebook in list(rbcache.branches.keys()):
 			try:
-				rulebook = self.get_rulebook(
-					character, node, branch, turn, tick
-				)
-				prio = self.engine._rulebooks_cache.retrieve(
+				rulebook_rules, prio = rbcache.retrieve(
 					rulebook, branch, turn, tick
-				)[1]
-				rules = self.unhandled_rulebook_rules(
-					character, node, rulebook, branch, turn, tick
 				)
 			except KeyError:
 				continue
-			for rule in rules:
-				yield prio, character, node, rulebook, rule
+			if not rulebook_rules:
+				continue
+			nodes = set(users.iter_users(rulebook, branch, turn, tick))
+			if (
+				isinstance(rulebook, tuple)
+				and len(rulebook) == 2
+				and engine._node_exists(*rulebook)
+				and self.get_rulebook(*rulebook, branch, turn, tick)
+				== rulebook
+			):
+				nodes.add(rulebook)
+			for character, node in nodes:
+				for rule in self.unhandled_rulebook_rules(
+					character, node, rulebook, branch, turn, tick
+				):
+					yield prio, character, node, rulebook, rule
 
 
 class PortalRulesHandledCache(RulesHandledCache):
+	kind = "portal"
+
 	def get_rulebook(self, character, orig, dest, branch, turn, tick):
 		try:
 			return self.engine._portals_rulebooks_cache.retrieve(
@@ -600,45 +711,32 @@ class PortalRulesHandledCache(RulesHandledCache):
 			return character, orig, dest
 
 	def iter_unhandled_rules(self, branch, turn, tick):
-		portals_with_rulebook_changed = {
-			(character, orig, dest)
-			for (
-				character,
-				orig,
-				dest,
-				_,
-				_,
-				_,
-			) in self.engine._portals_rulebooks_cache.shallowest
-		}
-		portals_default_rulebooks = {
-			(None, port) for port in self.engine._edges_cache.keys
-		}
-		portals_with_filled_default_rulebooks = {
-			(character, orig, dest)
-			for (_, (character, orig, dest)) in (
-				portals_default_rulebooks
-				& self.engine._rulebooks_cache.branches.keys()
-			)
-		}
-		for character, orig, dest in (
-			portals_with_rulebook_changed
-			| portals_with_filled_default_rulebooks
-		):
+		engine = self.engine
+		rbcache = engine._rulebooks_cache
+		users = engine._portals_rulebooks_cache
+		for _, rulebook in list(rbcache.branches.keys()):
 			try:
-				rulebook = self.get_rulebook(
-					character, orig, dest, branch, turn, tick
-				)
-				prio = self.engine._rulebooks_cache.retrieve(
+				rulebook_rules, prio = rbcache.retrieve(
 					rulebook, branch, turn, tick
-				)[1]
-				rules = self.unhandled_rulebook_rules(
-					character, orig, dest, rulebook, branch, turn, tick
 				)
 			except KeyError:
 				continue
-			for rule in rules:
-				yield prio, character, orig, dest, rulebook, rule
+			if not rulebook_rules:
+				continue
+			portals = set(users.iter_users(rulebook, branch, turn, tick))
+			if (
+				isinstance(rulebook, tuple)
+				and len(rulebook) == 3
+				and engine._edge_exists(*rulebook)
+				and self.get_rulebook(*rulebook, branch, turn, tick)
+				== rulebook
+			):
+				portals.add(rulebook)
+			for character, orig, dest in portals:
+				for rule in self.unhandled_rulebook_rules(
+					character, orig, dest, rulebook, branch, turn, tick
+				):
+					yield prio, character, orig, dest, rulebook, rule
 
 
 class ThingsCache(Cache):
@@ -649,96 +747,53 @@ class ThingsCache(Cache):
 		self._make_node = db.thing_cls
 
 	def store(self, *args, planning=None, loading=False, contra=True):
-		character, thing, branch, turn, tick, location = args
 		with self._lock:
-			try:
-				oldloc = self.retrieve(character, thing, branch, turn, tick)
-			except KeyError:
-				oldloc = None
 			super().store(
 				*args, planning=planning, loading=loading, contra=contra
 			)
+			self.db._node_contents_cache.store(*args)
+
+	def set_keyframe(self, graph, branch, turn, tick, keyframe):
+		with self._lock:
+			super().set_keyframe(graph, branch, turn, tick, keyframe)
 			node_contents_cache = self.db._node_contents_cache
-			# Cache the contents of nodes
-			if oldloc is not None:
-				oldconts_orig = node_contents_cache.retrieve(
-					character, oldloc, branch, turn, tick
-				)
-				newconts_orig = oldconts_orig.difference({thing})
-				node_contents_cache.store(
-					character,
-					oldloc,
-					branch,
-					turn,
-					tick,
-					newconts_orig,
-					contra=False,
-					loading=True,
-				)
-				future_location_data = node_contents_cache.settings[
-					branch
-				].future(turn)
-				todo = []
-				for trn in future_location_data:
-					for tck in future_location_data[trn]:
-						char, loca, contents = future_location_data[trn][tck]
-						if char == character and loca == oldloc:
-							todo.append((trn, tck))
-				for trn, tck in todo:
-					node_contents_cache.store(
-						character,
-						oldloc,
-						branch,
-						trn,
-						tck,
-						node_contents_cache.retrieve(
-							character, oldloc, branch, trn, tck
-						).difference({thing}),
-						planning=False,
-						contra=False,
-						loading=True,
-					)
-			if location is not None:
-				try:
-					oldconts_dest = node_contents_cache.retrieve(
-						character, location, branch, turn, tick
-					)
-				except KeyError:
-					oldconts_dest = frozenset()
-				newconts_dest = oldconts_dest.union({thing})
+			for thing, location in keyframe.items():
 				node_contents_cache.store(
-					character,
-					location,
-					branch,
-					turn,
-					tick,
-					newconts_dest,
-					contra=False,
-					loading=True,
+					graph, thing, branch, turn, tick, location
 				)
-				future_location_data = node_contents_cache.settings[
-					branch
-				].future(turn)
-				todo = []
-				for trn in future_location_data:
-					for tck in sorted(future_location_data[trn]):
-						char, loca, contents = future_location_data[trn][tck]
-						if char == character and loca == location:
-							todo.append((trn, tck))
-				for trn, tck in todo:
-					node_contents_cache.store(
-						character,
-						location,
-						branch,
-						trn,
-						tck,
-						node_contents_cache.retrieve(
-							character, location, branch, trn, tck
-						).union({thing}),
-						planning=False,
-						contra=False,
-						loading=True,
-					)
+
+	def remove(self, branch, turn, tick):
+		with self._lock:
+			_, character, thing = self.time_entity[branch, turn, tick]
+			super().remove(branch, turn, tick)
+			node_contents_cache = self.db._node_contents_cache
+			node_contents_cache.remove(character, thing, branch, turn, tick)
+			try:
+				location = self.keyframe[character,][branch][turn][tick][
+					thing
+				]
+			except KeyError:
+				return
+			node_contents_cache.store(
+				character, thing, branch, turn, tick, location
+			)
+
+	def truncate(self, branch, turn, tick, direction="forward"):
+		with self._lock:
+			super().truncate(branch, turn, tick, direction)
+			self.db._node_contents_cache.truncate(
+				branch, turn, tick, direction
+			)
+
+	def remove_branch(self, branch):
+		with self._lock:
+			super().remove_branch(branch)
+			self.db._node_contents_cache.remove_branch(branch)
+
+	def remove_character(self, character):
+		with self._lock:
+			super().remove_character(character)
+			self.db._node_contents_cache.remove_character(character)
 
 	def turn_before(self, character, thing, branch, turn):
 		with self._lock:
@@ -757,90 +812,216 @@ class ThingsCache(Cache):
 			return self.keys[(character,)][thing][branch].rev_after(turn)
 
 
-class NodeContentsCache(Cache):
+class NodeContentsIntervals:
+	"""The spans of time when things were in one node, in one branch
+
+	Spans that haven't ended are in ``open``, keyed by the thing. The
+	rest are in ``closed`` as ``(start, thing)`` pairs, sorted by when
+	they ended, which is in ``ends``.
+
+	"""
+
+	__slots__ = ("open", "ends", "closed")
+
+	def __init__(self):
+		self.open = {}
+		self.ends = []
+		self.closed = []
+
+	def __bool__(self):
+		return bool(self.open) or bool(self.ends)
+
+	def add(self, thing, start, end):
+		if end is None:
+			self.open[thing] = start
+			return
+		i = bisect_right(self.ends, end)
+		self.ends.insert(i, end)
+		self.closed.insert(i, (start, thing))
+
+	def discard(self, thing, start, end):
+		if end is None:
+			if thing in self.open and self.open[thing] == start:
+				del self.open[thing]
+			return
+		ends = self.ends
+		closed = self.closed
+		i = bisect_left(ends, end)
+		while i < len(ends) and ends[i] == end:
+			if closed[i] == (start, thing):
+				del ends[i]
+				del closed[i]
+				return
+			i += 1
+
+	def overlapping(self, time):
+		"""Iterate over things whose spans include ``(turn, tick)``"""
+		for thing, start in self.open.items():
+			if start <= time:
+				yield thing
+		closed = self.closed
+		for i in range(bisect_right(self.ends, time), len(closed)):
+			start, thing = closed[i]
+			if start <= time:
+				yield thing
+
+
+class NodeContentsCache:
+	"""What things are in each node, worked out from where they went
+
+	For each thing, in each branch, I keep the times it moved, and where
+	to; and for each node, :class:`NodeContentsIntervals` of when things
+	were in it. To get a node's contents at some time, I collect the
+	things whose spans include that time, in its branch and those it
+	descends from, and keep the ones that the things cache agrees are
+	there.
+
+	So moving a thing only changes the spans on either side of the
+	move, however much is planned for the future.
+
+	The things cache keeps me up to date.
+
+	"""
+
 	name = "node_contents_cache"
 
-	def _iter_future_contradictions(
-		self, entity, key, turns, branch, turn, tick, value
-	):
-		return self.db._things_cache._iter_future_contradictions(
-			entity, key, turns, branch, turn, tick, value
-		)
+	def __init__(self, db):
+		self.db = db
+		self.moves = {}
+		self.intervals = {}
 
-	def remove(self, branch, turn, tick):
-		"""Delete data on or after this tick
+	def _add(self, character, node, branch, thing, start, end):
+		if node is None:
+			return
+		key = (character, node, branch)
+		if key not in self.intervals:
+			self.intervals[key] = NodeContentsIntervals()
+		self.intervals[key].add(thing, start, end)
+
+	def _discard(self, character, node, branch, thing, start, end):
+		key = (character, node, branch)
+		if node is None or key not in self.intervals:
+			return
+		intervals = self.intervals[key]
+		intervals.discard(thing, start, end)
+		if not intervals:
+			del self.intervals[key]
+
+	def _index(self, character, thing, branch, discard=False):
+		"""Add, or with ``discard=True`` remove, all of a thing's spans
+		in the branch"""
+		times, locations = self.moves[character, thing][branch]
+		ends = times[1:] + [None]
+		meth = self._discard if discard else self._add
+		for start, end, location in zip(times, ends, locations):
+			meth(character, location, branch, thing, start, end)
+
+	def store(self, character, thing, branch, turn, tick, location):
+		"""Record that the thing moved to the location at this time"""
+		time = (turn, tick)
+		branches = self.moves.setdefault((character, thing), {})
+		if branch not in branches:
+			branches[branch] = ([], [])
+		times, locations = branches[branch]
+		i = bisect_left(times, time)
+		if i < len(times) and times[i] == time:
+			end = times[i + 1] if i + 1 < len(times) else None
+			self._discard(
+				character, locations[i], branch, thing, time, end
+			)
+			locations[i] = location
+			self._add(character, location, branch, thing, time, end)
+			return
+		end = times[i] if i < len(times) else None
+		if i > 0:
+			prev = times[i - 1]
+			self._discard(
+				character, locations[i - 1], branch, thing, prev, end
+			)
+			self._add(character, locations[i - 1], branch, thing, prev, time)
+		times.insert(i, time)
+		locations.insert(i, location)
+		self._add(character, location, branch, thing, time, end)
 
-		On the assumption that the future has been invalidated.
+	def remove(self, character, thing, branch, turn, tick):
+		"""Forget the thing's move at this time, if there was one"""
+		time = (turn, tick)
+		try:
+			times, locations = self.moves[character, thing][branch]
+		except KeyError:
+			return
+		i = bisect_left(times, time)
+		if i == len(times) or times[i] != time:
+			return
+		end = times[i + 1] if i + 1 < len(times) else None
+		self._discard(character, locations[i], branch, thing, time, end)
+		if i > 0:
+			prev = times[i - 1]
+			self._discard(
+				character, locations[i - 1], branch, thing, prev, time
+			)
+			self._add(character, locations[i - 1], branch, thing, prev, end)
+		del times[i]
+		del locations[i]
+
+	def truncate(self, branch, turn, tick, direction="forward"):
+		"""Forget moves after this time, or with ``direction='backward'``,
+		before it
+
+		The last move before the time is kept in the latter case, since
+		it says where the thing was at the time.
 
 		"""
-		with self._lock:
-			assert not self.parents  # not how stuff is stored in this cache
-			for branchkey, branches in list(self.branches.items()):
-				if branch in branches:
-					branhc = branches[branch]
-					if turn in branhc:
-						trun = branhc[turn]
-						if tick in trun:
-							del trun[tick]
-						trun.truncate(tick)
-						if not trun:
-							del branhc[turn]
-					branhc.truncate(turn)
-					if not branhc:
-						del branches[branch]
-				if not branches:
-					del self.branches[branchkey]
-			for keykey, keys in list(self.keys.items()):
-				for key, branchs in list(keys.items()):
-					if branch in branchs:
-						branhc = branchs[branch]
-						if turn in branhc:
-							trun = branhc[turn]
-							if tick in trun:
-								del trun[tick]
-							trun.truncate(tick)
-							if not trun:
-								del branhc[turn]
-						branhc.truncate(turn)
-						if not branhc:
-							del branchs[branch]
-					if not branchs:
-						del keys[key]
-				if not keys:
-					del self.keys[keykey]
-			sets = self.settings[branch]
-			if turn in sets:
-				setsturn = sets[turn]
-				if tick in setsturn:
-					del setsturn[tick]
-				setsturn.truncate(tick)
-				if not setsturn:
-					del sets[turn]
-			sets.truncate(turn)
-			if not sets:
-				del self.settings[branch]
-			presets = self.presettings[branch]
-			if turn in presets:
-				presetsturn = presets[turn]
-				if tick in presetsturn:
-					del presetsturn[tick]
-				presetsturn.truncate(tick)
-				if not presetsturn:
-					del presets[turn]
-			presets.truncate(turn)
-			if not presets:
-				del self.presettings[branch]
-			for entity, brnch in list(self.keycache):
-				if brnch == branch:
-					kc = self.keycache[entity, brnch]
-					if turn in kc:
-						kcturn = kc[turn]
-						if tick in kcturn:
-							del kcturn[tick]
-						kcturn.truncate(tick)
-						if not kcturn:
-							del kc[turn]
-					kc.truncate(turn)
-					if not kc:
-						del self.keycache[entity, brnch]
-			self.shallowest = OrderedDict()
+		if direction not in {"forward", "backward"}:
+			raise ValueError("Illegal direction")
+		time = (turn, tick)
+		for (character, thing), branches in self.moves.items():
+			if branch not in branches:
+				continue
+			times, locations = branches[branch]
+			if direction == "forward":
+				start, stop = 0, bisect_right(times, time)
+			else:
+				start, stop = max(bisect_left(times, time) - 1, 0), None
+			if start == 0 and (stop is None or stop == len(times)):
+				continue
+			self._index(character, thing, branch, discard=True)
+			branches[branch] = (times[start:stop], locations[start:stop])
+			self._index(character, thing, branch)
+
+	def remove_branch(self, branch):
+		for branches in self.moves.values():
+			if branch in branches:
+				del branches[branch]
+		for key in [key for key in self.intervals if key[2] == branch]:
+			del self.intervals[key]
+
+	def remove_character(self, character):
+		for key in [key for key in self.moves if key[0] == character]:
+			del self.moves[key]
+		for key in [key for key in self.intervals if key[0] == character]:
+			del self.intervals[key]
+
+	def retrieve(self, character, node, branch, turn, tick):
+		"""Return a frozenset of the things in the node at this time"""
+		db = self.db
+		things_cache = db._things_cache
+		intervals = self.intervals
+		candidates = set()
+		with things_cache._lock:
+			for b, r, t in db._iter_parent_btt(branch, turn, tick):
+				if (character, node, b) in intervals:
+					candidates.update(
+						intervals[character, node, b].overlapping((r, t))
+					)
+			contents = []
+			for thing in candidates:
+				try:
+					location = things_cache.retrieve(
+						character, thing, branch, turn, tick
+					)
+				except KeyError:
+					continue
+				if location == node:
+					contents.append(thing)
+		return frozenset(contents)
@@ -40,13 +40,16 @@ from typing import Type
 from blinker import Signal
 
 import networkx as nx
-from .allegedb.cache import FuturistWindowDict, PickyDefaultDict
+from .allegedb import Key
+from .allegedb.cache import PickyDefaultDict
 from .allegedb.graph import (
 	DiGraph,
+	GraphMapping,
 	GraphNodeMapping,
 	DiGraphSuccessorsMapping,
 	DiGraphPredecessorsMapping,
 )
+from .allegedb.window import FuturistWindowDict
 from .allegedb.wrap import MutableMappingUnwrapper
 
 from .xcollections import CompositeDict
@@ -54,6 +57,7 @@ from .rule import RuleMapping
 from .rule import RuleFollower as BaseRuleFollower
 from .node import Node, Place, Thing
 from .portal import Portal
+from .snapshot import CharacterSnapshot, PathCache
 from .util import (
 	getatt,
 	singleton_get,
@@ -121,6 +125,13 @@ class CharRuleMapping(RuleMapping):
 		self._table = booktyp + "_rules"
 
 
+def _unrecordable(engine) -> None:
+	"""Don't let the running trigger be skipped for its stats alone"""
+	reads = engine._trigger_reads
+	if reads is not None:
+		reads.unrecordable()
+
+
 class RuleFollower(BaseRuleFollower):
 	"""Mixin class. Has a rulebook, which you can get a RuleMapping into."""
 
@@ -730,6 +741,7 @@ class Character(DiGraph, AbstractCharacter, RuleFollower):
 	def __init__(self, engine, name, *, init_rulebooks=True):
 		super().__init__(engine, name)
 		self._avatars_cache = PickyDefaultDict(FuturistWindowDict)
+		self._paths = PathCache(self)
 		if not init_rulebooks:
 			return
 		cachemap = {
@@ -988,6 +1000,19 @@ class Character(DiGraph, AbstractCharacter, RuleFollower):
 
 	node_map_cls = ThingPlaceMapping
 
+	class CharacterStatMapping(GraphMapping):
+		"""GraphMapping that lets the rules engine see what triggers read"""
+
+		__slots__ = ("__weakref__",)
+
+		def __getitem__(self, item):
+			reads = self.db._trigger_reads
+			if reads is not None:
+				reads.record(self, item)
+			return super().__getitem__(item)
+
+	graph_map_cls = CharacterStatMapping
+
 	class PortalSuccessorsMapping(DiGraphSuccessorsMapping, RuleFollower):
 		"""Mapping of nodes that have at least one outgoing edge.
 
@@ -1012,7 +1037,16 @@ class Character(DiGraph, AbstractCharacter, RuleFollower):
 		def _get_rulebook_cache(self):
 			return self._cporh
 
+		def __contains__(self, orig):
+			_unrecordable(self.engine)
+			return super().__contains__(orig)
+
+		def __iter__(self):
+			_unrecordable(self.engine)
+			return super().__iter__()
+
 		def __getitem__(self, orig):
+			_unrecordable(self.engine)
 			node_exists, charn, cache = self._getitem_stuff
 			if node_exists(charn, orig):
 				if orig not in cache:
@@ -1292,6 +1326,18 @@ class Character(DiGraph, AbstractCharacter, RuleFollower):
 		def _get_rulebook_cache(self):
 			return self._cporc
 
+		def __contains__(self, dest):
+			_unrecordable(self.graph.engine)
+			return super().__contains__(dest)
+
+		def __getitem__(self, dest):
+			_unrecordable(self.graph.engine)
+			return super().__getitem__(dest)
+
+		def __iter__(self):
+			_unrecordable(self.graph.engine)
+			return super().__iter__()
+
 		class Predecessors(DiGraphPredecessorsMapping.Predecessors):
 			"""Mapping of possible origins from some destination."""
 
@@ -1497,6 +1543,17 @@ class Character(DiGraph, AbstractCharacter, RuleFollower):
 		"""
 		return Facade(self)
 
+	def snapshot(self, weight: Key = None) -> CharacterSnapshot:
+		"""Return a frozen copy of my places and portals as they are now
+
+		A :class:`LiSE.snapshot.CharacterSnapshot` keeps its portals in
+		arrays, and doesn't look anything up in the world's history, so
+		pathfinding on it is much faster than on me. Only the ``weight``
+		stat of each portal gets copied.
+
+		"""
+		return CharacterSnapshot(self, weight)
+
 	def add_place(self, node_for_adding, **attr):
 		"""Add a new Place"""
 		self.add_node(node_for_adding, **attr)
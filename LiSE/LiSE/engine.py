@@ -25,12 +25,15 @@ import sys
 import os
 from concurrent.futures import ThreadPoolExecutor, wait
 from functools import partial
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from types import FunctionType, ModuleType, MethodType
 from typing import Union, Tuple, Any, Set, List, Type, Optional
 from os import PathLike
 from abc import ABC, abstractmethod
 from random import Random
+from threading import local, Lock
+from time import monotonic
+from weakref import ref
 
 import networkx as nx
 from networkx import (
@@ -57,6 +60,9 @@ from .xcollections import StringStore, FunctionStore, MethodStore
 from .query import (
 	Query,
 	_make_side_sel,
+	_make_side_cmp_sel,
+	_is_sql_number,
+	_getcol,
 	StatusAlias,
 	ComparisonQuery,
 	CompoundQuery,
@@ -64,11 +70,15 @@ from .query import (
 	QueryResult,
 	QueryResultEndTurn,
 	CombinedQueryResult,
+	StandingQuery,
+	TurnIntervals,
 )
 from .character import Character
+from .rule import EntityBatch
 from .node import Place, Thing
 from .portal import Portal
 from .query import QueryEngine
+from .worker import entity_spec
 from . import exc
 
 
@@ -76,6 +86,41 @@ class InnerStopIteration(StopIteration):
 	pass
 
 
+TRIGGER_MEMO_MAXSIZE = 65536
+"""How many rules' trigger reads, per entity, to remember at most"""
+
+
+class TriggerReads(local):
+	"""The stats that the trigger running in this thread has looked at
+
+	Accessors of things other than stats, such as the contents of a
+	place, the portals of a node, universal variables, the turn, or
+	the random number generator, call :meth:`unrecordable`. Then the
+	trigger's reads aren't remembered at all, since they don't account
+	for everything it looked at.
+
+	"""
+
+	log: Optional[list] = None
+
+	def record(self, mapping, key) -> None:
+		if self.log is not None:
+			self.log.append((mapping, key))
+
+	def unrecordable(self) -> None:
+		self.log = None
+
+
+def _read_stat(mapping, key):
+	try:
+		ret = mapping[key]
+	except KeyError:
+		return KeyError
+	if hasattr(ret, "unwrap"):
+		return ret.unwrap()
+	return ret
+
+
 class DummyEntity(dict):
 	"""Something to use in place of a node or edge"""
 
@@ -246,7 +291,9 @@ class Engine(AbstractEngine, gORM):
 		this if your game generates new initial conditions for each
 		playthrough.
 	:param connect_string: a rfc1738 URI for a database to connect to. Leave
-		``None`` to use the SQLite database in the ``prefix``.
+		``None`` to use the SQLite database in the ``prefix``. Use
+		``memory://`` to keep the world in memory without SQL, or
+		``lmdb:///some/path`` to keep it in an LMDB environment.
 	:param connect_args: dictionary of keyword arguments for the
 		database connection
 	:param schema: a Schema class that determines which changes to allow to
@@ -285,7 +332,29 @@ class Engine(AbstractEngine, gORM):
 		if you're not using the rules engine.
 	:param parallel_triggers: Whether to evaluate trigger functions in threads.
 		This has performance benefits if you are using a free-threaded build of
-		Python (without a GIL). Default ``True``.
+		Python (without a GIL). Default ``True``. Pass ``"process"`` to
+		evaluate them in worker processes instead, each with its own copy
+		of the world as it is at the moment. Triggers that look at history
+		or use the engine's random number generator won't work properly
+		that way.
+	:param incremental_triggers: Whether to remember which stats each
+		trigger looked at when it didn't fire, and skip checking it again
+		until one of those stats changes. Triggers that look at anything
+		else LiSE knows about, like the contents of a place, the turn, or
+		the random number generator, are checked every time. So are those
+		added with :meth:`Rule.volatile_trigger`; use it for triggers that
+		look at something outside the world, such as the clock.
+		Default ``False``.
+	:param columnar_history: Whether to keep the history of node and portal
+		stats in compact arrays, rather than dictionaries. Uses much less
+		memory in big worlds, at some cost to lookup speed. Default ``False``.
+	:param keyframe_budget: How many seconds loading history from the
+		nearest keyframe should take. If set, LiSE times every load, and
+		adjusts ``keyframe_interval`` so that replaying the records since the
+		last keyframe fits in the budget. ``keyframe_interval`` is then only
+		the starting point. Keyframes in branches that weren't visited get
+		pruned on close, leaving the earliest in each. Can't be used with
+		``keyframe_interval=None``. Default ``None``.
 
 	"""
 
@@ -331,8 +400,21 @@ class Engine(AbstractEngine, gORM):
 		keyframe_on_close: bool = True,
 		cache_arranger: bool = False,
 		enforce_end_of_time: bool = True,
-		parallel_triggers: bool = True,
+		parallel_triggers: Union[bool, str] = True,
+		incremental_triggers: bool = False,
+		columnar_history: bool = False,
+		keyframe_budget: Optional[float] = None,
 	):
+		if keyframe_budget is not None and keyframe_interval is None:
+			raise ValueError(
+				"keyframe_budget works by changing keyframe_interval, "
+				"so it can't be None"
+			)
+		self.keyframe_budget = keyframe_budget
+		self._replay_cost: Optional[float] = None
+		self._trigger_reads = TriggerReads() if incremental_triggers else None
+		self._trigger_memo = OrderedDict()
+		self._trigger_memo_lock = Lock()
 		if logfun is None:
 			from logging import getLogger
 
@@ -399,11 +481,19 @@ class Engine(AbstractEngine, gORM):
 			cache_arranger=cache_arranger,
 			main_branch=main_branch,
 			enforce_end_of_time=enforce_end_of_time,
+			columnar_history=columnar_history,
 		)
 		self._things_cache.setdb = self.query.set_thing_loc
 		self._universal_cache.setdb = self.query.universal_set
 		self._rulebooks_cache.setdb = self.query.rulebook_set
 		self.eternal = self.query.globl
+		self._batch_triggers = {
+			rule: frozenset(names)
+			for (rule, names) in self.eternal.get("batch_triggers", {}).items()
+		}
+		self._volatile_triggers = set(
+			self.eternal.get("volatile_triggers", ())
+		)
 		if hasattr(self, "_string_prefix"):
 			self.string = StringStore(
 				self.query,
@@ -413,10 +503,19 @@ class Engine(AbstractEngine, gORM):
 		self.next_turn = NextTurn(self)
 		self.commit_interval = commit_interval
 		self.query.keyframe_interval = keyframe_interval
+		self._adapt_keyframe_interval()
 		self.query.snap_keyframe = self.snap_keyframe
 		self.flush_interval = flush_interval
-		if parallel_triggers:
+		if parallel_triggers == "process":
+			from .worker import TriggerProcessPool
+
+			self._trigger_processes = TriggerProcessPool(self)
+		elif parallel_triggers:
 			self._trigger_pool = ThreadPoolExecutor()
+		if incremental_triggers:
+			for store in (self.trigger, self.function, self.method):
+				if hasattr(store, "connect"):
+					store.connect(self._forget_trigger_reads, weak=False)
 		self._rules_iter = self._follow_rules()
 		self._rando = Random()
 		if "rando_state" in self.universal:
@@ -474,27 +573,35 @@ class Engine(AbstractEngine, gORM):
 		self._triggers_cache.load(q.rule_triggers_dump())
 		self._prereqs_cache.load(q.rule_prereqs_dump())
 		self._actions_cache.load(q.rule_actions_dump())
-		store_crh = self._character_rules_handled_cache.store
-		for row in q.character_rules_handled_dump():
-			store_crh(*row, loading=True)
-		store_arh = self._unit_rules_handled_cache.store
-		for row in q.unit_rules_handled_dump():
-			store_arh(*row, loading=True)
-		store_ctrh = self._character_thing_rules_handled_cache.store
-		for row in q.character_thing_rules_handled_dump():
-			store_ctrh(*row, loading=True)
-		store_cprh = self._character_place_rules_handled_cache.store
-		for row in q.character_place_rules_handled_dump():
-			store_cprh(*row, loading=True)
-		store_cporh = self._character_portal_rules_handled_cache.store
-		for row in q.character_portal_rules_handled_dump():
-			store_cporh(*row, loading=True)
-		store_cnrh = self._node_rules_handled_cache.store
-		for row in q.node_rules_handled_dump():
-			store_cnrh(*row, loading=True)
-		store_porh = self._portal_rules_handled_cache.store
-		for row in q.portal_rules_handled_dump():
-			store_porh(*row, loading=True)
+		rules_handled_caches = {
+			cache.kind: cache
+			for cache in (
+				self._character_rules_handled_cache,
+				self._unit_rules_handled_cache,
+				self._character_thing_rules_handled_cache,
+				self._character_place_rules_handled_cache,
+				self._character_portal_rules_handled_cache,
+				self._node_rules_handled_cache,
+				self._portal_rules_handled_cache,
+			)
+		}
+		for kind, i, entity in q.rules_handled_entities_dump():
+			rules_handled_caches[kind].load_entity(i, entity)
+		# databases from before schema version 1 have a row per rule handled
+		for kind, dump in [
+			("character", q.character_rules_handled_dump),
+			("unit", q.unit_rules_handled_dump),
+			("character_thing", q.character_thing_rules_handled_dump),
+			("character_place", q.character_place_rules_handled_dump),
+			("character_portal", q.character_portal_rules_handled_dump),
+			("node", q.node_rules_handled_dump),
+			("portal", q.portal_rules_handled_dump),
+		]:
+			store = rules_handled_caches[kind].store
+			for row in dump():
+				store(*row, loading=True)
+		for kind, *row in q.rules_handled_dump():
+			rules_handled_caches[kind].load_bitmap(*row)
 		self._turns_completed.update(q.turns_completed_dump())
 		self._rules_cache = {
 			name: Rule(self, name, create=False) for name in q.rules_dump()
@@ -508,6 +615,7 @@ class Engine(AbstractEngine, gORM):
 		data following, up to (but not including) the keyframe thereafter.
 
 		"""
+		start = monotonic()
 		(
 			latest_past_keyframe,
 			earliest_future_keyframe,
@@ -582,6 +690,34 @@ class Engine(AbstractEngine, gORM):
 				updload(branch, turn, tick)
 		else:
 			self.debug(f"No thing data at {branch, turn, tick}")
+		if self.keyframe_budget is not None:
+			self._note_replay_cost(
+				monotonic() - start,
+				len(noderows)
+				+ len(edgerows)
+				+ len(graphvalrows)
+				+ len(nodevalrows)
+				+ len(edgevalrows)
+				+ len(thingrows),
+			)
+
+	def _note_replay_cost(self, seconds: float, records: int) -> None:
+		if not records:
+			return
+		cost = seconds / records
+		if self._replay_cost is None:
+			self._replay_cost = cost
+		else:
+			# smooth it out, so one slow load doesn't swing the interval
+			self._replay_cost = (self._replay_cost + cost) / 2
+		self._adapt_keyframe_interval()
+
+	def _adapt_keyframe_interval(self) -> None:
+		if self.keyframe_budget is None or self._replay_cost is None:
+			return
+		self.query.keyframe_interval = max(
+			(1, int(self.keyframe_budget / self._replay_cost))
+		)
 
 	def _init_caches(self) -> None:
 		from .xcollections import (
@@ -591,7 +727,7 @@ class Engine(AbstractEngine, gORM):
 		)
 		from .cache import (
 			NodeContentsCache,
-			InitializedCache,
+			RulebookUsersCache,
 			InitializedEntitylessCache,
 			UnitnessCache,
 			UnitRulesHandledCache,
@@ -627,9 +763,9 @@ class Engine(AbstractEngine, gORM):
 		cporc = InitializedEntitylessCache(self)
 		cporc.name = "characters_portals_rulebooks_cache"
 		self._characters_portals_rulebooks_cache = cporc
-		self._nodes_rulebooks_cache = InitializedCache(self)
+		self._nodes_rulebooks_cache = RulebookUsersCache(self)
 		self._nodes_rulebooks_cache.name = "nodes_rulebooks_cache"
-		self._portals_rulebooks_cache = InitializedCache(self)
+		self._portals_rulebooks_cache = RulebookUsersCache(self)
 		self._portals_rulebooks_cache.name = "portals_rulebooks_cache"
 		self._triggers_cache = InitializedEntitylessCache(self)
 		self._triggers_cache.name = "triggers_cache"
@@ -675,7 +811,6 @@ class Engine(AbstractEngine, gORM):
 		self.rulebook = AllRuleBooks(self)
 		self._caches += [
 			self._things_cache,
-			self._node_contents_cache,
 			self._universal_cache,
 			self._rulebooks_cache,
 			self._characters_rulebooks_cache,
@@ -1180,9 +1315,13 @@ class Engine(AbstractEngine, gORM):
 			self.cache_arrange_queue.put("shutdown")
 		if self._cache_arrange_thread.is_alive():
 			self._cache_arrange_thread.join()
+		if hasattr(self, "_trigger_processes"):
+			self._trigger_processes.shutdown()
 		self.flush()
 		if self._keyframe_on_close:
 			self.snap_keyframe()
+		if self.keyframe_budget is not None:
+			self.prune_keyframes()
 		for store in self.stores:
 			if hasattr(store, "save"):
 				store.save(reimport=False)
@@ -1310,28 +1449,14 @@ class Engine(AbstractEngine, gORM):
 					locs = self._things_cache.keyframe[graph,][b][r][t].copy()
 				except KeyError:
 					locs = {}
-				try:
-					kf = self._node_contents_cache.keyframe[graph,][b][r][t]
-					conts = {key: set(value) for (key, value) in kf.items()}
-				except KeyError:
-					conts = {}
 			else:
 				locs = {}
-				conts = {}
 			if "node_val" in delt:
 				for node, val in delt["node_val"].items():
 					if "location" in val:
-						locs[node] = loc = val["location"]
-						if loc in conts:
-							conts[loc].add(node)
-						else:
-							conts[loc] = {node}
+						locs[node] = val["location"]
 			if locs:
-				conts = {
-					key: frozenset(value) for (key, value) in conts.items()
-				}
 				self._things_cache.set_keyframe(graph, *now, locs)
-				self._node_contents_cache.set_keyframe(graph, *now, conts)
 		self._characters_rulebooks_cache.set_keyframe(
 			branch, turn, tick, charrbs
 		)
@@ -1415,19 +1540,7 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._character_rules_handled_cache.store(
-				charn, rulebook, rulen, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rulen
-				in self._character_rules_handled_cache.handled[
-					charn, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_character_rule(
+		self._character_rules_handled_cache.store(
 			charn, rulebook, rulen, branch, turn, tick
 		)
 
@@ -1442,20 +1555,8 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._unit_rules_handled_cache.store(
-				character, graph, avatar, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._unit_rules_handled_cache.handled[
-					character, graph, avatar, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_unit_rule(
-			character, rulebook, rule, graph, avatar, branch, turn, tick
+		self._unit_rules_handled_cache.store(
+			character, graph, avatar, rulebook, rule, branch, turn, tick
 		)
 
 	def _handled_char_thing(
@@ -1468,20 +1569,8 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._character_thing_rules_handled_cache.store(
-				character, thing, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._character_thing_rules_handled_cache.handled[
-					character, thing, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_character_thing_rule(
-			character, rulebook, rule, thing, branch, turn, tick
+		self._character_thing_rules_handled_cache.store(
+			character, thing, rulebook, rule, branch, turn, tick
 		)
 
 	def _handled_char_place(
@@ -1494,20 +1583,8 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._character_place_rules_handled_cache.store(
-				character, place, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._character_place_rules_handled_cache.handled[
-					character, place, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_character_place_rule(
-			character, rulebook, rule, place, branch, turn, tick
+		self._character_place_rules_handled_cache.store(
+			character, place, rulebook, rule, branch, turn, tick
 		)
 
 	def _handled_char_port(
@@ -1521,19 +1598,7 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._character_portal_rules_handled_cache.store(
-				character, orig, dest, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._character_portal_rules_handled_cache.handled[
-					character, orig, dest, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_character_portal_rule(
+		self._character_portal_rules_handled_cache.store(
 			character, orig, dest, rulebook, rule, branch, turn, tick
 		)
 
@@ -1547,19 +1612,7 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._node_rules_handled_cache.store(
-				character, node, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._node_rules_handled_cache.handled[
-					character, node, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_node_rule(
+		self._node_rules_handled_cache.store(
 			character, node, rulebook, rule, branch, turn, tick
 		)
 
@@ -1574,19 +1627,7 @@ class Engine(AbstractEngine, gORM):
 		turn: int,
 		tick: int,
 	) -> None:
-		try:
-			self._portal_rules_handled_cache.store(
-				character, orig, dest, rulebook, rule, branch, turn, tick
-			)
-		except ValueError:
-			assert (
-				rule
-				in self._portal_rules_handled_cache.handled[
-					character, orig, dest, rulebook, branch, turn
-				]
-			)
-			return
-		self.query.handled_portal_rule(
+		self._portal_rules_handled_cache.store(
 			character, orig, dest, rulebook, rule, branch, turn, tick
 		)
 
@@ -1600,17 +1641,30 @@ class Engine(AbstractEngine, gORM):
 		charmap = self.character
 		rulemap = self.rule
 		pool = getattr(self, "_trigger_pool", None)
+		procs = getattr(self, "_trigger_processes", None)
+		batch_triggers = self._batch_triggers
 		todo = defaultdict(list)
 
+		reads = self._trigger_reads
+
 		def check_triggers(prio, rulebook, rule, handled_fun, entity):
-			for trigger in rule.triggers:
-				res = trigger(entity)
-				if res:
-					todo[prio, rulebook].append((rule, handled_fun, entity))
-					return True
-			else:
-				handled_fun(self.tick)
-				return False
+			if reads is not None:
+				reads.log = []
+			try:
+				for trigger in rule.triggers:
+					res = trigger(entity)
+					if res:
+						todo[prio, rulebook].append(
+							(rule, handled_fun, entity)
+						)
+						return True
+			finally:
+				if reads is not None:
+					log, reads.log = reads.log, None
+			if reads is not None and log:
+				self._remember_trigger_reads(rule, entity, log)
+			handled_fun(self.tick)
+			return False
 
 		def check_prereqs(rule, handled_fun, entity):
 			if not entity:
@@ -1633,7 +1687,69 @@ class Engine(AbstractEngine, gORM):
 			handled_fun(self.tick)
 			return actres
 
+		def check_batch_triggers(prio, rulebook, rule, jobs):
+			trigger_store = self.trigger
+			rule_batch_triggers = batch_triggers.get(rule.name, ())
+			for trigger_name in rule.triggers._get():
+				trigger = getattr(trigger_store, trigger_name)
+				if trigger_name in rule_batch_triggers:
+					batch = EntityBatch(ent for (_, ent) in jobs)
+					fired = set(map(id, trigger(batch)))
+				else:
+					fired = {id(ent) for (_, ent) in jobs if trigger(ent)}
+				unfired = []
+				for job in jobs:
+					handled_fun, entity = job
+					if id(entity) in fired:
+						todo[prio, rulebook].append(
+							(rule, handled_fun, entity)
+						)
+					else:
+						unfired.append(job)
+				jobs = unfired
+				if not jobs:
+					return
+			for handled_fun, _ in jobs:
+				handled_fun(self.tick)
+
 		trig_futs = []
+		proc_jobs = []
+		batched = {}
+		rule_batchiness = {}
+
+		def submit_trigger_check(prio, rulebook, rule, handled, entity):
+			if reads is not None and self._trigger_reads_unchanged(
+				rule, entity
+			):
+				handled(self.tick)
+				return
+			if rule.name not in rule_batchiness:
+				rule_batchiness[rule.name] = not batch_triggers.get(
+					rule.name, frozenset()
+				).isdisjoint(rule.triggers._get())
+			if rule_batchiness[rule.name]:
+				# triggers that take all the entities at once need to be
+				# given them all at once, so wait until we've got them
+				key = (prio, rulebook, rule.name)
+				if key in batched:
+					batched[key][1].append((handled, entity))
+				else:
+					batched[key] = (rule, [(handled, entity)])
+			elif procs:
+				proc_jobs.append((prio, rulebook, rule, handled, entity))
+			elif pool:
+				trig_futs.append(
+					pool.submit(
+						check_triggers, prio, rulebook, rule, handled, entity
+					)
+				)
+			else:
+				trig_futs.append(
+					partial(
+						check_triggers, prio, rulebook, rule, handled, entity
+					)
+				)
+
 		for (
 			prio,
 			charactername,
@@ -1654,18 +1770,7 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = charmap[charactername]
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 
 		avcache_retr = self._unitness_cache._base_retrieve
 		node_exists = self._node_exists
@@ -1718,18 +1823,7 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = get_node(graphn, avn)
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 		is_thing = self._is_thing
 		handled_char_thing = self._handled_char_thing
 		for (
@@ -1754,18 +1848,7 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = get_thing(charn, thingn)
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 		handled_char_place = self._handled_char_place
 		for (
 			prio,
@@ -1789,18 +1872,7 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = get_place(charn, placen)
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 		edge_exists = self._edge_exists
 		get_edge = self._get_edge
 		handled_char_port = self._handled_char_port
@@ -1828,18 +1900,7 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = get_edge(charn, orign, destn)
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 		handled_node = self._handled_node
 		for (
 			prio,
@@ -1857,18 +1918,7 @@ class Engine(AbstractEngine, gORM):
 				handled_node, charn, noden, rulebook, rulen, branch, turn
 			)
 			entity = get_node(charn, noden)
-			if pool:
-				trig_futs.append(
-					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
-			else:
-				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
-				)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
 		handled_portal = self._handled_portal
 		for (
 			prio,
@@ -1894,18 +1944,29 @@ class Engine(AbstractEngine, gORM):
 				turn,
 			)
 			entity = get_edge(charn, orign, destn)
+			submit_trigger_check(prio, rulebook, rule, handled, entity)
+		for (prio, rulebook, _), (rule, jobs) in batched.items():
 			if pool:
 				trig_futs.append(
 					pool.submit(
-						check_triggers, prio, rulebook, rule, handled, entity
+						check_batch_triggers, prio, rulebook, rule, jobs
 					)
 				)
 			else:
 				trig_futs.append(
-					partial(
-						check_triggers, prio, rulebook, rule, handled, entity
-					)
+					partial(check_batch_triggers, prio, rulebook, rule, jobs)
 				)
+		if procs:
+			fired = procs.check_triggers(
+				[(rule, entity) for (_, _, rule, _, entity) in proc_jobs]
+			)
+			for (prio, rulebook, rule, handled, entity), hit in zip(
+				proc_jobs, fired
+			):
+				if hit:
+					todo[prio, rulebook].append((rule, handled, entity))
+				else:
+					handled(self.tick)
 		if pool:
 			wait(trig_futs)
 		else:
@@ -1944,6 +2005,51 @@ class Engine(AbstractEngine, gORM):
 					except StopIteration:
 						raise InnerStopIteration
 
+	def _remember_trigger_reads(self, rule, entity, log: list) -> None:
+		triggers = rule.triggers._get()
+		if not self._volatile_triggers.isdisjoint(triggers):
+			return
+		key = (rule.name, entity_spec(entity))
+		stats = [
+			(ref(mapping), stat, _read_stat(mapping, stat))
+			for mapping, stat in log
+		]
+		memo = self._trigger_memo
+		with self._trigger_memo_lock:
+			memo[key] = (triggers, stats)
+			memo.move_to_end(key)
+			while len(memo) > TRIGGER_MEMO_MAXSIZE:
+				memo.popitem(last=False)
+
+	def _trigger_reads_unchanged(self, rule, entity) -> bool:
+		"""Return whether the stats a rule's triggers looked at, last time
+		they didn't fire for the entity, are still the same
+
+		"""
+		key = (rule.name, entity_spec(entity))
+		with self._trigger_memo_lock:
+			if key not in self._trigger_memo:
+				return False
+			triggers, stats = self._trigger_memo[key]
+			self._trigger_memo.move_to_end(key)
+		if triggers != rule.triggers._get():
+			return False
+		for mapping_ref, stat, value in stats:
+			mapping = mapping_ref()
+			if mapping is None or _read_stat(mapping, stat) != value:
+				return False
+		return True
+
+	def _forget_trigger_reads(self, *args, **kwargs) -> None:
+		with self._trigger_memo_lock:
+			self._trigger_memo.clear()
+
+	def _get_turn(self) -> int:
+		reads = self._trigger_reads
+		if reads is not None:
+			reads.unrecordable()
+		return super()._get_turn()
+
 	def _advance(self) -> Any:
 		"""Follow the next rule if available.
 
@@ -2115,29 +2221,11 @@ class Engine(AbstractEngine, gORM):
 			graph, branch, turn, tick, nodes, edges, graph_val
 		)
 		newkf = {}
-		contkf = {}
 		for name, node in nodes.items():
 			if "location" not in node:
 				continue
-			locn = node["location"]
-			newkf[name] = locn
-			if locn in contkf:
-				contkf[locn].add(name)
-			else:
-				contkf[locn] = {
-					name,
-				}
-		contents_keyframes = self._node_contents_cache.keyframe
-		contkfs = contents_keyframes[graph,][branch]
-		if turn not in contkfs:
-			contkfs[turn] = {tick: contkf}
-		else:
-			contkfs[turn][tick] = contkf
-		kfs = self._things_cache.keyframe[graph,][branch]
-		if turn not in kfs:
-			kfs[turn] = {tick: newkf}
-		else:
-			kfs[turn][tick] = newkf
+			newkf[name] = node["location"]
+		self._things_cache.set_keyframe(graph, branch, turn, tick, newkf)
 		assert (
 			(graph,) in self._things_cache.keyframe
 			and branch in self._things_cache.keyframe[graph,]
@@ -2147,7 +2235,7 @@ class Engine(AbstractEngine, gORM):
 
 	def turns_when(
 		self, qry: Query, mid_turn=False
-	) -> Union[QueryResult, set]:
+	) -> Union[QueryResult, TurnIntervals]:
 		"""Return the turns when the query held true
 
 		Only the state of the world at the end of the turn is considered.
@@ -2184,18 +2272,17 @@ class Engine(AbstractEngine, gORM):
 				qry.oper,
 			)
 		self.query.flush()
+		stat_windows = self.query.stat_windows
 		branches = list({branch for branch, _, _ in self._iter_parent_btt()})
 		left = qry.leftside
 		right = qry.rightside
 		if isinstance(left, StatusAlias) and isinstance(right, StatusAlias):
-			left_sel = _make_side_sel(
-				left.entity, left.stat, branches, self.pack, mid_turn
+			left_data = stat_windows(
+				left.entity, left.stat, branches, mid_turn
 			)
-			right_sel = _make_side_sel(
-				right.entity, right.stat, branches, self.pack, mid_turn
+			right_data = stat_windows(
+				right.entity, right.stat, branches, mid_turn
 			)
-			left_data = self.query.execute(left_sel)
-			right_data = self.query.execute(right_sel)
 			if mid_turn:
 				return QueryResultMidTurn(
 					unpack_data_mid(left_data),
@@ -2211,14 +2298,30 @@ class Engine(AbstractEngine, gORM):
 					end,
 				)
 		elif isinstance(left, StatusAlias):
-			left_sel = _make_side_sel(
-				left.entity, left.stat, branches, self.pack, mid_turn
+			if _is_sql_number(right) and self.query.compares_in_sql:
+				return self._turns_when_in_sql(
+					_make_side_cmp_sel(
+						_make_side_sel(
+							left.entity,
+							left.stat,
+							branches,
+							self.pack,
+							mid_turn,
+						),
+						_getcol(left),
+						lambda num: qry.oper(num, right),
+					),
+					lambda val: qry.oper(val, right),
+					mid_turn,
+					end,
+				)
+			left_data = stat_windows(
+				left.entity, left.stat, branches, mid_turn
 			)
-			left_data = self.query.execute(left_sel)
 			if mid_turn:
 				return QueryResultMidTurn(
 					unpack_data_mid(left_data),
-					[(0, 0, None, None, right)],
+					[((0, 0), (None, None), right)],
 					qry.oper,
 					end,
 				)
@@ -2230,13 +2333,29 @@ class Engine(AbstractEngine, gORM):
 					end,
 				)
 		elif isinstance(right, StatusAlias):
-			right_sel = _make_side_sel(
-				right.entity, right.stat, branches, self.pack, mid_turn
+			if _is_sql_number(left) and self.query.compares_in_sql:
+				return self._turns_when_in_sql(
+					_make_side_cmp_sel(
+						_make_side_sel(
+							right.entity,
+							right.stat,
+							branches,
+							self.pack,
+							mid_turn,
+						),
+						_getcol(right),
+						lambda num: qry.oper(left, num),
+					),
+					lambda val: qry.oper(left, val),
+					mid_turn,
+					end,
+				)
+			right_data = stat_windows(
+				right.entity, right.stat, branches, mid_turn
 			)
-			right_data = self.query.execute(right_sel)
 			if mid_turn:
 				return QueryResultMidTurn(
-					[(0, 0, None, None, left)],
+					[((0, 0), (None, None), left)],
 					unpack_data_mid(right_data),
 					qry.oper,
 					end,
@@ -2250,9 +2369,41 @@ class Engine(AbstractEngine, gORM):
 				)
 		else:
 			if qry.oper(left, right):
-				return set(range(0, self.turn))
+				return TurnIntervals([(0, self.turn)])
 			else:
-				return set()
+				return TurnIntervals()
+
+	def _turns_when_in_sql(
+		self, sel, cmp: callable, mid_turn: bool, end: int
+	) -> TurnIntervals:
+		"""Run a select from ``_make_side_cmp_sel``, and collect its turns
+
+		Values the database couldn't compare get compared here, with
+		``cmp``.
+
+		"""
+		unpack = self.unpack
+		spans = []
+		rows = self.query.execute(sel)
+		for turn_from, tick_from, turn_to, tick_to, packed in rows:
+			if packed is not None and not cmp(unpack(packed)):
+				continue
+			if turn_to is None:
+				turn_to = end
+			elif mid_turn and tick_to:
+				turn_to += 1
+			spans.append((turn_from, min((turn_to, end))))
+		return TurnIntervals(spans)
+
+	def standing_query(self, qry: Query, mid_turn=False) -> StandingQuery:
+		"""Return the turns when the query held true, and keep them current
+
+		Like :meth:`turns_when`, but the result stays up to date as the
+		simulation runs, evaluating only the turns when the stats in the
+		query changed. Call its ``close`` method when you're done with it.
+
+		"""
+		return StandingQuery(self, qry, mid_turn)
 
 	def _node_contents(self, character: Key, node: Key) -> Set:
 		return self._node_contents_cache.retrieve(
@@ -33,7 +33,9 @@ from typing import (
 	Any,
 	List,
 	Iterable,
+	Iterator,
 	Optional,
+	MutableMapping,
 )
 
 import msgpack
@@ -78,6 +80,13 @@ BRANCH: bytes = msgpack.packb("branch")
 SET_CODE: bytes = MsgpackExtensionType.set.value.to_bytes(
 	1, "big", signed=False
 )
+STREAM_CHUNK: bytes = msgpack.Packer().pack_array_header(2)
+"""How a ``[character, delta]`` chunk of a streamed response begins
+
+Ordinary responses are arrays of five, so they never begin this way.
+
+"""
+NOT_CHARACTERS = frozenset({"eternal", "universal", "rules", "rulebooks"})
 
 
 def _dict_delta_added(
@@ -225,11 +234,32 @@ def concat_s(s: Set[bytes]) -> bytes:
 		raise ValueError("Too long")
 
 
+def _patch_stats(stats: MutableMapping, patch: Dict) -> None:
+	"""Update ``stats`` from ``patch``, deleting those set to ``None``"""
+	for k, v in patch.items():
+		if v is None:
+			if k in stats:
+				del stats[k]
+		else:
+			stats[k] = v
+
+
 def prepacked(fun: Callable) -> Callable:
 	fun.prepacked = True
 	return fun
 
 
+def streamed(fun: Callable) -> Callable:
+	"""Mark a generator method whose chunks get sent as they're made
+
+	All but the last thing it yields must be a packed ``[key, value]``
+	array, starting with :data:`STREAM_CHUNK`. The last is the result.
+
+	"""
+	fun.streamed = True
+	return fun
+
+
 class EngineHandle(object):
 	"""A wrapper for a :class:`LiSE.Engine` object that runs in the same
 	process, but with an API built to be used in a command-processing
@@ -266,6 +296,12 @@ class EngineHandle(object):
 			return pack(k), pack(v)
 
 		self.pack_pair = pack_pair
+		self.pack_many = pack_many = self._real.pack_many
+
+		def pack_dict(d: dict) -> Dict[bytes, bytes]:
+			return dict(zip(pack_many(d.keys()), pack_many(d.values())))
+
+		self.pack_dict = pack_dict
 		self.unpack = self._real.unpack
 
 		self._cache_arranger_started = False
@@ -314,34 +350,55 @@ class EngineHandle(object):
 		return hasattr(self._real, "locktime")
 
 	@prepacked
-	def copy_character(self, char: Key) -> Dict[bytes, bytes]:
+	def copy_character(
+		self, char: Key, mappings: Iterable[str] = None
+	) -> Dict[bytes, bytes]:
 		"""Return a mapping describing a character
 
 		It has the keys 'nodes', 'edges', 'units', 'rulebooks', 'node_val',
 		'edge_val', and whatever stats the character has.
 
+		With ``mappings``, only describe some of the character: ``'stat'``
+		for its stats, units and rulebooks; ``'node'`` for 'nodes' and
+		'node_val'; ``'portal'`` for 'edges' and 'edge_val'.
+
 		"""
-		units = self._character_units_copy(char)
-		ports = self._character_portals_stat_copy(char)
-		ported = {}
-		for orig, dests in ports.items():
-			dest_stats = {}
-			for dest, stats in dests.items():
-				dest_stats[dest] = concat_d(stats)
-			ported[orig] = concat_d(dest_stats)
-		return {
-			NODES: concat_d(
+		if mappings is None:
+			mappings = ("stat", "node", "portal")
+		ret = {}
+		if "node" in mappings:
+			ret[NODES] = concat_d(
 				{node: TRUE for node in self.character_nodes(char)}
-			),
-			EDGES: concat_d(
-				{origdest: TRUE for origdest in self.character_portals(char)}
-			),
-			UNITS: concat_d({k: concat_s(v) for (k, v) in units.items()}),
-			RULEBOOKS: concat_d(self.character_rulebooks_copy(char)),
-			NODE_VAL: concat_d(self._character_nodes_stat_copy(char)),
-			EDGE_VAL: concat_d(ported),
-			**self.character_stat_copy(char),
-		}
+			)
+			ret[NODE_VAL] = concat_d(self._character_nodes_stat_copy(char))
+		if "portal" in mappings:
+			ports = self._character_portals_stat_copy(char)
+			ported = {}
+			for orig, dests in ports.items():
+				dest_stats = {}
+				for dest, stats in dests.items():
+					dest_stats[dest] = concat_d(stats)
+				ported[orig] = concat_d(dest_stats)
+			pack = self.pack
+			portal = self._real.character[char].portal
+			ret[EDGES] = concat_d(
+				{
+					pack((orig, dest)): TRUE
+					for (orig, dests) in portal.items()
+					for dest in dests
+				}
+			)
+			ret[EDGE_VAL] = concat_d(ported)
+		if "stat" in mappings:
+			units = self._character_units_copy(char)
+			ret[UNITS] = concat_d(
+				{k: concat_s(v) for (k, v) in units.items()}
+			)
+			ret[RULEBOOKS] = concat_d(self.character_rulebooks_copy(char))
+			ret.update(self.character_stat_copy(char))
+			# like in keyframes
+			del ret[self.pack("name")]
+		return ret
 
 	def get_keyframe(self, branch, turn, tick):
 		now = self._real._btt()
@@ -402,70 +459,63 @@ class EngineHandle(object):
 		slightly_packed_delta = {}
 		mostly_packed_delta = {}
 		for char, chardelta in delta.items():
-			chardelta = chardelta.copy()
 			pchar = pack(char)
-			chard = slightly_packed_delta[pchar] = {}
-			packd = mostly_packed_delta[pchar] = {}
-			if "nodes" in chardelta:
-				nd = chard[NODES] = {
-					pack(node): pack(ex)
-					for node, ex in chardelta.pop("nodes").items()
-				}
-				packd[NODES] = concat_d(nd)
-			if "node_val" in chardelta:
-				slightnoded = chard[NODE_VAL] = {}
-				packnodevd = {}
-				for node, vals in chardelta.pop("node_val").items():
-					pnode = pack(node)
-					pvals = dict(map(self.pack_pair, vals.items()))
-					slightnoded[pnode] = pvals
-					packnodevd[pnode] = concat_d(pvals)
-				packd[NODE_VAL] = concat_d(packnodevd)
-			if "edges" in chardelta:
-				ed = chard[EDGES] = {
-					pack(origdest): pack(ex)
-					for origdest, ex in chardelta.pop("edges").items()
-				}
-				packd[EDGES] = concat_d(ed)
-			if "edge_val" in chardelta:
-				slightorigd = chard[EDGE_VAL] = {}
-				packorigd = {}
-				for orig, dests in chardelta.pop("edge_val").items():
-					porig = pack(orig)
-					slightdestd = slightorigd[porig] = {}
-					packdestd = {}
-					for dest, port in dests.items():
-						pdest = pack(dest)
-						slightportd = slightdestd[pdest] = dict(
-							map(self.pack_pair, port.items())
-						)
-						packdestd[pdest] = concat_d(slightportd)
-					packorigd[porig] = concat_d(packdestd)
-				packd[EDGE_VAL] = concat_d(packorigd)
-			if "units" in chardelta:
-				slightgraphd = chard[UNITS] = {}
-				packunitd = {}
-				for graph, unitss in chardelta.pop("units").items():
-					pgraph = pack(graph)
-					slightunitd = slightgraphd[pgraph] = dict(
-						map(self.pack_pair, unitss.items())
-					)
-					packunitd[pgraph] = concat_d(slightunitd)
-				packd[UNITS] = concat_d(packunitd)
-			if "rulebooks" in chardelta:
-				chard[RULEBOOKS] = slightrbd = dict(
-					map(self.pack_pair, chardelta.pop("rulebooks").items())
-				)
-				packd[RULEBOOKS] = concat_d(slightrbd)
-			todo = dict(map(self.pack_pair, chardelta.items()))
-			chard.update(todo)
-			packd.update(todo)
-		return slightly_packed_delta, concat_d(
-			{
-				charn: concat_d(stuff)
-				for charn, stuff in mostly_packed_delta.items()
-			}
-		)
+			(
+				slightly_packed_delta[pchar],
+				mostly_packed_delta[pchar],
+			) = self._pack_char_delta(chardelta)
+		return slightly_packed_delta, concat_d(mostly_packed_delta)
+
+	def _pack_char_delta(self, chardelta) -> Tuple[dict, bytes]:
+		pack_many = self.pack_many
+		pack_dict = self.pack_dict
+		chardelta = chardelta.copy()
+		chard = {}
+		packd = {}
+		if "nodes" in chardelta:
+			nd = chard[NODES] = pack_dict(chardelta.pop("nodes"))
+			packd[NODES] = concat_d(nd)
+		if "node_val" in chardelta:
+			slightnoded = chard[NODE_VAL] = {}
+			packnodevd = {}
+			node_val = chardelta.pop("node_val")
+			for pnode, vals in zip(pack_many(node_val), node_val.values()):
+				pvals = pack_dict(vals)
+				slightnoded[pnode] = pvals
+				packnodevd[pnode] = concat_d(pvals)
+			packd[NODE_VAL] = concat_d(packnodevd)
+		if "edges" in chardelta:
+			ed = chard[EDGES] = pack_dict(chardelta.pop("edges"))
+			packd[EDGES] = concat_d(ed)
+		if "edge_val" in chardelta:
+			slightorigd = chard[EDGE_VAL] = {}
+			packorigd = {}
+			edge_val = chardelta.pop("edge_val")
+			for porig, dests in zip(pack_many(edge_val), edge_val.values()):
+				slightdestd = slightorigd[porig] = {}
+				packdestd = {}
+				for pdest, port in zip(pack_many(dests), dests.values()):
+					slightportd = slightdestd[pdest] = pack_dict(port)
+					packdestd[pdest] = concat_d(slightportd)
+				packorigd[porig] = concat_d(packdestd)
+			packd[EDGE_VAL] = concat_d(packorigd)
+		if "units" in chardelta:
+			slightgraphd = chard[UNITS] = {}
+			packunitd = {}
+			units = chardelta.pop("units")
+			for pgraph, unitss in zip(pack_many(units), units.values()):
+				slightunitd = slightgraphd[pgraph] = pack_dict(unitss)
+				packunitd[pgraph] = concat_d(slightunitd)
+			packd[UNITS] = concat_d(packunitd)
+		if "rulebooks" in chardelta:
+			slightrbd = chard[RULEBOOKS] = pack_dict(
+				chardelta.pop("rulebooks")
+			)
+			packd[RULEBOOKS] = concat_d(slightrbd)
+		todo = pack_dict(chardelta)
+		chard.update(todo)
+		packd.update(todo)
+		return chard, concat_d(packd)
 
 	@staticmethod
 	def _concat_char_delta(delta: SlightlyPackedDeltaType) -> bytes:
@@ -539,6 +589,29 @@ class EngineHandle(object):
 		)
 		return pack(ret), packed_delta
 
+	@streamed
+	@prepacked
+	def stream_next_turn(
+		self,
+	) -> Iterator[Union[bytes, Tuple[bytes, bytes]]]:
+		"""Simulate a turn, and yield the delta one character at a time
+
+		Each character's delta gets packed on its own, so the other end
+		can apply it before the rest have been packed. Last comes the
+		result of the turn, with the delta of everything else.
+
+		"""
+		pack = self.pack
+		ret, delta = self._real.next_turn()
+		rest = {}
+		for char, chardelta in delta.items():
+			if char in NOT_CHARACTERS:
+				rest[char] = chardelta
+				continue
+			_, packed = self._pack_char_delta(chardelta)
+			yield STREAM_CHUNK + pack(char) + packed
+		yield pack(ret), self._pack_delta(rest)[1]
+
 	def _get_slow_delta(
 		self,
 		btt_from: Tuple[str, int, int] = None,
@@ -933,6 +1006,31 @@ class EngineHandle(object):
 		self.update_nodes(char, patch["node"])
 		self.update_portals(char, patch["portal"])
 
+	def update_characters(self, patch: Dict[Key, Dict]) -> None:
+		"""Change the stats of many characters, and their nodes and portals
+
+		``patch`` is keyed by character name. Each value may have the
+		keys ``'character'``, ``'node'``, and ``'portal'``, as in
+		:meth:`update_character`, except that a stat set to ``None``
+		is deleted, and nodes and portals are never made or deleted.
+		Entities that don't exist anymore are skipped.
+
+		"""
+		characters = self._real.character
+		for char, charpatch in patch.items():
+			if char not in characters:
+				continue
+			character = characters[char]
+			_patch_stats(character.stat, charpatch.get("character", {}))
+			nodes = character.node
+			for node, npatch in charpatch.get("node", {}).items():
+				if node in nodes:
+					_patch_stats(nodes[node], npatch)
+			portals = character.portal
+			for (orig, dest), ppatch in charpatch.get("portal", {}).items():
+				if orig in portals and dest in portals[orig]:
+					_patch_stats(portals[orig][dest], ppatch)
+
 	def characters(self) -> List[Key]:
 		return list(self._real.character.keys())
 
@@ -1184,7 +1282,7 @@ class EngineHandle(object):
 		ret = {
 			pack(k): pack(v.unwrap())
 			if hasattr(v, "unwrap") and not hasattr(v, "no_unwrap")
-			else v
+			else pack(v)
 			for (k, v) in self._real.character[char].portal[orig][dest].items()
 		}
 		if (branch, turn, tick) != origtime:
@@ -1200,7 +1298,11 @@ class EngineHandle(object):
 		chara = self._real.character[char]
 		origtime = self._real._btt()
 		self._real._set_btt(*btt)
-		portals = set(chara.portals())
+		portals = [
+			(orig, dest)
+			for (orig, dests) in chara.portal.items()
+			for dest in dests
+		]
 		self._real._set_btt(*origtime)
 		for orig, dest in portals:
 			porig = pack(orig)
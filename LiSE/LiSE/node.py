@@ -24,7 +24,6 @@ from collections.abc import Mapping, ValuesView
 from typing import Optional, Union, Iterator, List
 
 import networkx as nx
-from networkx import shortest_path, shortest_path_length
 
 from .allegedb import graph, Key, HistoricKeyError
 
@@ -32,6 +31,7 @@ from .util import getatt
 from .query import StatusAlias
 from . import rule
 from .exc import AmbiguousUserError, TravelException
+from .snapshot import CharacterSnapshot, PathCache
 
 
 class UserMapping(Mapping):
@@ -342,6 +342,9 @@ class Node(graph.Node, rule.RuleFollower):
 		are available.
 
 		"""
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.unrecordable()
 		return Dests(self)
 
 	@property
@@ -351,11 +354,17 @@ class Node(graph.Node, rule.RuleFollower):
 		Aliases ``preportal``, ``predecessor`` and ``pred`` are available.
 
 		"""
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.unrecordable()
 		return Origs(self)
 
 	@property
 	def content(self) -> NodeContent:
 		"""A mapping of ``Thing`` objects that are here"""
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.unrecordable()
 		return NodeContent(self)
 
 	def contents(self) -> NodeContentValues:
@@ -413,9 +422,8 @@ class Node(graph.Node, rule.RuleFollower):
 		or the name of one.
 
 		"""
-
-		return shortest_path_length(
-			self.character, self.name, self._plain_dest_name(dest), weight
+		return self.character._paths.shortest_path_length(
+			self.name, self._plain_dest_name(dest), weight
 		)
 
 	def shortest_path(
@@ -427,8 +435,8 @@ class Node(graph.Node, rule.RuleFollower):
 		or the name of one.
 
 		"""
-		return shortest_path(
-			self.character, self.name, self._plain_dest_name(dest), weight
+		return self.character._paths.shortest_path(
+			self.name, self._plain_dest_name(dest), weight
 		)
 
 	def path_exists(
@@ -522,6 +530,9 @@ class Place(Node):
 	}
 
 	def __getitem__(self, key):
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.record(self, key)
 		if key == "name":
 			return self.name
 		return super().__getitem__(key)
@@ -618,6 +629,9 @@ class Thing(Node):
 		``location``: return the name of my location
 
 		"""
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.record(self, key)
 		disp = self._getitem_dispatch
 		if key in disp:
 			return disp[key](self)
@@ -781,7 +795,9 @@ class Thing(Node):
 
 		The ``graph`` argument may be any NetworkX-style graph. It
 		will be used for pathfinding if supplied, otherwise I'll use
-		my :class:`Character`. In either case, however, I will attempt
+		my :class:`Character`, whose shortest paths are remembered
+		until its places or portals change, or the ``weight`` stat of
+		one of its portals does. In either case, however, I will attempt
 		to actually follow the path using my :class:`Character`, which
 		might not be possible if the supplied ``graph`` and my
 		:class:`Character` are too different. If it's not possible,
@@ -789,12 +805,20 @@ class Thing(Node):
 		attribute holds the part of the path that I *can* follow. To
 		make me follow it, pass it to my ``follow_path`` method.
 
+		For speed, ``graph`` may be a snapshot of my character, from
+		its ``snapshot`` method. Then, ``weight`` must be the one the
+		snapshot was taken with, or ``None``.
+
 		Return value is the number of turns the travel will take.
 
 		"""
 		destn = dest.name if hasattr(dest, "name") else dest
 		if destn == self.location.name:
 			raise ValueError("I'm already at {}".format(destn))
-		graph = self.character if graph is None else graph
-		path = nx.shortest_path(graph, self["location"], destn, weight)
+		if graph is None:
+			graph = self.character._paths
+		if isinstance(graph, (CharacterSnapshot, PathCache)):
+			path = graph.shortest_path(self["location"], destn, weight)
+		else:
+			path = nx.shortest_path(graph, self["location"], destn, weight)
 		return self.follow_path(path, weight)
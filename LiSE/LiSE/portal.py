@@ -119,6 +119,9 @@ class Portal(Edge, RuleFollower):
 		return RuleMapping(self)
 
 	def __getitem__(self, key):
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.record(self, key)
 		if key == "origin":
 			return self.orig
 		elif key == "destination":
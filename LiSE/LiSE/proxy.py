@@ -25,15 +25,21 @@ call its ``start`` method with the same arguments you'd give a real
 
 """
 
+import asyncio
 import sys
 import logging
+import struct
 from abc import abstractmethod
 from random import Random
+from collections import OrderedDict
 from collections.abc import Mapping, MutableMapping, MutableSequence
+from contextlib import contextmanager
 from functools import partial, cached_property
-from threading import Thread, Lock
+from itertools import count
+from threading import Thread, Lock, RLock
 from multiprocessing import Process, Pipe, Queue, ProcessError
-from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import Future, ThreadPoolExecutor
 from queue import Empty
 from time import monotonic
 from typing import Hashable, Tuple, Optional
@@ -52,11 +58,184 @@ from .util import (
 	MsgpackExtensionType,
 	AbstractCharacter,
 )
-from .handle import EngineHandle
+from .handle import EngineHandle, STREAM_CHUNK
 from .xcollections import AbstractLanguageDescriptor
 from .node import NodeContent, UserMapping, Place, Thing
 from .portal import Portal
 
+COMPRESS_THRESHOLD = 4096
+"""Messages on the pipe shorter than this many bytes aren't compressed"""
+SHARED_MEMORY_SIZE = 2**26
+"""Default size of each ring buffer, when the proxy uses shared memory"""
+HYDRATED_CHARACTERS = 8
+"""Default number of characters a lazy proxy keeps the data of"""
+CHARACTER_MAPPINGS = frozenset({"stat", "node", "portal"})
+_DELTA_MAPPING = {
+	"nodes": "node",
+	"node_val": "node",
+	"edges": "portal",
+	"edge_val": "portal",
+}
+
+
+def _pipe_codecs() -> dict:
+	"""Get the codecs I can use here, best first
+
+	Each is a tuple of the byte that marks a message encoded with it,
+	then its compress and decompress functions.
+
+	"""
+	codecs = {}
+	try:
+		import zstandard
+
+		codecs["zstd"] = (b"\x03", zstandard.compress, zstandard.decompress)
+	except ImportError:
+		pass
+	try:
+		import lz4.frame
+
+		codecs["lz4"] = (b"\x02", lz4.frame.compress, lz4.frame.decompress)
+	except ImportError:
+		pass
+	codecs["zlib"] = (b"\x01", zlib.compress, zlib.decompress)
+	return codecs
+
+
+class SharedRing:
+	"""A ring buffer in shared memory, to send big messages one way
+
+	The writer copies each message into the ring with :meth:`put`,
+	and sends the reader only the short note it returns, saying where
+	the message is. The reader passes the note to :meth:`get`. The
+	first eight bytes of the ring count how far the reader has read,
+	so the writer knows what it may overwrite. When a message won't
+	fit in the space left, :meth:`put` returns ``None``, and the
+	message should go by the pipe instead.
+
+	Make a new ring with its ``size`` in bytes, then attach to it from
+	the other process with its ``name``.
+
+	"""
+
+	MARK = b"\x10"
+	_read = struct.Struct("<Q")
+	_note = struct.Struct("<QQ")
+
+	def __init__(self, size: int = None, name: str = None):
+		if name is None:
+			self._shm = SharedMemory(create=True, size=self._read.size + size)
+		else:
+			self._shm = SharedMemory(name=name)
+		self._owner = name is None
+		self.name = self._shm.name
+		self._buf = self._shm.buf
+		self._size = len(self._buf) - self._read.size
+		self._written = 0
+
+	def put(self, data: bytes) -> Optional[bytes]:
+		n = len(data)
+		if n > self._size:
+			return None
+		start = self._written
+		offset = start % self._size
+		if offset + n > self._size:
+			# messages don't wrap around; skip to the beginning
+			start += self._size - offset
+			offset = 0
+		if start + n - self._read.unpack_from(self._buf)[0] > self._size:
+			return None
+		offset += self._read.size
+		self._buf[offset : offset + n] = data
+		self._written = start + n
+		return self.MARK + self._note.pack(start, n)
+
+	def get(self, note: bytes) -> bytes:
+		start, n = self._note.unpack_from(note, 1)
+		offset = self._read.size + start % self._size
+		data = self._buf[offset : offset + n].tobytes()
+		self._read.pack_into(self._buf, 0, start + n)
+		return data
+
+	def close(self):
+		"""Detach from the ring, and free it if I made it"""
+		self._buf.release()
+		self._shm.close()
+		if self._owner:
+			self._shm.unlink()
+
+
+class PipeCodec:
+	"""How messages between an :class:`EngineProxy` and its engine are encoded
+
+	Messages shorter than ``threshold`` bytes go as they are, since
+	compressing them costs more time than it saves. Longer ones are
+	compressed with the codec named, or the best one installed: zstd,
+	then lz4, then zlib. Every message starts with a byte saying which
+	codec encoded it, so I can decode what the other end sent even if
+	it chose differently.
+
+	With :class:`SharedRing` objects for ``ring_out`` and ``ring_in``,
+	long messages go through shared memory instead, uncompressed,
+	whenever there's room for them.
+
+	"""
+
+	RAW = b"\x00"
+
+	def __init__(
+		self,
+		codec: str = None,
+		threshold: int = COMPRESS_THRESHOLD,
+		ring_out: SharedRing = None,
+		ring_in: SharedRing = None,
+	):
+		codecs = _pipe_codecs()
+		if codec is None:
+			codec = next(iter(codecs))
+		elif codec not in codecs:
+			raise ValueError(f"Codec not available: {codec}")
+		self.codec = codec
+		self.threshold = threshold
+		self.ring_out = ring_out
+		self.ring_in = ring_in
+		self._mark, self._compress, _ = codecs[codec]
+		self._decompressors = {
+			mark: decompress for (mark, _, decompress) in codecs.values()
+		}
+
+	@classmethod
+	def negotiate(
+		cls,
+		codec: str,
+		threshold: int,
+		ring_out: SharedRing = None,
+		ring_in: SharedRing = None,
+	) -> "PipeCodec":
+		"""Use ``codec`` if it's installed here, or else zlib"""
+		if codec not in _pipe_codecs():
+			codec = "zlib"
+		return cls(codec, threshold, ring_out, ring_in)
+
+	def encode(self, data: bytes) -> bytes:
+		if len(data) < self.threshold:
+			return self.RAW + data
+		if self.ring_out is not None:
+			note = self.ring_out.put(data)
+			if note is not None:
+				return note
+		return self._mark + self._compress(data)
+
+	def decode(self, data: bytes) -> bytes:
+		mark = data[:1]
+		if mark == self.RAW:
+			return data[1:]
+		if mark == SharedRing.MARK and self.ring_in is not None:
+			return self.ring_in.get(data)
+		if mark not in self._decompressors:
+			raise ValueError(f"Can't decode a message marked {mark!r}")
+		return self._decompressors[mark](data[1:])
+
 
 class CachingProxy(MutableMapping, Signal):
 	"""Abstract class for proxies to LiSE entities or mappings thereof"""
@@ -200,6 +379,7 @@ class NodeProxy(CachingEntityProxy):
 
 	@property
 	def _cache(self):
+		self.engine._hydrate(self._charname, "node")
 		return self.engine._node_stat_cache[self._charname][self.name]
 
 	def _get_default_rulebook_name(self):
@@ -264,6 +444,8 @@ class NodeProxy(CachingEntityProxy):
 	def _set_item(self, k, v):
 		if k == "name":
 			raise KeyError("Nodes can't be renamed")
+		if self.engine._batched(self._charname, "node", self.name, k, v):
+			return
 		self.engine.handle(
 			command="set_node_stat",
 			char=self._charname,
@@ -276,6 +458,8 @@ class NodeProxy(CachingEntityProxy):
 	def _del_item(self, k):
 		if k == "name":
 			raise KeyError("Nodes need names")
+		if self.engine._batched(self._charname, "node", self.name, k, None):
+			return
 		self.engine.handle(
 			command="del_node_stat",
 			char=self._charname,
@@ -531,6 +715,7 @@ class PortalProxy(CachingEntityProxy):
 
 	@property
 	def _cache(self):
+		self.engine._hydrate(self._charname, "portal")
 		return self.engine._portal_stat_cache[self._charname][self._origin][
 			self._destination
 		]
@@ -557,27 +742,37 @@ class PortalProxy(CachingEntityProxy):
 		return self.character.pred[self._origin][self._destination]
 
 	def _set_item(self, k, v):
-		self.engine.handle(
-			command="set_portal_stat",
-			char=self._charname,
-			orig=self._origin,
-			dest=self._destination,
-			k=k,
-			v=v,
-			branching=True,
-		)
+		if not self.engine._batched(
+			self._charname, "portal", (self._origin, self._destination), k, v
+		):
+			self.engine.handle(
+				command="set_portal_stat",
+				char=self._charname,
+				orig=self._origin,
+				dest=self._destination,
+				k=k,
+				v=v,
+				branching=True,
+			)
 		self.send(self, k=k, v=v)
 		self.character.portal.send(self, k=k, v=v)
 
 	def _del_item(self, k):
-		self.engine_handle(
-			command="del_portal_stat",
-			char=self._charname,
-			orig=self._origin,
-			dest=self._destination,
-			k=k,
-			branching=True,
-		)
+		if not self.engine._batched(
+			self._charname,
+			"portal",
+			(self._origin, self._destination),
+			k,
+			None,
+		):
+			self.engine.handle(
+				command="del_portal_stat",
+				char=self._charname,
+				orig=self._origin,
+				dest=self._destination,
+				k=k,
+				branching=True,
+			)
 		self.character.portal.send(self, k=k, v=None)
 		self.send(self, k=k, v=None)
 
@@ -732,6 +927,7 @@ class ThingMapProxy(CachingProxy):
 
 	@property
 	def _cache(self):
+		self.engine._hydrate(self.name, "node")
 		return self.engine._things_cache.setdefault(self.name, {})
 
 	def __init__(self, engine_proxy, charname):
@@ -806,6 +1002,7 @@ class PlaceMapProxy(CachingProxy):
 
 	@property
 	def _cache(self):
+		self.engine._hydrate(self.name, "node")
 		return self.engine._character_places_cache.setdefault(self.name, {})
 
 	def __init__(self, engine_proxy, character):
@@ -845,6 +1042,7 @@ class PlaceMapProxy(CachingProxy):
 class SuccessorsProxy(CachingProxy):
 	@property
 	def _cache(self):
+		self.engine._hydrate(self._charname, "portal")
 		return self.engine._character_portals_cache.successors[self._charname][
 			self._orig
 		]
@@ -932,6 +1130,7 @@ class CharSuccessorsMappingProxy(CachingProxy):
 
 	@property
 	def _cache(self):
+		self.engine._hydrate(self.name, "portal")
 		return self.engine._character_portals_cache.successors[self.name]
 
 	def __init__(self, engine_proxy, charname):
@@ -984,32 +1183,24 @@ class PredecessorsProxy(MutableMapping):
 		self._charname = charname
 		self.name = destname
 
+	@property
+	def _preds(self):
+		self.engine._hydrate(self._charname, "portal")
+		return self.engine._character_portals_cache.predecessors[
+			self._charname
+		][self.name]
+
 	def __iter__(self):
-		return iter(
-			self.engine._character_portals_cache.predecessors[self._charname][
-				self.name
-			]
-		)
+		return iter(self._preds)
 
 	def __len__(self):
-		return len(
-			self.engine._character_portals_cache.predecessors[self._charname][
-				self.name
-			]
-		)
+		return len(self._preds)
 
 	def __contains__(self, k):
-		return (
-			k
-			in self.engine._character_portals_cache.predecessors[
-				self._charname
-			][self.name]
-		)
+		return k in self._preds
 
 	def __getitem__(self, k):
-		return self.engine._character_portals_cache.predecessors[
-			self._charname
-		][self.name][k]
+		return self._preds[k]
 
 	def __setitem__(self, k, v):
 		self.engine._character_portals_cache.store(
@@ -1039,20 +1230,19 @@ class CharPredecessorsMappingProxy(MutableMapping):
 		self.name = charname
 		self._cache = {}
 
+	@property
+	def _preds(self):
+		self.engine._hydrate(self.name, "portal")
+		return self.engine._character_portals_cache.predecessors[self.name]
+
 	def __contains__(self, k):
-		return (
-			k in self.engine._character_portals_cache.predecessors[self.name]
-		)
+		return k in self._preds
 
 	def __iter__(self):
-		return iter(
-			self.engine._character_portals_cache.predecessors[self.name]
-		)
+		return iter(self._preds)
 
 	def __len__(self):
-		return len(
-			self.engine._character_portals_cache.predecessors[self.name]
-		)
+		return len(self._preds)
 
 	def __getitem__(self, k):
 		if k not in self._cache:
@@ -1082,6 +1272,7 @@ class CharPredecessorsMappingProxy(MutableMapping):
 class CharStatProxy(CachingEntityProxy):
 	@property
 	def _cache(self):
+		self.engine._hydrate(self.name, "stat")
 		return self.engine._char_stat_cache[self.name]
 
 	def __init__(self, engine_proxy, character):
@@ -1112,6 +1303,8 @@ class CharStatProxy(CachingEntityProxy):
 		)
 
 	def _set_item(self, k, v):
+		if self.engine._batched(self.name, "character", None, k, v):
+			return
 		self.engine.handle(
 			command="set_character_stat",
 			char=self.name,
@@ -1121,6 +1314,8 @@ class CharStatProxy(CachingEntityProxy):
 		)
 
 	def _del_item(self, k):
+		if self.engine._batched(self.name, "character", None, k, None):
+			return
 		self.engine.handle(
 			command="del_character_stat", char=self.name, k=k, branching=True
 		)
@@ -1423,6 +1618,7 @@ class CharacterProxy(AbstractCharacter):
 		return self.name, "character"
 
 	def _get_rulebook_proxy(self):
+		self.engine._hydrate(self.name, "stat")
 		return self.engine._character_rulebooks_cache[self.name]["character"]
 
 	def _set_rulebook_proxy(self, rb):
@@ -2285,6 +2481,14 @@ class EngineProxy(AbstractEngine):
 		self._replace_state_with_kf(kf)
 
 	def _replace_state_with_kf(self, kf):
+		with self._hydrate_lock:
+			self._replace_caches_with_kf(kf)
+
+	def _replace_caches_with_kf(self, kf):
+		if self._hydrated is not None:
+			# keep the characters that were in use, forget the rest
+			keep = list(self._hydrated)
+			self._hydrated.clear()
 		self._char_stat_cache = PickyDefaultDict(UnwrappingDict)
 		things = self._things_cache = {}
 		places = self._character_places_cache = {}
@@ -2336,6 +2540,12 @@ class EngineProxy(AbstractEngine):
 			)
 		for (char, orig, dest, _), stats in kf["edge_val"].items():
 			portal_stats[char][orig][dest] = stats
+		if self._hydrated is not None:
+			keep = [char for char in keep if char in chars]
+			for char in chars.keys() - set(keep):
+				self._dehydrate(char)
+			for char in keep:
+				self._hydrated[char] = set(CHARACTER_MAPPINGS)
 
 	def _pull_kf_now(self, *args, **kwargs):
 		self._replace_state_with_kf(self.handle("get_kf_now"))
@@ -2373,8 +2583,20 @@ class EngineProxy(AbstractEngine):
 		install_modules=(),
 		submit_func=None,
 		threads=None,
+		codec: PipeCodec = None,
+		lazy=False,
 	):
 		self.closed = False
+		if lazy:
+			self._hydrated = OrderedDict()
+			self._hydrated_max = (
+				HYDRATED_CHARACTERS if lazy is True else int(lazy)
+			)
+			if self._hydrated_max < 1:
+				raise ValueError("Need to keep at least one character")
+		else:
+			self._hydrated = None
+		self._codec = codec or PipeCodec()
 		if submit_func:
 			self._submit = submit_func
 		else:
@@ -2385,6 +2607,11 @@ class EngineProxy(AbstractEngine):
 		self._handle_in = handle_in
 		self._handle_in_lock = Lock()
 		self._round_trip_lock = Lock()
+		# guards _hydrated, and the caches of characters that are in it
+		self._hydrate_lock = RLock()
+		self._pending = {}
+		self._seq = count()
+		self._batch = None
 		self._commit_lock = Lock()
 		self.logger = logger
 		self.character = self.graph = CharacterMapProxy(self)
@@ -2456,6 +2683,10 @@ class EngineProxy(AbstractEngine):
 			self.handle("install_module", module=module)
 		if do_game_start:
 			self.handle("do_game_start", cb=self._upd_caches)
+		if self._hydrated is not None:
+			for char in self.handle("characters"):
+				self._char_cache[char] = CharacterProxy(self, char)
+			return
 		deltas = self.handle("copy_chars", chars="all")
 		for char, delta in deltas.items():
 			if char not in self.character:
@@ -2468,16 +2699,16 @@ class EngineProxy(AbstractEngine):
 		return getattr(self.method, item)
 
 	def send_bytes(self, obj, blocking=True, timeout=-1):
-		compressed = zlib.compress(obj)
+		encoded = self._codec.encode(obj)
 		self._handle_out_lock.acquire(blocking, timeout)
-		self._handle_out.send_bytes(compressed)
+		self._handle_out.send_bytes(encoded)
 		self._handle_out_lock.release()
 
 	def recv_bytes(self, blocking=True, timeout=-1):
 		self._handle_in_lock.acquire(blocking, timeout)
 		data = self._handle_in.recv_bytes()
 		self._handle_in_lock.release()
-		return zlib.decompress(data)
+		return self._codec.decode(data)
 
 	def debug(self, msg):
 		self.logger.debug(msg)
@@ -2508,6 +2739,11 @@ class EngineProxy(AbstractEngine):
 		only if the branch changes upon completing a command with
 		``branching=True``.
 
+		Some commands stream their results, a character at a time.
+		With a function ``stream_cb``, I'll call it with each character's
+		name and delta, in the order they arrived, before the result is
+		handled. By default, I apply them to my caches.
+
 		With a function ``cb``, I will call ``cb`` when I get
 		a result.
 		``cb`` will be called with keyword arguments ``command``,
@@ -2517,6 +2753,50 @@ class EngineProxy(AbstractEngine):
 		``handle``.`.
 
 		"""
+		start_ts = monotonic()
+		cb = kwargs.pop("cb", None)
+		response = self._send_command(cmd, kwargs)
+		self._wait_for(response)
+		return self._finish_command(kwargs["command"], cb, response, start_ts)
+
+	def submit(self, cmd=None, **kwargs) -> Future:
+		"""Send a command to the LiSE core, and don't wait for it
+
+		Takes the same arguments as :meth:`handle`. Returns a
+		:class:`concurrent.futures.Future` of the result that
+		:meth:`handle` would have returned, or the exception it would
+		have raised. ``cb`` is called on a worker thread.
+
+		The core runs commands in the order it gets them, and answers
+		each in turn, so I match the answers to the commands by
+		sequence number. You can submit as many commands as you like
+		before waiting on any of them, or use :meth:`handle` in the
+		meantime.
+
+		"""
+		start_ts = monotonic()
+		cb = kwargs.pop("cb", None)
+		response = self._send_command(cmd, kwargs)
+		ret = Future()
+		self._submit(
+			self._finish_submitted,
+			kwargs["command"],
+			cb,
+			response,
+			start_ts,
+			ret,
+		)
+		return ret
+
+	async def handle_async(self, cmd=None, **kwargs):
+		"""Send a command to the LiSE core, and await the result
+
+		Takes the same arguments as :meth:`handle`.
+
+		"""
+		return await asyncio.wrap_future(self.submit(cmd, **kwargs))
+
+	def _send_command(self, cmd, kwargs: dict) -> Future:
 		if self.closed:
 			raise RedundantProcessError(f"Already closed: {id(self)}")
 		if "command" in kwargs:
@@ -2525,14 +2805,46 @@ class EngineProxy(AbstractEngine):
 			kwargs["command"] = cmd
 		else:
 			raise TypeError("No command")
-		cb = kwargs.pop("cb", None)
+		stream_cb = kwargs.pop("stream_cb", self._apply_char_delta)
 		assert not kwargs.get("silent")
-		self.debug(f"EngineProxy: sending {cmd}")
-		start_ts = monotonic()
-		with self._round_trip_lock:
-			self.send_bytes(self.pack(kwargs))
-			received = self.recv_bytes()
-		command, branch, turn, tick, r = self.unpack(received)
+		seq = kwargs["__seq__"] = next(self._seq)
+		packed = self.pack(kwargs)
+		response = Future()
+		self._pending[seq] = stream_cb, response
+		self.send_bytes(packed)
+		self.debug(f"EngineProxy: sent {cmd} as #{seq}")
+		return response
+
+	def _wait_for(self, response: Future):
+		"""Receive responses to my commands until ``response`` is done
+
+		The core sends back the sequence number of each command with its
+		result, and that's how I know which future to resolve. Streamed
+		chunks are kept with the response they came before, to be
+		applied by :meth:`_finish_command` once I've let go of the pipe,
+		so that whatever they set off may send commands of its own.
+
+		"""
+		while not response.done():
+			with self._round_trip_lock:
+				if response.done():
+					return
+				chunks = []
+				received = self.recv_bytes()
+				while received.startswith(STREAM_CHUNK):
+					chunks.append(received)
+					received = self.recv_bytes()
+				*reply, seq = self.unpack(received)
+				stream_cb, resp = self._pending.pop(seq)
+				resp.set_result((stream_cb, chunks, reply))
+
+	def _finish_command(self, cmd, cb, response: Future, start_ts):
+		stream_cb, chunks, (command, branch, turn, tick, r) = (
+			response.result()
+		)
+		unpack = self.unpack
+		for chunk in chunks:
+			stream_cb(*unpack(chunk))
 		self.debug(
 			"EngineProxy: received {} in {:,.2f} seconds".format(
 				(command, branch, turn, tick), monotonic() - start_ts
@@ -2553,6 +2865,13 @@ class EngineProxy(AbstractEngine):
 			cb(command=command, branch=branch, turn=turn, tick=tick, result=r)
 		return r
 
+	def _finish_submitted(self, cmd, cb, response, start_ts, ret: Future):
+		try:
+			self._wait_for(response)
+			ret.set_result(self._finish_command(cmd, cb, response, start_ts))
+		except Exception as ex:
+			ret.set_exception(ex)
+
 	def _unpack_recv(self):
 		ret = self.unpack(self.recv_bytes())
 		return ret
@@ -2656,16 +2975,83 @@ class EngineProxy(AbstractEngine):
 			# the "delta" is just the rules list, for now
 			rulebookproxy.send(rulebookproxy, rules=delta)
 		for char, chardelta in deltas.items():
-			if char not in self._char_cache:
-				self._char_cache[char] = CharacterProxy(self, char)
-			chara = self.character[char]
-			chara._apply_delta(chardelta)
+			self._apply_char_delta(char, chardelta)
 			deleted.discard(char)
 		if no_del:
 			return
 		for char in deleted:
 			del self._char_cache[char]
 
+	def _apply_char_delta(self, char, chardelta):
+		if char not in self._char_cache:
+			self._char_cache[char] = CharacterProxy(self, char)
+		if self._hydrated is None:
+			self.character[char]._apply_delta(chardelta)
+			return
+		with self._hydrate_lock:
+			# I'll get the rest if and when it's needed
+			mappings = self._hydrated.get(char)
+			if not mappings:
+				return
+			chardelta = {
+				k: v
+				for (k, v) in chardelta.items()
+				if _DELTA_MAPPING.get(k, "stat") in mappings
+			}
+			self.character[char]._apply_delta(chardelta)
+
+	def _hydrate(self, char: Key, mapping: str) -> None:
+		"""If I'm lazy, make sure I have one mapping of a character
+
+		``mapping`` is ``'stat'`` for the character's stats and
+		rulebooks, ``'node'`` for its nodes and their stats, or
+		``'portal'`` for its portals and theirs. Fetch it from the core
+		if I haven't already.
+
+		The character becomes the most recently used. If that makes
+		too many characters with mappings fetched, forget the one
+		least recently used.
+
+		"""
+		hydrated = self._hydrated
+		if hydrated is None:
+			return
+		with self._hydrate_lock:
+			if char in hydrated:
+				hydrated.move_to_end(char)
+				if mapping in hydrated[char]:
+					return
+			elif char in self._char_cache:
+				hydrated[char] = set()
+				self._trim_hydrated()
+			else:
+				return
+			# other threads wait here until the mapping's actually in
+			hydrated[char].add(mapping)
+			self._char_cache[char]._apply_delta(
+				self.handle("copy_character", char=char, mappings=[mapping])
+			)
+
+	def _trim_hydrated(self):
+		with self._hydrate_lock:
+			while len(self._hydrated) > self._hydrated_max:
+				self._dehydrate(next(iter(self._hydrated)))
+
+	def _dehydrate(self, char: Key) -> None:
+		"""Forget a character's stats, nodes, and portals, until needed"""
+		with self._hydrate_lock:
+			self._hydrated.pop(char, None)
+			for cache in (
+				self._char_stat_cache,
+				self._things_cache,
+				self._character_places_cache,
+				self._node_stat_cache,
+				self._portal_stat_cache,
+				self._character_portals_cache.successors,
+				self._character_portals_cache.predecessors,
+			):
+				cache.pop(char, None)
+
 	def _btt(self):
 		return self._branch, self._turn, self._tick
 
@@ -2712,11 +3098,28 @@ class EngineProxy(AbstractEngine):
 		if cb:
 			cb(*args, **kwargs)
 
+	def _upd_streamed_and_cb(self, streamed, cb, *args, **kwargs):
+		self._upd(*args, **kwargs)
+		# the characters were applied as they arrived; tell cb about them
+		kwargs["result"][1].update(streamed)
+		if cb:
+			cb(*args, **kwargs)
+
 	# TODO: make this into a Signal, like it is in the LiSE core
 	def next_turn(self, cb=None):
 		if cb and not callable(cb):
 			raise TypeError("Uncallable callback")
-		return self.handle("next_turn", cb=partial(self._upd_and_cb, cb))
+		streamed = {}
+
+		def apply_char_delta(char, chardelta):
+			self._apply_char_delta(char, chardelta)
+			streamed[char] = chardelta
+
+		return self.handle(
+			"stream_next_turn",
+			stream_cb=apply_char_delta,
+			cb=partial(self._upd_streamed_and_cb, streamed, cb),
+		)
 
 	def time_travel(self, branch, turn, tick=None, cb=None):
 		"""Move to a different point in the timestream
@@ -2760,6 +3163,11 @@ class EngineProxy(AbstractEngine):
 				"edge": data._adj,
 			}
 		self._char_cache[char] = character = CharacterProxy(self, char)
+		if self._hydrated is not None:
+			# there's nothing to fetch
+			with self._hydrate_lock:
+				self._hydrated[char] = set(CHARACTER_MAPPINGS)
+				self._trim_hydrated()
 		self._char_stat_cache[char] = attr
 		placedata = data.get("place", data.get("node", {}))
 		for place, stats in placedata.items():
@@ -2815,10 +3223,13 @@ class EngineProxy(AbstractEngine):
 		if char not in self._char_cache:
 			raise KeyError("No such character")
 		del self._char_cache[char]
-		del self._char_stat_cache[char]
-		del self._character_places_cache[char]
-		del self._things_cache[char]
-		self._character_portals_cache.delete_char(char)
+		if self._hydrated is None:
+			del self._char_stat_cache[char]
+			del self._character_places_cache[char]
+			del self._things_cache[char]
+			self._character_portals_cache.delete_char(char)
+		else:
+			self._dehydrate(char)
 		self.handle(command="del_character", char=char, branching=True)
 
 	del_graph = del_character
@@ -2826,6 +3237,7 @@ class EngineProxy(AbstractEngine):
 	def del_node(self, char, node):
 		if char not in self._char_cache:
 			raise KeyError("No such character")
+		self._hydrate(char, "node")
 		if (
 			node not in self._character_places_cache[char]
 			and node not in self._things_cache[char]
@@ -2840,6 +3252,7 @@ class EngineProxy(AbstractEngine):
 	def del_portal(self, char, orig, dest):
 		if char not in self._char_cache:
 			raise KeyError("No such character")
+		self._hydrate(char, "portal")
 		self._character_portals_cache.delete(char, orig, dest)
 		self.handle(
 			command="del_portal",
@@ -2853,6 +3266,45 @@ class EngineProxy(AbstractEngine):
 		self._commit_lock.acquire()
 		self.handle("commit", cb=self._release_commit_lock)
 
+	@contextmanager
+	def batch(self):
+		"""Hold changes to stats until the end of the ``with`` block
+
+		Set or delete as many stats of characters, nodes, and portals
+		as you like; the proxies will show the changes right away.
+		When the block ends, they all go to the core in one command.
+		Changing the same stat twice only sends the last value.
+
+		Other commands, like making or deleting nodes, still go to
+		the core right away. Nested batches are part of the outermost.
+
+		"""
+		if self._batch is not None:
+			yield
+			return
+		self._batch = batch = {}
+		try:
+			yield
+		finally:
+			self._batch = None
+			if batch:
+				self.handle("update_characters", patch=batch, branching=True)
+
+	def _batched(self, char: Key, kind: str, entity: Key, k: Key, v) -> bool:
+		"""Hold a change to a stat for the batch, if there is one
+
+		``kind`` is ``'character'``, ``'node'``, or ``'portal'``.
+		Deletions have ``v=None``.
+
+		"""
+		if self._batch is None:
+			return False
+		patch = self._batch.setdefault(char, {}).setdefault(kind, {})
+		if kind != "character":
+			patch = patch.setdefault(entity, {})
+		patch[k] = v
+		return True
+
 	def _release_commit_lock(self, *, command, branch, turn, tick, result):
 		self._commit_lock.release()
 
@@ -2870,19 +3322,44 @@ class EngineProxy(AbstractEngine):
 				yield thing.name
 
 
-def subprocess(args, kwargs, handle_out_pipe, handle_in_pipe, logq, loglevel):
-	"""Loop to handle one command at a time and pipe results back"""
+def subprocess(
+	args,
+	kwargs,
+	handle_out_pipe,
+	handle_in_pipe,
+	logq,
+	loglevel,
+	codec=("zlib", COMPRESS_THRESHOLD),
+	rings=None,
+):
+	"""Loop to handle one command at a time and pipe results back
+
+	``codec`` is the name of the codec the proxy asked for, and the
+	size below which messages shouldn't be compressed. ``rings``, if
+	present, are the names of the :class:`SharedRing` that the proxy
+	writes to, and the one it reads from.
+
+	"""
 	engine_handle = EngineHandle(args, kwargs, logq, loglevel=loglevel)
-	compress = zlib.compress
-	decompress = zlib.decompress
+	if rings:
+		ring_in = SharedRing(name=rings[0])
+		ring_out = SharedRing(name=rings[1])
+		pipe_codec = PipeCodec.negotiate(*codec, ring_out, ring_in)
+	else:
+		pipe_codec = PipeCodec.negotiate(*codec)
+	encode = pipe_codec.encode
+	decode = pipe_codec.decode
 	pack = engine_handle.pack
 
 	while True:
-		inst = decompress(handle_out_pipe.recv_bytes())
+		inst = decode(handle_out_pipe.recv_bytes())
 		if inst == b"shutdown":
 			handle_out_pipe.close()
 			handle_in_pipe.close()
 			logq.close()
+			if rings:
+				ring_in.close()
+				ring_out.close()
 			return 0
 		instruction = engine_handle.unpack(inst)
 		if isinstance(instruction, dict) and "__use_msgspec__" in instruction:
@@ -2891,22 +3368,39 @@ def subprocess(args, kwargs, handle_out_pipe, handle_in_pipe, logq, loglevel):
 			instruction = msgspec.msgpack.decode(instruction["__real__"])
 		silent = instruction.pop("silent", False)
 		cmd = instruction.pop("command")
+		# the proxy matches results to commands by this, when it's sent
+		seq = instruction.pop("__seq__", None)
+		tail = () if seq is None else (seq,)
 
 		branching = instruction.pop("branching", False)
+
+		def call():
+			method = getattr(engine_handle, cmd)
+			r = method(**instruction)
+			if not hasattr(method, "streamed"):
+				return r
+			# send every chunk but the last, which is the result
+			chunks = iter(r)
+			r = next(chunks)
+			for chunk in chunks:
+				handle_in_pipe.send_bytes(encode(r))
+				r = chunk
+			return r
+
 		try:
 			if branching:
 				try:
-					r = getattr(engine_handle, cmd)(**instruction)
+					r = call()
 				except OutOfTimelineError:
 					engine_handle.increment_branch()
-					r = getattr(engine_handle, cmd)(**instruction)
+					r = call()
 			else:
-				r = getattr(engine_handle, cmd)(**instruction)
+				r = call()
 		except AssertionError:
 			raise
 		except Exception as e:
 			handle_in_pipe.send_bytes(
-				compress(
+				encode(
 					engine_handle.pack(
 						(
 							cmd,
@@ -2914,6 +3408,7 @@ def subprocess(args, kwargs, handle_out_pipe, handle_in_pipe, logq, loglevel):
 							engine_handle.turn,
 							engine_handle.tick,
 							e,
+							*tail,
 						)
 					)
 				)
@@ -2921,7 +3416,7 @@ def subprocess(args, kwargs, handle_out_pipe, handle_in_pipe, logq, loglevel):
 			continue
 		if silent:
 			continue
-		resp = msgpack.Packer().pack_array_header(5)
+		resp = msgpack.Packer().pack_array_header(5 + len(tail))
 		resp += (
 			pack(cmd)
 			+ pack(engine_handle.branch)
@@ -2948,7 +3443,9 @@ def subprocess(args, kwargs, handle_out_pipe, handle_in_pipe, logq, loglevel):
 				resp += r
 		else:
 			resp += pack(r)
-		handle_in_pipe.send_bytes(compress(resp))
+		if tail:
+			resp += pack(seq)
+		handle_in_pipe.send_bytes(encode(resp))
 		if hasattr(engine_handle, "_after_ret"):
 			engine_handle._after_ret()
 			del engine_handle._after_ret
@@ -2960,7 +3457,24 @@ class RedundantProcessError(ProcessError):
 
 class EngineProcessManager(object):
 	def start(self, *args, **kwargs):
-		"""Start LiSE in a subprocess, and return a proxy to it"""
+		"""Start LiSE in a subprocess, and return a proxy to it
+
+		Takes the same arguments as :class:`LiSE.Engine`, as well as
+		some for the proxy. ``codec`` names the compression to use on
+		the pipe between the two, one of ``'zstd'``, ``'lz4'``, or
+		``'zlib'``; by default, the fastest installed. Messages shorter
+		than ``compress_threshold`` bytes aren't compressed at all.
+
+		With ``shared_memory``, longer messages go through a pair of
+		ring buffers in shared memory instead, when they fit; pass
+		the size of each in bytes, or ``True`` for 64 MiB.
+
+		With ``lazy``, the proxy only fetches a character's stats, nodes,
+		or portals when you first use them, and forgets them again when
+		it has too many characters' worth; pass how many to keep, or
+		``True`` for 8.
+
+		"""
 		if hasattr(self, "engine_proxy"):
 			raise RedundantProcessError("Already started")
 		(handle_out_pipe_recv, self._handle_out_pipe_send) = Pipe(duplex=False)
@@ -3006,6 +3520,24 @@ class EngineProcessManager(object):
 			if "install_modules" in kwargs
 			else []
 		)
+		shared_memory = kwargs.pop("shared_memory", 0)
+		if shared_memory is True:
+			shared_memory = SHARED_MEMORY_SIZE
+		if shared_memory:
+			self._rings = (
+				SharedRing(shared_memory),
+				SharedRing(shared_memory),
+			)
+			rings = tuple(ring.name for ring in self._rings)
+		else:
+			self._rings = ()
+			rings = None
+		lazy = kwargs.pop("lazy", False)
+		codec = PipeCodec(
+			kwargs.pop("codec", None),
+			kwargs.pop("compress_threshold", COMPRESS_THRESHOLD),
+			*self._rings,
+		)
 		formatter = logging.Formatter(
 			fmt="[{levelname}] LiSE.proxy({process}) t{message}", style="{"
 		)
@@ -3022,6 +3554,8 @@ class EngineProcessManager(object):
 				handle_in_pipe_send,
 				self.logq,
 				loglevel,
+				(codec.codec, codec.threshold),
+				rings,
 			),
 		)
 		self._p.daemon = True
@@ -3036,6 +3570,8 @@ class EngineProcessManager(object):
 			self.logger,
 			do_game_start,
 			install_modules,
+			codec=codec,
+			lazy=lazy,
 		)
 		return self.engine_proxy
 
@@ -3067,4 +3603,6 @@ class EngineProcessManager(object):
 		"""Close the engine in the subprocess, then join the subprocess"""
 		self.engine_proxy.close()
 		self._p.join()
+		for ring in self._rings:
+			ring.close()
 		del self.engine_proxy
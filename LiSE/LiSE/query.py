@@ -36,22 +36,24 @@ Other comparison operators like ``>`` and ``<`` work as well.
 """
 
 import operator
+from bisect import bisect_right
 from collections.abc import MutableMapping, Sequence, Set
 from itertools import chain
 from operator import gt, lt, eq, ne, le, ge
-from functools import partialmethod
+from functools import partial, partialmethod
 from time import monotonic
 from queue import Queue
 from threading import Thread
 from typing import Any, List, Callable, Tuple
 
-from sqlalchemy import select, and_, Table
+import msgpack
+from sqlalchemy import select, and_, or_, case, null, Table
 from sqlalchemy.sql.functions import func
 from .alchemy import meta, gather_sql
 
-from .allegedb import query
+from .allegedb import kv, query
 from .exc import IntegrityError, OperationalError
-from .util import EntityStatAccessor
+from .util import EntityStatAccessor, set_bit
 import LiSE
 
 
@@ -184,6 +186,156 @@ def windows_intersection(
 	return done
 
 
+class TurnIntervals(Sequence, Set):
+	"""Turns, stored as a sorted list of half-open ``(start, end)`` spans
+
+	Membership tests are a binary search, and turns are generated one at a
+	time when you iterate, so a span of a million turns costs no more
+	memory than a span of one.
+
+	"""
+
+	__slots__ = ("_spans", "_starts", "_offsets", "_len")
+
+	def __init__(self, spans=()):
+		"""Take ``(start, end)`` pairs in any order, overlapping or not"""
+		merged = []
+		for start, end in sorted(spans):
+			if start >= end:
+				continue
+			if merged and start <= merged[-1][1]:
+				if end > merged[-1][1]:
+					merged[-1] = (merged[-1][0], end)
+			else:
+				merged.append((start, end))
+		self._set_spans(merged)
+
+	@classmethod
+	def _from_spans(cls, spans):
+		"""Make an instance from spans that are already sorted and merged"""
+		ret = cls.__new__(cls)
+		ret._set_spans(spans)
+		return ret
+
+	@classmethod
+	def _from_iterable(cls, turns):
+		spans = []
+		for turn in sorted(turns):
+			if spans and turn <= spans[-1][1]:
+				if turn == spans[-1][1]:
+					spans[-1] = (spans[-1][0], turn + 1)
+			else:
+				spans.append((turn, turn + 1))
+		return cls._from_spans(spans)
+
+	def _set_spans(self, spans):
+		self._spans = spans
+		self._starts = [start for (start, _) in spans]
+		# how many turns come before each span
+		self._offsets = offsets = []
+		n = 0
+		for start, end in spans:
+			offsets.append(n)
+			n += end - start
+		self._len = n
+
+	@property
+	def spans(self) -> List[Tuple[int, int]]:
+		return list(self._spans)
+
+	def __contains__(self, turn):
+		try:
+			i = bisect_right(self._starts, turn) - 1
+		except TypeError:
+			return False
+		return i >= 0 and turn < self._spans[i][1]
+
+	def __iter__(self):
+		for start, end in self._spans:
+			yield from range(start, end)
+
+	def __reversed__(self):
+		for start, end in reversed(self._spans):
+			yield from range(end - 1, start - 1, -1)
+
+	def __len__(self):
+		return self._len
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self[j] for j in range(*i.indices(self._len))]
+		if i < 0:
+			i += self._len
+		if not 0 <= i < self._len:
+			raise IndexError("Turn index out of range")
+		span = bisect_right(self._offsets, i) - 1
+		return self._spans[span][0] + i - self._offsets[span]
+
+	def index(self, turn, start=0, stop=None):
+		if turn not in self:
+			raise ValueError(f"{turn} is not in {self}")
+		span = bisect_right(self._starts, turn) - 1
+		i = self._offsets[span] + turn - self._spans[span][0]
+		if i < start or (stop is not None and i >= stop):
+			raise ValueError(f"{turn} is not in that part of {self}")
+		return i
+
+	def count(self, turn):
+		return 1 if turn in self else 0
+
+	def __eq__(self, other):
+		if isinstance(other, TurnIntervals):
+			return self._spans == other._spans
+		return super().__eq__(other)
+
+	__hash__ = None
+
+	def __or__(self, other):
+		if not isinstance(other, TurnIntervals):
+			return super().__or__(other)
+		return TurnIntervals(self._spans + other._spans)
+
+	def __and__(self, other):
+		if not isinstance(other, TurnIntervals):
+			return super().__and__(other)
+		left = self._spans
+		right = other._spans
+		spans = []
+		i = j = 0
+		while i < len(left) and j < len(right):
+			start = max((left[i][0], right[j][0]))
+			end = min((left[i][1], right[j][1]))
+			if start < end:
+				spans.append((start, end))
+			if left[i][1] < right[j][1]:
+				i += 1
+			else:
+				j += 1
+		return self._from_spans(spans)
+
+	def __sub__(self, other):
+		if not isinstance(other, TurnIntervals):
+			return super().__sub__(other)
+		right = other._spans
+		spans = []
+		j = 0
+		for start, end in self._spans:
+			while j < len(right) and right[j][1] <= start:
+				j += 1
+			k = j
+			while k < len(right) and right[k][0] < end:
+				if right[k][0] > start:
+					spans.append((start, right[k][0]))
+				start = max((start, right[k][1]))
+				k += 1
+			if start < end:
+				spans.append((start, end))
+		return self._from_spans(spans)
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self._spans})"
+
+
 def _the_select(tab: Table, val_col="value"):
 	return select(
 		tab.c.turn.label("turn_from"),
@@ -352,7 +504,7 @@ def _make_edge_val_select(
 				tab.c.dest == dest,
 				tab.c.idx == idx,
 				tab.c.key == stat,
-				tab.c.branches.in_(branches),
+				tab.c.branch.in_(branches),
 			)
 		)
 	ticksel = (
@@ -454,6 +606,106 @@ def _make_side_sel(
 		raise TypeError(f"Unknown entity type {type(entity)}")
 
 
+def _side_where(entity, stat, pack: callable):
+	"""Return the table a stat is kept in, and which rows are its
+
+	That's the table's name, the column with the value, and the columns
+	and values to match, for a key-value store's ``stat_windows``.
+
+	"""
+	from .character import AbstractCharacter
+	from .node import Place
+	from .node import Thing
+	from .portal import Portal
+
+	if isinstance(entity, AbstractCharacter):
+		return (
+			"graph_val",
+			"value",
+			("graph", "key"),
+			(pack(entity.name), pack(stat)),
+		)
+	elif isinstance(entity, Thing) and stat == "location":
+		return (
+			"things",
+			"location",
+			("character", "thing"),
+			(pack(entity.character.name), pack(entity.name)),
+		)
+	elif isinstance(entity, (Place, Thing)):
+		return (
+			"node_val",
+			"value",
+			("graph", "node", "key"),
+			(pack(entity.character.name), pack(entity.name), pack(stat)),
+		)
+	elif isinstance(entity, Portal):
+		return (
+			"edge_val",
+			"value",
+			("graph", "orig", "dest", "idx", "key"),
+			(
+				pack(entity.character.name),
+				pack(entity.origin.name),
+				pack(entity.destination.name),
+				0,
+				pack(stat),
+			),
+		)
+	else:
+		raise TypeError(f"Unknown entity type {type(entity)}")
+
+
+# first bytes of msgpack's integer and float formats
+_MSGPACK_NUMBER_TYPES = frozenset(
+	chain(range(0x00, 0x80), range(0xCA, 0xD4), range(0xE0, 0x100))
+)
+
+
+def _packed_number(packed):
+	"""Return the number that ``packed`` holds, or ``None`` if it isn't one
+
+	Made callable from SQL as ``lise_number``, so that :meth:`turns_when`
+	can compare numbers in the database.
+
+	"""
+	if not packed or packed[0] not in _MSGPACK_NUMBER_TYPES:
+		return None
+	val = msgpack.unpackb(packed)
+	if _is_sql_number(val):
+		return val
+
+
+def _is_sql_number(val) -> bool:
+	"""Whether SQLite compares ``val`` the same way Python does"""
+	if isinstance(val, bool):
+		return False
+	if isinstance(val, int):
+		return -(2**63) <= val < 2**63
+	# SQLite has no NaN
+	return isinstance(val, float) and val == val
+
+
+def _make_side_cmp_sel(side_sel, val_col: str, cmp: Callable):
+	"""Filter a select from :func:`_make_side_sel` with a comparison
+
+	``cmp`` takes an SQL expression for the value as a number. Rows where
+	it's true come back with ``None`` in place of the value. Rows whose
+	value isn't a number come back with it, still packed, so you can
+	compare it in Python.
+
+	"""
+	sub = side_sel.subquery()
+	num = func.lise_number(sub.c[val_col])
+	return select(
+		sub.c.turn_from,
+		sub.c.tick_from,
+		sub.c.turn_to,
+		sub.c.tick_to,
+		case((num.is_(None), sub.c[val_col]), else_=null()).label(val_col),
+	).where(or_(num.is_(None), cmp(num)))
+
+
 def _getcol(alias: "StatusAlias"):
 	from .node import Thing
 
@@ -469,7 +721,8 @@ class QueryResult(Sequence, Set):
 	the predicate for that turn number, and testing for membership of nearby
 	turns is fast. Accessing the start or the end of the QueryResult only
 	evaluates the initial or final item. Other forms of access cause the whole
-	query to be evaluated in parallel.
+	query to be evaluated in parallel, and the result kept as
+	:class:`TurnIntervals`.
 
 	"""
 
@@ -479,34 +732,30 @@ class QueryResult(Sequence, Set):
 		self._past_r = windows_r
 		self._future_r = []
 		self._oper = oper
-		self._list = None
-		self._trues = set()
-		self._falses = set()
+		self._intervals = None
 		self._end_of_time = end_of_time
 
-	def __iter__(self):
-		if self._list is None:
+	def _get_intervals(self) -> TurnIntervals:
+		if self._intervals is None:
 			self._generate()
-		return iter(self._list)
+		return self._intervals
+
+	def __iter__(self):
+		return iter(self._get_intervals())
 
 	def __reversed__(self):
-		if self._list is None:
-			self._generate()
-		return reversed(self._list)
+		return reversed(self._get_intervals())
 
 	def __len__(self):
-		if not self._list:
-			self._generate()
-		return len(self._list)
+		return len(self._get_intervals())
 
 	def __getitem__(self, item):
-		if not self._list:
+		if self._intervals is None:
 			if item == 0:
 				return self._first()
 			elif item == -1:
 				return self._last()
-			self._generate()
-		return self._list[item]
+		return self._get_intervals()[item]
 
 	def _generate(self):
 		raise NotImplementedError("_generate")
@@ -546,22 +795,13 @@ class QueryResultEndTurn(QueryResult):
 			bools = self._oper(np.array(left), np.array(right))
 		except ImportError:
 			bools = [self._oper(l, r) for (l, r) in zip(left, right)]
-		self._list = _list = []
-		append = _list.append
-		add = self._trues.add
-		for span, buul in zip(spans, bools):
-			if buul:
-				for turn in range(*span):
-					append(turn)
-					add(turn)
+		self._intervals = TurnIntervals(
+			span for (span, buul) in zip(spans, bools) if buul
+		)
 
 	def __contains__(self, item):
-		if self._list is not None:
-			return item in self._trues
-		elif item in self._trues:
-			return True
-		elif item in self._falses:
-			return False
+		if self._intervals is not None:
+			return item in self._intervals
 		future_l = self._future_l
 		past_l = self._past_l
 		future_r = self._future_r
@@ -582,12 +822,7 @@ class QueryResultEndTurn(QueryResult):
 			future_r.append(past_r.pop())
 		while future_r and future_r[-1][0] <= item:
 			past_r.append(future_r.pop())
-		ret = self._oper(past_l[-1][2], past_r[-1][2])
-		if ret:
-			self._trues.add(item)
-		else:
-			self._falses.add(item)
-		return ret
+		return self._oper(past_l[-1][2], past_r[-1][2])
 
 	def _last(self):
 		"""Get the last turn on which the predicate held true"""
@@ -598,7 +833,7 @@ class QueryResultEndTurn(QueryResult):
 		past_r = self._past_r
 		future_r = self._future_r
 		while future_r:
-			past_r.append(future_r)
+			past_r.append(future_r.pop())
 		oper = self._oper
 		while past_l and past_r:
 			l_from, l_to, l_v = past_l[-1]
@@ -618,10 +853,10 @@ class QueryResultEndTurn(QueryResult):
 
 	def _first(self):
 		"""Get the first turn on which the predicate held true"""
-		if self._list is not None:
-			if not self._list:
+		if self._intervals is not None:
+			if not self._intervals:
 				return
-			return self._list[0]
+			return self._intervals[0]
 		oper = self._oper
 		for turn_from, turn_to, l_v, r_v in _yield_intersections(
 			chain(iter(self._past_l), reversed(self._future_l)),
@@ -715,25 +950,15 @@ class QueryResultMidTurn(QueryResult):
 			bools = self._oper(np.array(left), np.array(right))
 		except ImportError:
 			bools = [self._oper(l, r) for (l, r) in zip(left, right)]
-		trues = self._trues
-		_list = self._list = []
-		for span, buul in zip(spans, bools):
-			if buul:
-				for turn in range(
-					span[0][0], span[1][0] + (1 if span[1][1] else 0)
-				):
-					if turn in trues:
-						continue
-					trues.add(turn)
-					_list.append(turn)
+		self._intervals = TurnIntervals(
+			(time_from[0], time_to[0] + (1 if time_to[1] else 0))
+			for ((time_from, time_to), buul) in zip(spans, bools)
+			if buul
+		)
 
 	def __contains__(self, item):
-		if self._list is not None:
-			return item in self._trues
-		if item in self._trues:
-			return True
-		if item in self._falses:
-			return False
+		if self._intervals is not None:
+			return item in self._intervals
 		future_l = self._future_l
 		past_l = self._past_l
 		future_r = self._future_r
@@ -796,7 +1021,7 @@ class QueryResultMidTurn(QueryResult):
 		past_r = self._past_r
 		future_r = self._future_r
 		while future_r:
-			past_r.append(future_r)
+			past_r.append(future_r.pop())
 		oper = self._oper
 		while past_l and past_r:
 			l_from, l_to, l_v = past_l[-1]
@@ -825,28 +1050,271 @@ class QueryResultMidTurn(QueryResult):
 				return time_from[0]
 
 
+def _as_intervals(turns) -> TurnIntervals:
+	if isinstance(turns, QueryResult):
+		return turns._get_intervals()
+	elif isinstance(turns, TurnIntervals):
+		return turns
+	return TurnIntervals._from_iterable(turns)
+
+
 class CombinedQueryResult(QueryResult):
 	def __init__(self, left: QueryResult, right: QueryResult, oper):
 		self._left = left
 		self._right = right
 		self._oper = oper
+		self._intervals = None
 
-	def _genset(self):
-		if not hasattr(self, "_set"):
-			self._set = self._oper(set(self._left), set(self._right))
+	def _generate(self):
+		self._intervals = self._oper(
+			_as_intervals(self._left), _as_intervals(self._right)
+		)
 
-	def __iter__(self):
-		self._genset()
-		return iter(self._set)
+	def _first(self):
+		intervals = self._get_intervals()
+		if intervals:
+			return intervals[0]
 
-	def __len__(self):
-		self._genset()
-		return len(self._set)
+	def _last(self):
+		intervals = self._get_intervals()
+		if intervals:
+			return intervals[-1]
 
 	def __contains__(self, item):
-		if hasattr(self, "_set"):
-			return item in self._set
-		return self._oper(item in self._left, item in self._right)
+		if self._intervals is not None:
+			return item in self._intervals
+		return bool(
+			self._oper(
+				{item} if item in self._left else set(),
+				{item} if item in self._right else set(),
+			)
+		)
+
+	def __repr__(self):
+		return (
+			f"<{self.__class__.__name__}({self._left!r}, {self._right!r}, "
+			f"{self._oper})>"
+		)
+
+
+def _watched_key(engine, alias: "StatusAlias"):
+	"""Return the cache that stores ``alias``, and its key therein"""
+	from .character import AbstractCharacter
+	from .node import Node
+	from .node import Thing
+	from .portal import Portal
+
+	entity = alias.entity
+	stat = alias.stat
+	if isinstance(entity, AbstractCharacter):
+		return engine._graph_val_cache, (entity.name, stat)
+	elif isinstance(entity, Thing) and stat == "location":
+		return engine._things_cache, (entity.character.name, entity.name)
+	elif isinstance(entity, Node):
+		return engine._node_val_cache, (
+			entity.character.name,
+			entity.name,
+			stat,
+		)
+	elif isinstance(entity, Portal):
+		return engine._edge_val_cache, (
+			entity.character.name,
+			entity.origin.name,
+			entity.destination.name,
+			0,
+			stat,
+		)
+	else:
+		raise TypeError(f"Unknown entity type {type(entity)}")
+
+
+class StandingQuery(QueryResult):
+	"""A query result that keeps up with the simulation
+
+	Made by :meth:`LiSE.Engine.standing_query`. I run the query once, like
+	``turns_when``, then listen to the caches for new values of the stats
+	in it. When you look at me again, I only evaluate the query on the
+	turns when one of those stats changed, so it costs about the same to
+	ask every turn no matter how long the history gets.
+
+	If you go to another branch, or change a turn I've already evaluated,
+	I'll run the whole query again.
+
+	Call my ``close`` method when you no longer need me.
+
+	"""
+
+	def __init__(self, engine, qry: "Query", mid_turn=False):
+		self._engine = engine
+		self._qry = qry
+		self._mid_turn = mid_turn
+		self._oper = qry.oper
+		self._intervals = None
+		if isinstance(qry, CompoundQuery):
+			self._left = StandingQuery(engine, qry.leftside, mid_turn)
+			self._right = StandingQuery(engine, qry.rightside, mid_turn)
+			return
+		if not isinstance(qry, ComparisonQuery):
+			raise TypeError("Unsupported query type: " + repr(type(qry)))
+		self._left = self._right = None
+		watched = {}
+		for side in (qry.leftside, qry.rightside):
+			if isinstance(side, StatusAlias):
+				cache, key = _watched_key(engine, side)
+				watched.setdefault(cache, set()).add(key)
+		self._watched = watched
+		self._listeners = []
+		for cache, keys in watched.items():
+			listener = partial(self._on_store, keys)
+			cache.store_listeners.append(listener)
+			self._listeners.append((cache, listener))
+		self._reset()
+
+	def close(self):
+		"""Stop keeping up with the simulation"""
+		if self._left is not None:
+			self._left.close()
+			self._right.close()
+			return
+		for cache, listener in self._listeners:
+			cache.store_listeners.remove(listener)
+		self._listeners = []
+
+	def _on_store(self, keys, args):
+		if args[:-4] not in keys:
+			return
+		branch, turn, tick = args[-4:-1]
+		if branch != self._branch:
+			return
+		if turn < self._settled:
+			self._stale = True
+		else:
+			self._changes.setdefault(turn, set()).add(tick)
+
+	def _side_at(self, side, branch, turn, tick):
+		if not isinstance(side, StatusAlias):
+			return side
+		engine = self._engine
+		now = engine._btt()
+		engine._set_btt(branch, turn, tick)
+		try:
+			entity = side.entity
+			if hasattr(entity, "stat"):
+				res = entity.stat[side.stat]
+			else:
+				res = entity[side.stat]
+		finally:
+			engine._set_btt(*now)
+		for munger in side.mungers:
+			res = munger(res)
+		return res
+
+	def _holds(self, branch, turn, tick) -> bool:
+		qry = self._qry
+		try:
+			return bool(
+				qry.oper(
+					self._side_at(qry.leftside, branch, turn, tick),
+					self._side_at(qry.rightside, branch, turn, tick),
+				)
+			)
+		except KeyError:
+			return False
+
+	def _eval_turn(self, turn, ticks, held_before) -> Tuple[bool, bool]:
+		"""Return whether I held in ``turn``, and at its end
+
+		``ticks`` are when my stats changed in the turn, and
+		``held_before`` is whether I held at the end of the turn before.
+
+		"""
+		branch = self._branch
+		held_end = held_before
+		held_any = held_before and 0 not in ticks
+		for tick in sorted(ticks):
+			held_end = self._holds(branch, turn, tick)
+			held_any = held_any or held_end
+		if self._mid_turn:
+			return held_any, held_end
+		return held_end, held_end
+
+	def _reset(self):
+		engine = self._engine
+		self._branch = branch = engine.branch
+		# the latest turn may yet change, so it's never settled
+		self._settled = latest = engine._branch_end_plan[branch]
+		self._stale = False
+		# the listeners haven't seen what happened in the latest turn yet
+		self._changes = changes = {}
+		for cache, keys in self._watched.items():
+			if branch not in cache.settings:
+				continue
+			settings_turns = cache.settings[branch]
+			if latest not in settings_turns:
+				continue
+			for tick, setting in settings_turns[latest].items():
+				if setting[:-1] in keys:
+					changes.setdefault(latest, set()).add(tick)
+		intervals = _as_intervals(engine.turns_when(self._qry, self._mid_turn))
+		self._spans = (intervals & TurnIntervals([(0, latest)])).spans
+		self._held = latest > 0 and self._holds(
+			branch, latest - 1, engine._turn_end_plan[branch, latest - 1]
+		)
+
+	def _extend(self, start, end):
+		spans = self._spans
+		if spans and spans[-1][1] == start:
+			spans[-1] = (spans[-1][0], end)
+		else:
+			spans.append((start, end))
+
+	def _catch_up(self) -> TurnIntervals:
+		engine = self._engine
+		if self._stale or engine.branch != self._branch:
+			self._reset()
+		latest = engine._branch_end_plan[self._branch]
+		if latest < self._settled:
+			self._reset()
+			latest = self._settled
+		changes = self._changes
+		held = self._held
+		for turn in sorted(t for t in changes if t < latest):
+			if held:
+				self._extend(self._settled, turn)
+			held_in, held = self._eval_turn(turn, changes.pop(turn), held)
+			if held_in:
+				self._extend(turn, turn + 1)
+			self._settled = turn + 1
+		if held:
+			self._extend(self._settled, latest)
+		self._settled = latest
+		self._held = held
+		spans = list(self._spans)
+		if self._eval_turn(latest, changes.get(latest, ()), held)[0]:
+			if spans and spans[-1][1] == latest:
+				spans[-1] = (spans[-1][0], latest + 1)
+			else:
+				spans.append((latest, latest + 1))
+		return TurnIntervals._from_spans(spans)
+
+	def _get_intervals(self) -> TurnIntervals:
+		if self._left is not None:
+			return self._oper(
+				self._left._get_intervals(), self._right._get_intervals()
+			)
+		return self._catch_up()
+
+	def __getitem__(self, item):
+		return self._get_intervals()[item]
+
+	def __contains__(self, item):
+		return item in self._get_intervals()
+
+	def __repr__(self):
+		return (
+			f"<{self.__class__.__name__}({self._qry!r}, "
+			f"mid_turn={self._mid_turn})>"
+		)
 
 
 class Query(object):
@@ -1056,6 +1524,8 @@ def slow_iter_btts_eval_cmp(qry, oper, start_branch=None, engine=None):
 
 
 class ConnectionHolder(query.ConnectionHolder):
+	sqlite_functions = {"lise_number": (1, _packed_number)}
+
 	def gather(self, meta):
 		return gather_sql(meta)
 
@@ -1086,6 +1556,8 @@ class ConnectionHolder(query.ConnectionHolder):
 			"character_portal_rules_handled",
 			"node_rules_handled",
 			"portal_rules_handled",
+			"rules_handled_entities",
+			"rules_handled",
 			"rule_triggers",
 			"rule_prereqs",
 			"rule_actions",
@@ -1100,19 +1572,37 @@ class ConnectionHolder(query.ConnectionHolder):
 		schemaver_b = b"\xb4_lise_schema_version"
 		ver = self.call_one("global_get", schemaver_b).fetchone()
 		if ver is None:
-			self.call_one("global_insert", schemaver_b, b"\x00")
-		elif ver[0] != b"\x00":
+			self.call_one("global_insert", schemaver_b, b"\x01")
+		elif ver[0] == b"\x00":
+			# version 0 kept a row per rule handled, which is still loaded,
+			# but LiSE that old wouldn't know to load the bitmaps
+			self.call_one("global_update", b"\x01", schemaver_b)
+		elif ver[0] != b"\x01":
 			return ValueError(
 				f"Unsupported database schema version: {ver}", ver
 			)
 
 
+class KeyValueConnectionHolder(kv.KeyValueHolder, ConnectionHolder):
+	selects = {
+		**kv.KeyValueHolder.selects,
+		"branch_children": ("branches", ("branch",), ("parent",)),
+	}
+	updates = {
+		**kv.KeyValueHolder.updates,
+		"rulebooks_update": ("rulebooks", ("rules",)),
+		"turns_completed_update": ("turns_completed", ("turn",)),
+	}
+
+
 class QueryEngine(query.QueryEngine):
 	exist_edge_t = 0
 	path = LiSE.__path__[0]
 	IntegrityError = IntegrityError
 	OperationalError = OperationalError
 	holder_cls = ConnectionHolder
+	kv_holder_cls = KeyValueConnectionHolder
+	keyframe_eager_keys = ("location",)
 	tables = (
 		"global",
 		"branches",
@@ -1148,27 +1638,55 @@ class QueryEngine(query.QueryEngine):
 		"character_thing_rules_handled",
 		"character_place_rules_handled",
 		"character_portal_rules_handled",
+		"rules_handled_entities",
+		"rules_handled",
 		"turns_completed",
 	)
 
-	def __init__(self, dbstring, connect_args, pack=None, unpack=None):
+	def __init__(
+		self, dbstring, connect_args, pack=None, unpack=None, pack_many=None
+	):
 		super().__init__(
-			dbstring, connect_args, pack, unpack, gather=gather_sql
+			dbstring,
+			connect_args,
+			pack,
+			unpack,
+			gather=gather_sql,
+			pack_many=pack_many,
 		)
 
 		self._records = 0
 		self.keyframe_interval = None
 		self.snap_keyframe = lambda: None
-		self._char_rules_handled = []
-		self._unit_rules_handled = []
-		self._char_thing_rules_handled = []
-		self._char_place_rules_handled = []
-		self._char_portal_rules_handled = []
-		self._node_rules_handled = []
-		self._portal_rules_handled = []
+		self._rules_handled_entities = []
+		self._rules_handled = {}
 		self._unitness = []
 		self._location = []
 
+	@property
+	def compares_in_sql(self) -> bool:
+		"""Whether ``lise_number`` is available for queries to call"""
+		return self._holder.has_sqlite_functions
+
+	def stat_windows(self, entity, stat, branches: List[str], mid_turn: bool):
+		"""Return the windows of time when a stat had each of its values
+
+		Rows are ``(turn_from, tick_from, turn_to, tick_to, value)``, with
+		the value packed. SQL databases get a select from
+		:func:`_make_side_sel`; key-value stores work it out themselves.
+
+		"""
+		if isinstance(self._holder, kv.KeyValueHolder):
+			return self.call_one(
+				"stat_windows",
+				*_side_where(entity, stat, self.pack),
+				branches,
+				mid_turn,
+			)
+		return self.execute(
+			_make_side_sel(entity, stat, branches, self.pack, mid_turn)
+		)
+
 	def _increc(self):
 		self._records += 1
 		if (
@@ -1239,27 +1757,29 @@ class QueryEngine(query.QueryEngine):
 			)
 			put(("silent", "many", "things_insert", self._location))
 			self._location = []
-		for attr, cmd in [
-			("_char_rules_handled", "character_rules_handled_insert"),
-			("_unit_rules_handled", "unit_rules_handled_insert"),
-			(
-				"_char_thing_rules_handled",
-				"character_thing_rules_handled_insert",
-			),
-			(
-				"_char_place_rules_handled",
-				"character_place_rules_handled_insert",
-			),
-			(
-				"_char_portal_rules_handled",
-				"character_portal_rules_handled_insert",
-			),
-			("_node_rules_handled", "_node_rules_handled_insert"),
-			("_portal_rules_handled", "portal_rules_handled_insert"),
-		]:
-			if getattr(self, attr):
-				put(("silent", "many", cmd, getattr(self, attr)))
-			setattr(self, attr, [])
+		if self._rules_handled_entities:
+			put(
+				(
+					"silent",
+					"many",
+					"rules_handled_entities_insert",
+					self._rules_handled_entities,
+				)
+			)
+			self._rules_handled_entities = []
+		if self._rules_handled:
+			put(
+				(
+					"silent",
+					"many",
+					"rules_handled_insert",
+					[
+						(*key, bytes(entities))
+						for (key, entities) in self._rules_handled.items()
+					],
+				)
+			)
+			self._rules_handled = {}
 		assert self.echo("flushed") == "flushed"
 
 	def universals_dump(self):
@@ -1905,135 +2425,39 @@ class QueryEngine(query.QueryEngine):
 		)
 		self._increc()
 
-	def handled_character_rule(
-		self, character, rulebook, rule, branch, turn, tick
-	):
-		(character, rulebook) = map(self.pack, (character, rulebook))
-		self._char_rules_handled.append(
-			(character, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
-
-	def _flush_char_rules_handled(self):
-		if not self._char_rules_handled:
-			return
-		self.call_many(
-			"character_rules_handled_insert", self._char_rules_handled
-		)
-		self._char_rules_handled = []
-
-	def handled_unit_rule(
-		self, character, rulebook, rule, graph, unit, branch, turn, tick
-	):
-		character, graph, unit, rulebook = map(
-			self.pack, (character, graph, unit, rulebook)
-		)
-		self._unit_rules_handled.append(
-			(character, graph, unit, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
-
-	def _flush_unit_rules_handled(self):
-		if not self._unit_rules_handled:
-			return
-		self.call_many("unit_rules_handled_insert", self._unit_rules_handled)
-		self._unit_rules_handled = []
-
-	def handled_character_thing_rule(
-		self, character, rulebook, rule, thing, branch, turn, tick
-	):
-		character, thing, rulebook = map(
-			self.pack, (character, thing, rulebook)
-		)
-		self._char_thing_rules_handled.append(
-			(character, thing, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
-
-	def _flush_char_thing_rules_handled(self):
-		if not self._char_thing_rules_handled:
-			return
-		self.call_many(
-			"character_thing_rules_handled_insert",
-			self._char_thing_rules_handled,
-		)
-		self._char_thing_rules_handled = []
+	def rules_handled_entity(self, kind, i, entity):
+		self._rules_handled_entities.append((kind, i, self.pack(entity)))
 
-	def handled_character_place_rule(
-		self, character, rulebook, rule, place, branch, turn, tick
-	):
-		character, rulebook, place = map(
-			self.pack, (character, rulebook, place)
-		)
-		self._char_place_rules_handled.append(
-			(character, place, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
+	def handled_rule(self, kind, rulebook, rule, branch, turn, tick, i):
+		"""Record that the ``i``-th entity of the kind had the rule handled
 
-	def _flush_char_place_rules_handled(self):
-		if not self._char_place_rules_handled:
-			return
-		self.call_many(
-			"character_place_rules_handled_insert",
-			self._char_place_rules_handled,
-		)
-		self._char_place_rules_handled = []
+		Entities that have the same rule handled at the same tick share a
+		row, with a bitmap of which ones.
 
-	def handled_character_portal_rule(
-		self, character, rulebook, rule, orig, dest, branch, turn, tick
-	):
-		character, rulebook, orig, dest = map(
-			self.pack, (character, rulebook, orig, dest)
-		)
-		self._char_portal_rules_handled.append(
-			(character, orig, dest, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
-
-	def _flush_char_portal_rules_handled(self):
-		if not self._char_portal_rules_handled:
-			return
-		self.call_many(
-			"character_portal_rules_handled_insert",
-			self._char_portal_rules_handled,
-		)
-		self._char_portal_rules_handled = []
-
-	def handled_node_rule(
-		self, character, node, rulebook, rule, branch, turn, tick
-	):
-		(character, node, rulebook) = map(
-			self.pack, (character, node, rulebook)
-		)
-		self._node_rules_handled.append(
-			(character, node, rulebook, rule, branch, turn, tick)
-		)
+		"""
+		key = (kind, self.pack(rulebook), rule, branch, turn, tick)
+		if key not in self._rules_handled:
+			self._rules_handled[key] = bytearray()
+		set_bit(self._rules_handled[key], i)
 		self._increc()
 
-	def _flush_node_rules_handled(self):
-		if not self._node_rules_handled:
-			return
-		self.call_many("node_rules_handled_insert", self._node_rules_handled)
-		self._node_rules_handled = []
-
-	def handled_portal_rule(
-		self, character, orig, dest, rulebook, rule, branch, turn, tick
-	):
-		(character, orig, dest, rulebook) = map(
-			self.pack, (character, orig, dest, rulebook)
-		)
-		self._portal_rules_handled.append(
-			(character, orig, dest, rulebook, rule, branch, turn, tick)
-		)
-		self._increc()
+	def rules_handled_entities_dump(self):
+		unpack = self.unpack
+		for kind, i, entity in self.call_one("rules_handled_entities_dump"):
+			yield kind, i, unpack(entity)
 
-	def _flush_portal_rules_handled(self):
-		if not self._portal_rules_handled:
-			return
-		self.call_many(
-			"portal_rules_handled_insert", self._portal_rules_handled
-		)
-		self._portal_rules_handled = []
+	def rules_handled_dump(self):
+		unpack = self.unpack
+		for (
+			kind,
+			rulebook,
+			rule,
+			branch,
+			turn,
+			tick,
+			entities,
+		) in self.call_one("rules_handled_dump"):
+			yield kind, unpack(rulebook), rule, branch, turn, tick, entities
 
 	def get_rulebook_char(self, rulemap, character):
 		character = self.pack(character)
@@ -2099,13 +2523,7 @@ class QueryEngine(query.QueryEngine):
 			self.call_one("turns_completed_update", turn, branch)
 		self._increc()
 		if discard_rules:
-			self._char_rules_handled = []
-			self._unit_rules_handled = []
-			self._char_thing_rules_handled = []
-			self._char_place_rules_handled = []
-			self._char_portal_rules_handled = []
-			self._node_rules_handled = []
-			self._portal_rules_handled = []
+			self._rules_handled = {}
 
 
 class QueryEngineProxy:
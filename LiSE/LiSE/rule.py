@@ -76,9 +76,21 @@ provided they are already present in the correct module. If it's
 inconvenient to get the actual function object, use a string of
 the function's name.
 
+If a rule applies to many entities, and its trigger only needs to
+compare a stat or two, you might want to use ``batch_trigger`` in place
+of ``trigger``. The rules engine will then call the function just once
+per turn with an :class:`EntityBatch` of every entity that the rule
+needs checking for, and the function should return those that it
+fires for.
+
 """
 
-from collections.abc import MutableMapping, MutableSequence, Hashable
+from collections.abc import (
+	MutableMapping,
+	MutableSequence,
+	Hashable,
+	Sequence,
+)
 from abc import ABC, abstractmethod
 from functools import partial, cached_property
 from inspect import getsource
@@ -255,6 +267,58 @@ class RuleFuncListDescriptor(object):
 		raise TypeError("Rules must have their function lists")
 
 
+class EntityBatch(Sequence):
+	"""All the entities that a batch trigger should check at once
+
+	A batch trigger gets one of these in place of a single entity, and
+	returns those of its entities that it fires for. To compare one stat
+	across the lot, get it with ``stat``; this is a list you can pass to
+	``numpy.array`` if you like. Then ``where`` will get you the entities
+	corresponding to the true values in the result::
+
+		@rule.batch_trigger
+		def hungry(sheep):
+			return sheep.where(numpy.array(sheep.stat("hunger")) > 5)
+
+	"""
+
+	__slots__ = ("_entities",)
+
+	def __init__(self, entities):
+		self._entities = list(entities)
+
+	def __repr__(self):
+		return f"EntityBatch({self._entities!r})"
+
+	def __len__(self):
+		return len(self._entities)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return EntityBatch(self._entities[i])
+		return self._entities[i]
+
+	def stat(self, key, default=None) -> list:
+		"""Return the value of one stat for each of my entities, in order
+
+		Entities lacking the stat get ``default``.
+
+		"""
+		return [entity.get(key, default) for entity in self._entities]
+
+	def where(self, mask) -> "EntityBatch":
+		"""Return the entities for which ``mask`` has a true value
+
+		``mask`` should be a sequence as long as I am.
+
+		"""
+		if len(mask) != len(self._entities):
+			raise ValueError("Mask is the wrong length")
+		return EntityBatch(
+			entity for (entity, m) in zip(self._entities, mask) if m
+		)
+
+
 class Rule(object):
 	"""Stuff that might happen in the simulation under some conditions
 
@@ -342,6 +406,44 @@ class Rule(object):
 		self.triggers.append(fun)
 		return fun
 
+	def batch_trigger(self, fun):
+		"""Decorator to append the function to my triggers list, to be
+		called on all the entities I apply to at once.
+
+		The function will get an :class:`EntityBatch`, and should return
+		those of its entities that it fires for. It's only a batch trigger
+		in this rule; other rules may use it as an ordinary trigger.
+
+		"""
+		self.triggers.append(fun)
+		mine = self.engine._batch_triggers.get(self.name, frozenset())
+		if fun.__name__ not in mine:
+			self._set_batch_triggers(mine | {fun.__name__})
+		return fun
+
+	def _set_batch_triggers(self, names: frozenset):
+		batch_triggers = self.engine._batch_triggers
+		batch_triggers[self.name] = names
+		self.engine.eternal["batch_triggers"] = {
+			rule: sorted(names) for (rule, names) in batch_triggers.items()
+		}
+
+	def volatile_trigger(self, fun):
+		"""Decorator to append the function to my triggers list, to be
+		checked every time, even with ``incremental_triggers``.
+
+		Use this for triggers that look at something LiSE can't keep
+		track of, such as the clock. It's the function that's volatile,
+		so it's checked every time in every rule that uses it.
+
+		"""
+		self.triggers.append(fun)
+		volatile = self.engine._volatile_triggers
+		if fun.__name__ not in volatile:
+			volatile.add(fun.__name__)
+			self.engine.eternal["volatile_triggers"] = sorted(volatile)
+		return fun
+
 	def prereq(self, fun):
 		"""Decorator to append the function to my prereqs list."""
 		self.prereqs.append(fun)
@@ -359,13 +461,16 @@ class Rule(object):
 		"""
 		if self.engine.rule.query.haverule(newname):
 			raise KeyError("Already have a rule called {}".format(newname))
-		return Rule(
+		new = Rule(
 			self.engine,
 			newname,
 			list(self.triggers),
 			list(self.prereqs),
 			list(self.actions),
 		)
+		if self.name in self.engine._batch_triggers:
+			new._set_batch_triggers(self.engine._batch_triggers[self.name])
+		return new
 
 	def always(self):
 		"""Arrange to be triggered every turn"""
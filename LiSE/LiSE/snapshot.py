@@ -0,0 +1,433 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Frozen copies of a character's graph, cheap to do pathfinding on
+
+A :class:`CharacterSnapshot` holds the portals of a character as it was
+at one point in time, in compressed sparse row arrays: ``indptr[i]`` to
+``indptr[i + 1]`` is the range of ``indices`` that holds the
+destinations of the ``i``-th node, and ``weights`` holds the weight of
+each portal in the same order. It's a :class:`networkx.DiGraph`, so
+NetworkX algorithms work on it, but it can't be changed.
+
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from heapq import heappop, heappush
+from types import MappingProxyType
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+import networkx as nx
+
+from .allegedb import Key
+
+if TYPE_CHECKING:
+	from .character import Character
+
+EMPTY = MappingProxyType({})
+PATH_CACHE_SIZE = 256
+
+
+def is_stat(weight) -> bool:
+	"""Return whether ``weight`` could be the name of a portal stat
+
+	NetworkX also takes functions for ``weight``, which snapshots can't
+	hold.
+
+	"""
+	if callable(weight):
+		return False
+	try:
+		hash(weight)
+	except TypeError:
+		return False
+	return True
+
+
+class SnapshotNodes(Mapping):
+	"""The nodes of a snapshot, with no stats"""
+
+	__slots__ = ("_names", "_index")
+
+	def __init__(self, names: list, index: dict):
+		self._names = names
+		self._index = index
+
+	def __iter__(self):
+		return iter(self._names)
+
+	def __len__(self):
+		return len(self._names)
+
+	def __contains__(self, item):
+		return item in self._index
+
+	def __getitem__(self, item):
+		if item not in self._index:
+			raise KeyError("No such node", item)
+		return EMPTY
+
+
+class SnapshotNeighbors(Mapping):
+	"""The portals to or from one node, each mapped to its weight stat"""
+
+	__slots__ = ("_names", "_index", "_indices", "_data")
+
+	def __init__(self, names: list, index: dict, indices: array, data: list):
+		self._names = names
+		self._index = index
+		self._indices = indices
+		self._data = data
+
+	def __iter__(self):
+		return map(self._names.__getitem__, self._indices)
+
+	def __len__(self):
+		return len(self._indices)
+
+	def __contains__(self, item):
+		return self._index.get(item) in self._indices
+
+	def __getitem__(self, item):
+		i = self._index.get(item)
+		if i not in self._indices:
+			raise KeyError("No such portal", item)
+		return self._data[self._indices.index(i)]
+
+	def items(self):
+		return zip(self, self._data)
+
+
+class SnapshotAdjacency(Mapping):
+	"""Map each node of a snapshot to its :class:`SnapshotNeighbors`"""
+
+	__slots__ = ("_names", "_index", "_indptr", "_indices", "_data")
+
+	def __init__(
+		self,
+		names: list,
+		index: dict,
+		indptr: array,
+		indices: array,
+		data: list,
+	):
+		self._names = names
+		self._index = index
+		self._indptr = indptr
+		self._indices = indices
+		self._data = data
+
+	def __iter__(self):
+		return iter(self._names)
+
+	def __len__(self):
+		return len(self._names)
+
+	def __contains__(self, item):
+		return item in self._index
+
+	def __getitem__(self, item):
+		if item not in self._index:
+			raise KeyError("No such node", item)
+		i = self._index[item]
+		start = self._indptr[i]
+		end = self._indptr[i + 1]
+		return SnapshotNeighbors(
+			self._names,
+			self._index,
+			self._indices[start:end],
+			self._data[start:end],
+		)
+
+
+class CharacterSnapshot(nx.DiGraph):
+	"""The places and portals of a character at one moment, read-only
+
+	Node and portal stats aren't copied, except the ``weight`` stat of
+	portals, if you give one. Portals lacking it weigh 1, as they do
+	for NetworkX's shortest path functions.
+
+	Besides the NetworkX API, I have my own :meth:`shortest_path` and
+	:meth:`shortest_path_length`, which work on my arrays directly.
+
+	"""
+
+	def __init__(self, character: Character, weight: Key = None):
+		super().__init__()
+		engine = character.engine
+		charn = character.name
+		branch, turn, tick = btt = engine._btt()
+		names = list(
+			engine._nodes_cache.iter_entities(charn, branch, turn, tick)
+		)
+		index = {name: i for (i, name) in enumerate(names)}
+		iter_successors = engine._edges_cache.iter_successors
+		retrieve = engine._edge_val_cache._base_retrieve
+		indptr = array("q", [0])
+		indices = array("q")
+		weights = array("d")
+		data = []
+		in_degree = [0] * len(names)
+		for orig in names:
+			for dest in iter_successors(charn, orig, branch, turn, tick):
+				j = index[dest]
+				indices.append(j)
+				in_degree[j] += 1
+				if weight is None:
+					w = None
+				else:
+					w = retrieve((charn, orig, dest, 0, weight, *btt))
+				if w is None or isinstance(w, Exception):
+					weights.append(1.0)
+					data.append(EMPTY)
+				else:
+					try:
+						weights.append(w)
+					except TypeError:
+						raise TypeError(
+							"Portal {}->{} has non-numeric {}: {}".format(
+								repr(orig), repr(dest), repr(weight), repr(w)
+							)
+						) from None
+					data.append(MappingProxyType({weight: w}))
+			indptr.append(len(indices))
+		# the same portals, indexed by destination, for the predecessors
+		pred_indptr = array("q", [0])
+		for deg in in_degree:
+			pred_indptr.append(pred_indptr[-1] + deg)
+		fill = array("q", pred_indptr[:-1])
+		pred_indices = array("q", bytes(8 * len(indices)))
+		pred_data = [None] * len(indices)
+		for i in range(len(names)):
+			for e in range(indptr[i], indptr[i + 1]):
+				j = indices[e]
+				pred_indices[fill[j]] = i
+				pred_data[fill[j]] = data[e]
+				fill[j] += 1
+		self.character = charn
+		self.weight = weight
+		self.time = btt
+		self.graph["name"] = charn
+		self.indptr = indptr
+		self.indices = indices
+		self.weights = weights
+		self._names = names
+		self._index = index
+		self._node = SnapshotNodes(names, index)
+		self._adj = self._succ = SnapshotAdjacency(
+			names, index, indptr, indices, data
+		)
+		self._pred = SnapshotAdjacency(
+			names, index, pred_indptr, pred_indices, pred_data
+		)
+		nx.freeze(self)
+
+	def __repr__(self):
+		return "<CharacterSnapshot of {} at {}>".format(
+			repr(self.character), self.time
+		)
+
+	def _check(self, source: Key, target: Key, weight: Key) -> None:
+		if source not in self._index:
+			raise nx.NodeNotFound("Source {} is not in G".format(source))
+		if target not in self._index:
+			raise nx.NodeNotFound("Target {} is not in G".format(target))
+		if weight is not None and weight != self.weight:
+			raise ValueError(
+				"Snapshot has weights from {}, not {}".format(
+					repr(self.weight), repr(weight)
+				)
+			)
+
+	def _search(
+		self, src: int, dst: Optional[int], weighted: bool
+	) -> Tuple[dict, dict]:
+		"""Return distances to, and predecessors of, nodes reachable from
+		the ``src``-th node
+
+		Stop once the ``dst``-th node is reached, if it's not ``None``.
+
+		"""
+		indptr = self.indptr
+		indices = self.indices
+		prev = {src: None}
+		dist = {src: 0}
+		if not weighted:
+			frontier = [src]
+			while frontier and dst not in prev:
+				nxt = []
+				for i in frontier:
+					for j in indices[indptr[i] : indptr[i + 1]]:
+						if j not in prev:
+							prev[j] = i
+							dist[j] = dist[i] + 1
+							nxt.append(j)
+				frontier = nxt
+			return dist, prev
+		weights = self.weights
+		done = set()
+		heap = [(0, src)]
+		while heap:
+			d, i = heappop(heap)
+			if i in done:
+				continue
+			done.add(i)
+			if i == dst:
+				break
+			for e in range(indptr[i], indptr[i + 1]):
+				j = indices[e]
+				dj = d + weights[e]
+				if j not in dist or dj < dist[j]:
+					dist[j] = dj
+					prev[j] = i
+					heappush(heap, (dj, j))
+		return dist, prev
+
+	def _path(self, source: Key, target: Key, prev: dict) -> List[Key]:
+		i = self._index[target]
+		if i not in prev:
+			raise nx.NetworkXNoPath(
+				"No path between {} and {}.".format(source, target)
+			)
+		names = self._names
+		path = []
+		while i is not None:
+			path.append(names[i])
+			i = prev[i]
+		path.reverse()
+		return path
+
+	def shortest_path(
+		self, source: Key, target: Key, weight: Key = None
+	) -> List[Key]:
+		"""Return a list of node names leading from ``source`` to ``target``
+
+		With ``weight``, which must be the stat I was made with, find the
+		path with the least total weight; otherwise, the fewest portals.
+
+		"""
+		self._check(source, target, weight)
+		_, prev = self._search(
+			self._index[source], self._index[target], weight is not None
+		)
+		return self._path(source, target, prev)
+
+	def shortest_path_length(
+		self, source: Key, target: Key, weight: Key = None
+	) -> float:
+		"""Return the length of the path :meth:`shortest_path` would"""
+		self._check(source, target, weight)
+		dist, prev = self._search(
+			self._index[source], self._index[target], weight is not None
+		)
+		self._path(source, target, prev)
+		return dist[self._index[target]]
+
+
+class PathCache:
+	"""Shortest paths in one character, kept until its map changes
+
+	For each weight stat, I keep a :class:`CharacterSnapshot`, and the
+	shortest paths from up to ``maxsize`` sources to everywhere, dropping
+	the least recently used. In a character with no more nodes than that,
+	this amounts to all pairs' shortest paths.
+
+	All of it is thrown out when my :meth:`version` changes, or when
+	asked about a node that's newer than the snapshot.
+
+	"""
+
+	def __init__(self, character: Character, maxsize: int = PATH_CACHE_SIZE):
+		self.character = character
+		self.maxsize = maxsize
+		self._weights = {}
+
+	def version(self, weight: Key = None) -> tuple:
+		"""Return something that's equal at any two times the character's
+		portals, and their ``weight`` stats, are the same
+
+		That's the times of the latest changes to each, and how many times
+		the world's history has been loaded or truncated.
+
+		New nodes don't change the version, since they can't change the
+		paths between old ones.
+
+		"""
+		engine = self.character.engine
+		charn = self.character.name
+		btt = engine._btt()
+		edges = engine._edges_cache
+		edge_val = engine._edge_val_cache
+		return (
+			edges.last_change(charn, *btt),
+			None
+			if weight is None
+			else edge_val.last_change((charn, weight), *btt),
+			edges.epoch + edge_val.epoch,
+		)
+
+	def _tree(
+		self, source: Key, target: Key, weight: Key
+	) -> Tuple[CharacterSnapshot, dict, dict]:
+		version = self.version(weight)
+		if (
+			weight in self._weights
+			and self._weights[weight][0] == version
+			and source in self._weights[weight][1]._index
+			and target in self._weights[weight][1]._index
+		):
+			_, snap, trees = self._weights[weight]
+		else:
+			snap = CharacterSnapshot(self.character, weight)
+			trees = OrderedDict()
+			self._weights[weight] = (version, snap, trees)
+		snap._check(source, target, weight)
+		if source in trees:
+			trees.move_to_end(source)
+		else:
+			trees[source] = snap._search(
+				snap._index[source], None, weight is not None
+			)
+			if len(trees) > self.maxsize:
+				trees.popitem(last=False)
+		return snap, *trees[source]
+
+	def shortest_path(
+		self, source: Key, target: Key, weight: Key = None
+	) -> List[Key]:
+		"""Return a list of node names leading from ``source`` to ``target``
+
+		If ``weight`` isn't a stat, but a function, ask NetworkX.
+
+		"""
+		if not is_stat(weight):
+			return nx.shortest_path(self.character, source, target, weight)
+		snap, _, prev = self._tree(source, target, weight)
+		return snap._path(source, target, prev)
+
+	def shortest_path_length(
+		self, source: Key, target: Key, weight: Key = None
+	) -> float:
+		"""Return the length of the path :meth:`shortest_path` would"""
+		if not is_stat(weight):
+			return nx.shortest_path_length(
+				self.character, source, target, weight
+			)
+		snap, dist, prev = self._tree(source, target, weight)
+		snap._path(source, target, prev)
+		return dist[snap._index[target]]
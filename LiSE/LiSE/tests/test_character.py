@@ -309,3 +309,48 @@ def test_iter_portals(engy):
 	for a, b in portal_abs:
 		assert a in ch.edge
 		assert b in ch.edge[a]
+
+
+def test_snapshot(engy):
+	import networkx as nx
+	from LiSE.character import grid_2d_8graph
+
+	grid = grid_2d_8graph(5, 5)
+	for i, (u, v) in enumerate(grid.edges):
+		grid.edges[u, v]["weight"] = i % 3 + 1
+	ch = engy.new_character("physical", grid)
+	ch.portal[(0, 0)][(4, 4)] = {"weight": 10}
+	snap = ch.snapshot("weight")
+	ch.remove_portal((0, 0), (4, 4))
+	assert snap.has_edge((0, 0), (4, 4))
+	assert not ch.snapshot().has_edge((0, 0), (4, 4))
+	expected = nx.DiGraph(grid)
+	expected.add_edge((0, 0), (4, 4), weight=10)
+	assert set(snap.nodes) == set(expected.nodes)
+	assert set(snap.edges) == set(expected.edges)
+	for node in expected:
+		assert set(snap.pred[node]) == set(expected.pred[node])
+	assert snap[(0, 1)][(1, 1)] == expected[(0, 1)][(1, 1)]
+	assert snap[(0, 0)][(4, 4)] == {"weight": 10}
+	assert ch.snapshot()[(0, 1)][(1, 1)] == {}
+	for weight in (None, "weight"):
+		for dest in [(4, 4), (2, 3), (4, 0)]:
+			length = nx.shortest_path_length(expected, (1, 0), dest, weight)
+			assert length == nx.shortest_path_length(
+				snap, (1, 0), dest, weight
+			)
+			assert snap.shortest_path_length((1, 0), dest, weight) == length
+			path = snap.shortest_path((1, 0), dest, weight)
+			assert nx.is_path(expected, path)
+			if weight is None:
+				assert len(path) - 1 == length
+			else:
+				assert nx.path_weight(expected, path, weight) == length
+	with pytest.raises(nx.NetworkXError):
+		snap.add_node("nope")
+	with pytest.raises(ValueError):
+		snap.shortest_path((0, 0), (1, 1), "other")
+	thing = ch.place[(0, 0)].new_thing("thing")
+	assert thing.travel_to((2, 2), graph=ch.snapshot()) == 2
+	engy.turn = 2
+	assert thing.location.name == (2, 2)
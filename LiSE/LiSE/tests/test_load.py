@@ -12,6 +12,8 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import pytest
+
 from LiSE.engine import Engine
 from LiSE.examples.kobold import inittest
 
@@ -98,3 +100,45 @@ def test_keyframe_load_unload(tempdir):
 		eng.snap_keyframe()
 		eng.unload()
 		assert not eng._time_is_loaded("trunk")
+
+
+def test_keyframe_budget(tempdir):
+	with Engine(
+		tempdir, enforce_end_of_time=False, keyframe_on_close=False
+	) as eng:
+		inittest(eng)
+		eng.snap_keyframe()
+		eng.character["physical"].place[0, 0]["visited"] = True
+		eng.branch = "b"
+		for turn in range(1, 4):
+			eng.turn = turn
+			eng.character["physical"].place[0, 0]["visited"] = turn
+			eng.snap_keyframe()
+		eng.branch = "trunk"
+		eng.character["physical"].place[0, 0]["visited"] = False
+		b_keyframes = {kf for kf in eng._keyframes_times if kf[0] == "b"}
+		trunk_keyframes = eng._keyframes_times - b_keyframes
+	assert len(b_keyframes) > 1
+	with Engine(
+		tempdir,
+		enforce_end_of_time=False,
+		keyframe_on_close=False,
+		keyframe_budget=1e-12,
+	) as eng:
+		assert eng.query.keyframe_interval == 1
+		assert "b" not in eng._loaded
+	with Engine(
+		tempdir,
+		enforce_end_of_time=False,
+		keyframe_on_close=False,
+		keyframe_budget=1000,
+	) as eng:
+		assert eng._keyframes_times == trunk_keyframes | {min(b_keyframes)}
+		assert eng.query.keyframe_interval > 1000
+		eng.branch = "b"
+		assert eng.character["physical"].place[0, 0]["visited"] == 3
+
+
+def test_keyframe_budget_needs_interval(tempdir):
+	with pytest.raises(ValueError):
+		Engine(tempdir, keyframe_interval=None, keyframe_budget=1)
@@ -1,3 +1,9 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import msgpack
+import pytest
+
 from LiSE import Engine
 from LiSE.proxy import EngineProcessManager
 
@@ -53,3 +59,46 @@ def test_serialize_method(tempdir):
 	engprox = procm.start(tempdir)
 	assert engprox.foo("bar", "bas") == "barbas is correct"
 	procm.shutdown()
+
+
+def test_pack_many(engy):
+	char = engy.new_character("physical")
+	place = char.new_place("here")
+	objs = [
+		"here",
+		"here",
+		(1, (2, "here")),
+		{"here": [place, frozenset({1})]},
+		char,
+		True,
+		1,
+		1.0,
+	]
+	packed = engy.pack_many(objs)
+	assert packed == [engy.pack(obj) for obj in objs]
+	assert [engy.unpack(b) for b in packed] == objs
+	# the same packers get used again after a failure
+	with pytest.raises(TypeError):
+		engy.pack_many(["here", object()])
+	assert engy.pack_many(objs) == packed
+
+
+def test_pack_threads(engy, monkeypatch):
+	# a tiny cache of packed strings gets cleared all the time
+	monkeypatch.setattr("LiSE.util.PACKED_STR_CACHE_SIZE", 8)
+	strs = [f"str{i % 20}" for i in range(2000)]
+
+	def pack_all(n):
+		if n % 2:
+			return engy.pack_many(strs)
+		return [engy.pack(s) for s in strs]
+
+	expected = [msgpack.packb(s) for s in strs]
+	switch_interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-6)
+	try:
+		with ThreadPoolExecutor(8) as pool:
+			for packed in pool.map(pack_all, range(16)):
+				assert packed == expected
+	finally:
+		sys.setswitchinterval(switch_interval)
@@ -210,3 +210,245 @@ def test_post_time_travel_increment(engy):
 	assert engy.tick == 2
 	engy.next_turn()
 	assert engy.tick == 2
+
+
+def test_process_triggers(tempdir):
+	"""Test that triggers checked in worker processes see the current world"""
+	from LiSE import Engine
+
+	with Engine(
+		tempdir,
+		random_seed=69105,
+		enforce_end_of_time=False,
+		parallel_triggers="process",
+	) as eng:
+		eng._trigger_processes.processes = 2
+		char = eng.new_character("char")
+		place = char.new_place("place")
+		elsewhere = char.new_place("elsewhere")
+		char.add_portal("place", "elsewhere", distance=3)
+		for i in range(5):
+			place.new_thing(i, hunger=i)
+
+		@char.thing.rule
+		def eat(thing):
+			thing["hunger"] = 0
+
+		@eat.trigger
+		def hungry(thing):
+			return thing["hunger"] > 2 and thing.location.name == "place"
+
+		@char.portal.rule
+		def shorten(portal):
+			portal["distance"] -= 1
+
+		@shorten.trigger
+		def far(portal):
+			return portal["distance"] > 1
+
+		eng.next_turn()
+		assert [char.thing[i]["hunger"] for i in range(5)] == [0, 1, 2, 0, 0]
+		assert char.portal["place"]["elsewhere"]["distance"] == 2
+		char.thing[1]["hunger"] = 5
+		char.thing[2]["hunger"] = 5
+		char.thing[2].location = elsewhere
+		eng.next_turn()
+		assert [char.thing[i]["hunger"] for i in range(5)] == [0, 0, 5, 0, 0]
+		assert char.portal["place"]["elsewhere"]["distance"] == 1
+		eng.turn = 1
+		eng.branch = "other"
+		char.thing[2].location = place
+		eng.next_turn()
+		assert char.thing[2]["hunger"] == 0
+		assert char.portal["place"]["elsewhere"]["distance"] == 1
+
+
+def test_batch_trigger(engy):
+	"""Test that a batch trigger gets all the entities at once"""
+	char = engy.new_character("char")
+	place = char.new_place("place")
+	for i in range(6):
+		place.new_thing(i, hunger=i)
+
+	@char.thing.rule
+	def eat(thing):
+		thing["hunger"] = 0
+
+	@eat.batch_trigger
+	def hungry(things):
+		things[0].character.stat["batch_size"] = len(things)
+		return things.where([hunger > 3 for hunger in things.stat("hunger")])
+
+	@eat.trigger
+	def odd(thing):
+		return thing.name % 2
+
+	engy.next_turn()
+	assert char.stat["batch_size"] == 6
+	assert [char.thing[i]["hunger"] for i in range(6)] == [0, 0, 2, 0, 0, 0]
+	assert engy.eternal["batch_triggers"] == {"eat": ["hungry"]}
+
+
+def test_batch_trigger_only_in_its_rule(engy):
+	"""Test that a batch trigger is an ordinary one in other rules"""
+	char = engy.new_character("char")
+	place = char.new_place("place")
+	for i in range(3):
+		place.new_thing(i)
+
+	@char.thing.rule
+	def batched(thing):
+		pass
+
+	@batched.batch_trigger
+	def counted(what):
+		if hasattr(what, "where"):
+			what[0].character.stat["batches"] += 1
+			return what[:0]
+		what.character.stat["singles"] += 1
+		return False
+
+	@char.place.rule
+	def single(place):
+		pass
+
+	single.triggers.append(counted)
+	char.stat["batches"] = char.stat["singles"] = 0
+	engy.next_turn()
+	assert char.stat["batches"] == 1
+	assert char.stat["singles"] == 1
+	assert engy.eternal["batch_triggers"] == {"batched": ["counted"]}
+
+
+def test_incremental_triggers(tempdir):
+	"""Test that triggers aren't checked again until what they read changes"""
+	from LiSE import Engine
+
+	with Engine(
+		tempdir,
+		random_seed=69105,
+		enforce_end_of_time=False,
+		incremental_triggers=True,
+	) as eng:
+		char = eng.new_character("char")
+		place = char.new_place("place")
+
+		def checks():
+			return sum(eng.eternal.get(f"checks_{i}", 0) for i in range(3))
+
+		for i in range(3):
+			place.new_thing(i, hunger=0)
+
+		@char.thing.rule
+		def eat(thing):
+			thing["hunger"] = 0
+
+		@eat.trigger
+		def hungry(thing):
+			eternal = thing.engine.eternal
+			key = f"checks_{thing.name}"
+			eternal[key] = eternal.get(key, 0) + 1
+			return thing["hunger"] > 5
+
+		eng.next_turn()
+		assert checks() == 3
+		eng.next_turn()
+		assert checks() == 3
+		char.thing[1]["hunger"] = 10
+		eng.next_turn()
+		assert checks() == 4
+		assert char.thing[1]["hunger"] == 0
+		# it's back the way it was when the trigger last didn't fire
+		eng.next_turn()
+		assert checks() == 4
+		char.thing[2]["hunger"] = 3
+		eng.next_turn()
+		assert checks() == 5
+
+
+def test_incremental_triggers_unrecordable(tempdir):
+	"""Test that triggers looking at more than stats are always checked"""
+	from LiSE import Engine
+
+	with Engine(
+		tempdir,
+		random_seed=69105,
+		enforce_end_of_time=False,
+		incremental_triggers=True,
+	) as eng:
+		eng.universal["threshold"] = 5
+		char = eng.new_character("char")
+		place = char.new_place("place")
+		place.new_thing("thing", hunger=0)
+
+		@char.place.rule
+		def feed(place):
+			pass
+
+		@feed.trigger
+		def crowded(place):
+			eternal = place.engine.eternal
+			key = f"checks_{place.name}"
+			eternal[key] = eternal.get(key, 0) + 1
+			return len(place.content) > 1
+
+		@char.thing.rule
+		def eat(thing):
+			thing["hunger"] = 0
+
+		@eat.trigger
+		def hungry(thing):
+			eternal = thing.engine.eternal
+			key = f"checks_{thing.name}"
+			eternal[key] = eternal.get(key, 0) + 1
+			return thing["hunger"] > thing.engine.universal["threshold"]
+
+		@eat.trigger
+		def peckish(thing):
+			eternal = thing.engine.eternal
+			key = f"checks_{thing.name}"
+			eternal[key] = eternal.get(key, 0) + 1
+			return thing.engine.random() > 2
+
+		eng.next_turn()
+		assert eng.eternal["checks_place"] == 1
+		assert eng.eternal["checks_thing"] == 2
+		eng.next_turn()
+		assert eng.eternal["checks_place"] == 2
+		assert eng.eternal["checks_thing"] == 4
+
+
+def test_volatile_trigger(tempdir):
+	"""Test that volatile triggers are always checked"""
+	from LiSE import Engine
+
+	with Engine(
+		tempdir,
+		random_seed=69105,
+		enforce_end_of_time=False,
+		incremental_triggers=True,
+	) as eng:
+		char = eng.new_character("char")
+		place = char.new_place("place")
+		place.new_thing("thing", hunger=0)
+
+		@char.thing.rule
+		def eat(thing):
+			thing["hunger"] = 0
+
+		@eat.volatile_trigger
+		def hungry(thing):
+			eternal = thing.engine.eternal
+			key = f"checks_{thing.name}"
+			eternal[key] = eternal.get(key, 0) + 1
+			return thing["hunger"] > 5
+
+		eng.next_turn()
+		assert eng.eternal["checks_thing"] == 1
+		eng.next_turn()
+		assert eng.eternal["checks_thing"] == 2
+	with Engine(
+		tempdir, enforce_end_of_time=False, incremental_triggers=True
+	) as eng:
+		eng.next_turn()
+		assert eng.eternal["checks_thing"] == 3
@@ -13,9 +13,10 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from unittest.mock import patch, MagicMock
-from LiSE.proxy import EngineProcessManager
+from LiSE.proxy import EngineProcessManager, PipeCodec, SharedRing
 from LiSE.handle import EngineHandle
 import LiSE.allegedb.tests.test_all
+import LiSE
 from LiSE.tests import data
 import pytest
 import LiSE.examples.kobold as kobold
@@ -23,6 +24,8 @@ import LiSE.examples.college as college
 import shutil
 import tempfile
 import msgpack
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ProxyTest(LiSE.allegedb.tests.test_all.AllegedTest):
@@ -117,6 +120,71 @@ def test_fast_delta(handle_initialized):
 	assert hand.unpack(diff4) == slowd4, "Fast delta differs from slow delta"
 
 
+def test_stream_next_turn(handle_initialized):
+	hand = handle_initialized
+	branch, turn, tick = hand._real._btt()
+	*chunks, (ret, rest) = hand.stream_next_turn()
+	delta = hand.unpack(rest)
+	for chunk in chunks:
+		char, chardelta = hand.unpack(chunk)
+		assert char not in delta
+		delta[char] = chardelta
+	slowd = hand.unpack(
+		hand._concat_char_delta(
+			hand._get_slow_delta(
+				btt_from=(branch, turn, tick), btt_to=hand._real._btt()
+			)
+		)
+	)
+	assert delta == slowd, "Streamed delta differs from slow delta"
+
+
+def test_proxy_next_turn_streamed():
+	with tempfile.TemporaryDirectory() as tempdir:
+		with LiSE.Engine(tempdir) as eng:
+			here = eng.new_character("physical").new_place("here")
+			here["count"] = 0
+
+			@here.rule(always=True)
+			def count(node):
+				node["count"] += 1
+
+		manager = EngineProcessManager()
+		engine = manager.start(tempdir)
+		results = []
+		engine.next_turn(cb=lambda **kwargs: results.append(kwargs["result"]))
+		count = engine.character["physical"].place["here"]["count"]
+		manager.shutdown()
+		assert count == 1
+		[(ret, delta)] = results
+		assert delta["physical"]["node_val"]["here"]["count"] == 1
+
+
+def test_proxy_streamed_receiver_calls_core(tempdir):
+	with LiSE.Engine(tempdir) as eng:
+		phys = eng.new_character("physical")
+		phys.stat["count"] = 0
+
+		@phys.rule(always=True)
+		def count(char):
+			char.stat["count"] += 1
+
+	manager = EngineProcessManager()
+	engine = manager.start(tempdir)
+	try:
+		btts = []
+
+		def receiver(*args, **kwargs):
+			btts.append(engine.handle("get_btt"))
+
+		engine.character["physical"].stat.connect(receiver)
+		engine.next_turn()
+		assert btts
+		assert engine.character["physical"].stat["count"] == 1
+	finally:
+		manager.shutdown()
+
+
 @pytest.mark.slow
 def test_serialize_deleted(engy):
 	eng = engy
@@ -255,3 +323,289 @@ def test_get_slow_delta_overload():
 		assert (
 			hand._get_slow_delta(data.BTT_FROM, data.BTT_TO) == data.SLOW_DELTA
 		)
+
+
+def test_pipe_codec():
+	codec = PipeCodec("zlib", threshold=10)
+	small = b"hi"
+	assert codec.encode(small) == PipeCodec.RAW + small
+	big = b"hello" * 100
+	assert len(codec.encode(big)) < len(big)
+	for msg in (small, big):
+		assert codec.decode(codec.encode(msg)) == msg
+		# whatever the other end picked
+		assert PipeCodec(threshold=0).decode(codec.encode(msg)) == msg
+		assert codec.decode(PipeCodec(threshold=0).encode(msg)) == msg
+	with pytest.raises(ValueError):
+		PipeCodec("nonesuch")
+	assert PipeCodec.negotiate("nonesuch", 10).codec == "zlib"
+	with pytest.raises(ValueError):
+		codec.decode(b"\xff" + big)
+
+
+@pytest.mark.parametrize("threshold", [0, 2**30])
+def test_proxy_compress_threshold(tempdir, threshold):
+	manager = EngineProcessManager()
+	engine = manager.start(
+		tempdir,
+		connect_string="sqlite:///:memory:",
+		codec="zlib",
+		compress_threshold=threshold,
+	)
+	phys = engine.new_character("physical")
+	phys.stat["hello"] = "world" * 1000
+	engine.next_turn()
+	assert phys.stat["hello"] == "world" * 1000
+	manager.shutdown()
+
+
+def test_shared_ring():
+	ring = SharedRing(100)
+	reader = SharedRing(name=ring.name)
+	try:
+		notes = [ring.put(bytes([i]) * 30) for i in range(3)]
+		# no room at the end, and the start hasn't been read yet
+		assert ring.put(b"x" * 30) is None
+		assert reader.get(notes[0]) == b"\x00" * 30
+		# now it wraps around to the start
+		notes.append(ring.put(b"x" * 30))
+		assert notes[-1] is not None
+		assert ring.put(b"y" * 10) is None
+		for i, expected in enumerate((b"\x01", b"\x02", b"x"), 1):
+			assert reader.get(notes[i]) == expected * 30
+		notes = [ring.put(b"z" * 60), ring.put(b"w" * 20)]
+		assert reader.get(notes[0]) == b"z" * 60
+		assert reader.get(notes[1]) == b"w" * 20
+		assert ring.put(b"v" * 101) is None
+	finally:
+		reader.close()
+		ring.close()
+
+
+def test_pipe_codec_shared_ring():
+	ring = SharedRing(1000)
+	reader = SharedRing(name=ring.name)
+	try:
+		sender = PipeCodec("zlib", 10, ring_out=ring)
+		receiver = PipeCodec("zlib", 10, ring_in=reader)
+		big = b"hello" * 100
+		note = sender.encode(big)
+		assert note.startswith(SharedRing.MARK) and len(note) < 20
+		assert receiver.decode(note) == big
+		# too big for the ring, so it's compressed instead
+		bigger = b"hello" * 1000
+		assert receiver.decode(sender.encode(bigger)) == bigger
+		assert receiver.decode(sender.encode(b"hi")) == b"hi"
+	finally:
+		reader.close()
+		ring.close()
+
+
+def test_proxy_shared_memory(tempdir):
+	manager = EngineProcessManager()
+	engine = manager.start(
+		tempdir,
+		connect_string="sqlite:///:memory:",
+		shared_memory=2**16,
+	)
+	for i in range(20):
+		char = engine.new_character(i)
+		char.stat["text"] = str(i) * 5000
+	engine.next_turn()
+	engine._pull_kf_now()
+	for i in range(20):
+		assert engine.character[i].stat["text"] == str(i) * 5000
+	manager.shutdown()
+
+
+def test_proxy_submit(tempdir):
+	manager = EngineProcessManager()
+	engine = manager.start(tempdir, connect_string="sqlite:///:memory:")
+	try:
+		called = []
+		futs = [
+			engine.submit(
+				"set_universal",
+				k=i,
+				v=i * 2,
+				cb=lambda **kwargs: called.append(kwargs["command"]),
+			)
+			for i in range(50)
+		]
+		# handle doesn't have to wait for the submitted ones
+		assert engine.handle("universal_copy")[49] == 98
+		assert [fut.result() for fut in futs] == [None] * 50
+		assert called == ["set_universal"] * 50
+		bad = engine.submit("del_character", char="nonesuch")
+		good = engine.submit("get_btt")
+		assert good.result() == engine._btt()
+		with pytest.raises(KeyError):
+			bad.result()
+		assert asyncio.run(engine.handle_async("universal_copy"))[0] == 0
+	finally:
+		manager.shutdown()
+
+
+def test_proxy_submit_threads(tempdir):
+	manager = EngineProcessManager()
+	engine = manager.start(tempdir, connect_string="sqlite:///:memory:")
+	try:
+		for i in range(40):
+			engine.submit("set_eternal", k=i, v=i * 3)
+
+		def get(i):
+			return engine.handle("get_eternal", k=i)
+
+		# each thread must get the answer to its own command
+		with ThreadPoolExecutor(8) as pool:
+			assert list(pool.map(get, range(40))) == [
+				i * 3 for i in range(40)
+			]
+	finally:
+		manager.shutdown()
+
+
+def test_proxy_batch(tempdir):
+	manager = EngineProcessManager()
+	engine = manager.start(tempdir, connect_string="sqlite:///:memory:")
+	try:
+		phys = engine.new_character("physical", hello="world")
+		phys.add_places_from(range(10))
+		phys.add_portal(0, 1, weight=1)
+		phys.add_portal(1, 2)
+		sent = []
+		send_bytes = engine.send_bytes
+
+		def counting_send_bytes(obj, *args, **kwargs):
+			sent.append(obj)
+			return send_bytes(obj, *args, **kwargs)
+
+		engine.send_bytes = counting_send_bytes
+		with engine.batch():
+			for i in range(10):
+				for j in range(5):
+					phys.place[i][j] = i * j
+			phys.place[3][4] = "overwritten"
+			phys.portal[0][1]["weight"] = 2
+			del phys.portal[0][1]["weight"]
+			phys.portal[1][2]["weight"] = 3
+			phys.stat["hello"] = "batch"
+			del phys.stat["hello"]
+			phys.stat["goodbye"] = "batch"
+			assert phys.place[3][4] == "overwritten"
+			assert "hello" not in phys.stat
+			assert not sent
+			phys.add_place("new", foo="bar")
+			assert len(sent) == 1
+			phys.place["new"]["foo"] = "baz"
+			phys.place[9]["gone"] = True
+			phys.remove_node(9)
+			assert len(sent) == 2
+		assert len(sent) == 3
+		engine.send_bytes = send_bytes
+		stats = engine.handle("character_stat_copy", char="physical")
+		assert "hello" not in stats
+		assert stats["goodbye"] == "batch"
+		for i in range(9):
+			node = engine.handle("node_stat_copy", char="physical", node=i)
+			for j in range(5):
+				if (i, j) == (3, 4):
+					assert node[j] == "overwritten"
+				else:
+					assert node[j] == i * j
+		assert (
+			engine.handle("node_stat_copy", char="physical", node="new")[
+				"foo"
+			]
+			== "baz"
+		)
+		assert "weight" not in engine.handle(
+			"portal_stat_copy", char="physical", orig=0, dest=1
+		)
+		assert (
+			engine.handle("portal_stat_copy", char="physical", orig=1, dest=2)[
+				"weight"
+			]
+			== 3
+		)
+	finally:
+		manager.shutdown()
+
+
+def test_proxy_lazy(tempdir):
+	with LiSE.Engine(tempdir) as eng:
+		for i in range(4):
+			char = eng.new_character(i, hello=i)
+			char.add_places_from(range(3))
+			char.add_portal(0, 1, weight=i)
+			char.place[2].new_thing("thing", hp=i)
+		eng.next_turn()
+		for i in range(4):
+			eng.character[i].stat["hello"] = -i
+	manager = EngineProcessManager()
+	engine = manager.start(tempdir, lazy=2)
+	try:
+		sent = []
+		send = engine._send_command
+
+		def counting_send(cmd, kwargs):
+			sent.append(kwargs.get("command", cmd))
+			return send(cmd, kwargs)
+
+		engine._send_command = counting_send
+
+		def fetches():
+			"""How many times a character was fetched since last I checked"""
+			n = sent.count("copy_character")
+			sent.clear()
+			return n
+
+		assert set(engine.character) == set(range(4))
+		assert fetches() == 0
+
+		def check(i, hello):
+			char = engine.character[i]
+			assert char.stat["hello"] == hello
+			assert set(char.place) == {0, 1, 2}
+			assert char.thing["thing"]["hp"] == i
+			assert char.thing["thing"].location.name == 2
+			assert char.portal[0][1]["weight"] == i
+			assert list(char.preportal[1]) == [0]
+
+		engine.time_travel("trunk", 1)
+		assert engine.character[0].stat["hello"] == 0
+		# just the stats
+		assert fetches() == 1
+		check(0, 0)
+		# then the nodes and the portals
+		assert fetches() == 2
+		check(0, 0)
+		assert fetches() == 0
+		check(1, -1)
+		check(2, -2)
+		assert fetches() == 6
+		check(2, -2)
+		assert fetches() == 0
+		# only two characters are kept, so 0 was forgotten
+		check(0, 0)
+		assert fetches() == 3
+		with ThreadPoolExecutor(4) as pool:
+			for fut in [
+				pool.submit(check, i % 4, -(i % 4)) for i in range(32)
+			]:
+				fut.result()
+		# 2 and 3 were kept up to date, the others will be fetched again
+		engine.time_travel("trunk", 0)
+		for i in range(4):
+			stats = engine.handle("character_stat_copy", char=i)
+			del stats["name"]
+			assert dict(engine.character[i].stat) == {
+				"units": {},
+				**stats,
+			}
+		engine.character[3].stat["hello"] = "lazy"
+		engine.del_character(2)
+		assert 2 not in engine.character
+		assert engine.handle("character_stat_copy", char=3)["hello"] == "lazy"
+	finally:
+		manager.shutdown()
@@ -16,7 +16,7 @@ import re
 from functools import reduce
 from collections import defaultdict
 from ..engine import Engine
-from ..query import windows_intersection
+from ..query import windows_intersection, TurnIntervals
 import pytest
 import os
 import shutil
@@ -181,6 +181,30 @@ def test_windows_intersection():
 	assert windows_intersection([(1, 2), (0, 1)]) == [(1, 1)]
 
 
+def test_turn_intervals():
+	left = TurnIntervals([(10, 20), (0, 5), (3, 8), (30, 31), (8, 9)])
+	assert left.spans == [(0, 9), (10, 20), (30, 31)]
+	right = TurnIntervals([(4, 12), (15, 16), (19, 40)])
+	left_set = set(left)
+	right_set = set(right)
+	assert len(left) == len(left_set) == 20
+	assert list(left) == sorted(left_set)
+	assert list(reversed(left)) == sorted(left_set, reverse=True)
+	assert [left[i] for i in range(-20, 20)] == sorted(left_set) * 2
+	assert left[3:12:2] == sorted(left_set)[3:12:2]
+	assert left.index(15) == 14
+	assert 9 not in left and 10 in left and 31 not in left
+	assert set(left | right) == left_set | right_set
+	assert set(left & right) == left_set & right_set
+	assert set(left - right) == left_set - right_set
+	assert set(right - left) == right_set - left_set
+	assert left & right == left_set & right_set
+	assert (left | right).spans == [(0, 40)]
+	assert left | {9} == TurnIntervals([(0, 20), (30, 31)])
+	with pytest.raises(IndexError):
+		left[20]
+
+
 def test_graph_val_select_eq(engy):
 	assert engy.turn == 0
 	me = engy.new_character("me")
@@ -464,3 +488,108 @@ def test_graph_val_compound(engy):
 	assert engy.turns_when(lt_qry | eq_qry) == correct_eq | correct_lt
 	assert engy.turns_when(lt_qry - eq_qry) == correct_lt - correct_eq
 	assert engy.turns_when(eq_qry - lt_qry) == correct_eq - correct_lt
+
+
+def test_compare_to_constant_in_sql(engy):
+	me = engy.new_character("me")
+	foos = [3, 7, 7.5, 7.0, 7, 1, 2**63 + 5, 10, 0, 6]
+	bars = [7, "seven", "7", 7, "7.0", 7.0, 7, "", 7, 0]
+	for foo, bar in zip(foos, bars):
+		me.stat["foo"] = -1
+		me.stat["foo"] = foo
+		me.stat["bar"] = bar
+		engy.next_turn()
+	engy.branch = "leaf"
+	me.stat["foo"] = 8
+	engy.next_turn()
+	me.stat["foo"] = 4
+	foo = me.historical("foo")
+	bar = me.historical("bar")
+	queries = [
+		foo == 7,
+		foo != 7,
+		foo < 7,
+		foo <= 7,
+		7 > foo,
+		foo >= 7,
+		(foo >= 1) - (foo == 10),
+		bar == 7,
+		bar != 7,
+	]
+	assert engy.query.compares_in_sql
+	results = {}
+	for qry in queries:
+		for mid_turn in (False, True):
+			results[id(qry), mid_turn] = engy.turns_when(qry, mid_turn)
+	assert set(results[id(queries[0]), False]) == {1, 3, 4}
+	assert set(results[id(queries[2]), True]) == set(range(12))
+	assert set(results[id(queries[7]), False]) == {0, 3, 5, 6, 8}
+	assert set(results[id(queries[8]), False]) == {1, 2, 4, 7, 9, 10, 11}
+	# numpy can't compare bar's mixture of types, so check the rest against
+	# the old way of doing it
+	engy.query._holder.has_sqlite_functions = False
+	for qry in queries[:7]:
+		for mid_turn in (False, True):
+			assert set(results[id(qry), mid_turn]) == set(
+				engy.turns_when(qry, mid_turn)
+			)
+
+
+def test_standing_query(engy):
+	me = engy.new_character("me")
+	here = me.new_place("here")
+	there = me.new_place("there")
+	it = here.new_thing("it")
+	me.stat["pop"] = 0
+	here["pop"] = 0
+	pop = me.historical("pop")
+	herepop = here.historical("pop")
+	loc = it.historical("location")
+	queries = [
+		pop > 100,
+		herepop <= pop,
+		loc == "there",
+		(pop > 100) | (loc == "there"),
+	]
+	standing = [
+		engy.standing_query(qry, mid_turn)
+		for qry in queries
+		for mid_turn in (False, True)
+	]
+
+	def check(incremental=True):
+		turns_when = engy.turns_when
+		expected = [
+			set(turns_when(qry, mid_turn))
+			for qry in queries
+			for mid_turn in (False, True)
+		]
+		if not incremental:
+			assert [set(stand) for stand in standing] == expected
+			return
+		engy.turns_when = None  # don't re-run the whole query
+		try:
+			assert [set(stand) for stand in standing] == expected
+		finally:
+			del engy.turns_when
+
+	for i in range(12):
+		me.stat["pop"] = 150 if i % 3 == 1 else 50 + i
+		here["pop"] = 200 if i % 4 == 2 else 10
+		if i % 5 == 3:
+			it.location = there
+		if i % 5 == 4:
+			it.location = here
+		if i == 6:
+			me.stat["pop"] = 20
+		engy.next_turn()
+		check()
+	engy.branch = "other"
+	me.stat["pop"] = 500
+	check(incremental=False)
+	engy.next_turn()
+	check()
+	for stand in standing:
+		stand.close()
+	assert not engy._graph_val_cache.store_listeners
+	assert not engy._things_cache.store_listeners
@@ -174,3 +174,63 @@ def test_rule_priority(engy):
 	engy.next_turn()
 
 	assert engy.universal["list"] == ["first", "second", "second", "first"]
+
+
+def test_rules_handled_journal(tempdir):
+	"""Test that handled rules are saved compactly, and loaded again"""
+	with Engine(tempdir) as eng:
+		phys = eng.new_character("physical")
+		for i in range(20):
+			phys.new_place(i, hot=i < 2)
+
+		@phys.place.rule
+		def cool(place):
+			place["hot"] = False
+
+		@cool.trigger
+		def is_hot(place):
+			return place["hot"]
+
+		eng.next_turn()
+		assert not any(place["hot"] for place in phys.place.values())
+		rulebook = phys.place.rulebook.name
+		turn = eng.turn
+		eng.flush()
+		# one row for the places that weren't hot, one each for those that were
+		assert eng.query.call_one("rules_handled_count") == [(3,)]
+	with Engine(tempdir) as eng:
+		cache = eng._character_place_rules_handled_cache
+		for i in range(20):
+			assert cache.retrieve("physical", i, rulebook, "trunk", turn) == {
+				"cool"
+			}
+			assert not cache.unhandled_rulebook_rules(
+				"physical", i, rulebook, "trunk", turn, eng.tick
+			)
+
+
+def test_node_rulebook_users(engy):
+	"""Test that node rules only run for the nodes using their rulebook"""
+	phys = engy.new_character("physical")
+	for i in range(10):
+		phys.new_place(i, visits=0)
+
+	@phys.place[0].rule(always=True)
+	def visit(node):
+		node["visits"] += 1
+
+	engy.rulebook["shared"] = [visit]
+	phys.place[1].rulebook = phys.place[2].rulebook = "shared"
+	engy.next_turn()
+	assert [phys.place[i]["visits"] for i in range(4)] == [1, 1, 1, 0]
+	phys.place[2].rulebook = ("physical", 3)
+	phys.place[3].rulebook = "shared"
+	engy.next_turn()
+	assert [phys.place[i]["visits"] for i in range(4)] == [2, 2, 1, 1]
+	engy.rulebook["shared"] = []
+	engy.next_turn()
+	assert [phys.place[i]["visits"] for i in range(4)] == [3, 2, 1, 1]
+	engy.turn = 1
+	# the past is as it was
+	assert [phys.place[i]["visits"] for i in range(4)] == [1, 1, 1, 0]
+	assert all(phys.place[i]["visits"] == 0 for i in range(4, 10))
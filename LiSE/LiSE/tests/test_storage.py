@@ -0,0 +1,127 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+import pytest
+
+from LiSE import Engine
+from LiSE.examples import kobold
+
+
+def run_kobold(prefix, connect_string):
+	eng = Engine(
+		prefix,
+		connect_string=connect_string,
+		random_seed=69105,
+		keyframe_on_close=False,
+	)
+	kobold.inittest(eng, shrubberies=8)
+	for _ in range(5):
+		eng.next_turn()
+	eng.snap_keyframe()
+	eng.flush()
+	return eng
+
+
+def dump_all(query):
+	return {
+		table: sorted(query.call_one(table + "_dump"), key=repr)
+		for table in query.tables
+	}
+
+
+def test_memory_matches_sqlite(tempdir):
+	sql_eng = run_kobold(tempdir, "sqlite:///:memory:")
+	mem_eng = run_kobold(tempdir, "memory://")
+	assert dump_all(mem_eng.query) == dump_all(sql_eng.query)
+	for load, args in [
+		("load_things", ("physical", "trunk", 2, 0)),
+		("load_node_val", ("physical", "trunk", 0, 0, 3, 0)),
+		("load_edges", ("physical", "trunk", 0, 0)),
+	]:
+		assert sorted(getattr(mem_eng.query, load)(*args), key=repr) == sorted(
+			getattr(sql_eng.query, load)(*args), key=repr
+		)
+	sql_eng.close()
+	mem_eng.close()
+
+
+def test_lmdb_reload(tempdir):
+	pytest.importorskip("lmdb")
+	connect_string = "lmdb://" + os.path.join(tempdir, "world.lmdb")
+	eng = run_kobold(tempdir, connect_string)
+	location = eng.character["physical"].thing["kobold"]["location"]
+	eng.close()
+	with Engine(tempdir, connect_string=connect_string) as eng:
+		assert eng.turn == 5
+		assert (
+			eng.character["physical"].thing["kobold"]["location"] == location
+		)
+
+
+def run_queries(prefix, connect_string):
+	eng = Engine(
+		prefix,
+		connect_string=connect_string,
+		random_seed=69105,
+		keyframe_on_close=False,
+	)
+	me = eng.new_character("me")
+	here = me.new_place("here")
+	there = me.new_place("there")
+	way = me.new_portal("here", "there")
+	it = here.new_thing("it")
+	for i in range(10):
+		me.stat["pop"] = i * 20
+		here["pop"] = 100 if i % 3 else 5
+		way["cost"] = i % 4
+		way["cost"] = 2
+		if i % 4 == 1:
+			it.location = there
+		elif i % 4 == 3:
+			it.location = here
+		eng.next_turn()
+	eng.branch = "other"
+	me.stat["pop"] = 500
+	eng.next_turn()
+	pop = me.historical("pop")
+	herepop = here.historical("pop")
+	cost = way.historical("cost")
+	loc = it.historical("location")
+	queries = [
+		pop > 100,
+		herepop <= pop,
+		cost == 2,
+		loc == "there",
+		(pop > 100) | (loc == "there"),
+	]
+	results = [
+		set(eng.turns_when(qry, mid_turn))
+		for qry in queries
+		for mid_turn in (False, True)
+	]
+	standing = eng.standing_query(loc == "there")
+	eng.next_turn()
+	it.location = there
+	eng.next_turn()
+	results.append(set(standing))
+	eng.close()
+	return results
+
+
+def test_memory_queries(tempdir):
+	expected = run_queries(tempdir, "sqlite:///:memory:")
+	assert expected[0] == set(range(6, 12))
+	assert run_queries(tempdir, "memory://") == expected
@@ -62,6 +62,37 @@ def test_future_contents(something):
 	assert something not in somewhere.contents()
 
 
+def test_contents_with_planned_travel(engy):
+	phys = engy.new_character("physical", data=nx.path_graph(4))
+	thing = phys.place[0].new_thing("thing")
+	other = phys.place[0].new_thing("other")
+	engy.next_turn()
+	thing.travel_to(3)
+	other.location = phys.place[2]
+
+	def contents(turn):
+		engy.turn = turn
+		return [set(phys.place[n].content) for n in range(4)]
+
+	assert contents(0) == [{"thing", "other"}, set(), set(), set()]
+	assert contents(1) == [{"thing"}, set(), {"other"}, set()]
+	assert contents(2) == [set(), {"thing"}, {"other"}, set()]
+	assert contents(3) == [set(), set(), {"thing", "other"}, set()]
+	assert contents(4) == [set(), set(), {"other"}, {"thing"}]
+	engy.turn = 1
+	# contradicts the plan, so the rest of the trip is forgotten
+	thing.location = phys.place[1]
+	assert contents(1) == [set(), {"thing"}, {"other"}, set()]
+	assert contents(4) == [set(), {"thing"}, {"other"}, set()]
+	engy.turn = 2
+	engy.branch = "other"
+	other.location = phys.place[3]
+	assert contents(2) == [set(), {"thing"}, set(), {"other"}]
+	assert contents(3) == [set(), {"thing"}, set(), {"other"}]
+	engy.branch = "trunk"
+	assert contents(2) == [set(), {"thing"}, {"other"}, set()]
+
+
 def test_travel(engy):
 	phys = engy.new_character("physical", data=nx.grid_2d_graph(8, 8))
 	del phys.place[1, 1]
@@ -87,3 +118,67 @@ def test_travel(engy):
 	assert thing1.next_location is None
 	assert thing2.location == phys.place[1, 7]
 	assert thing2.next_location is None
+
+
+def test_path_cache(engy):
+	phys = engy.new_character("physical", data=nx.grid_2d_graph(4, 4))
+	place = phys.place[0, 0]
+	paths = phys._paths
+	assert place.shortest_path_length((3, 3)) == 6
+	version = paths.version()
+	(snap,) = [snap for (_, snap, _) in paths._weights.values()]
+	assert place.shortest_path((0, 3)) == [(0, 0), (0, 1), (0, 2), (0, 3)]
+	assert paths.version() == version
+	assert [snap for (_, snap, _) in paths._weights.values()] == [snap]
+	engy.next_turn()
+	# nothing's changed, so the cached paths are still good
+	assert paths.version() == version
+	phys.add_portal((0, 0), (3, 3))
+	assert paths.version() != version
+	assert place.shortest_path_length((3, 3)) == 1
+	phys.portal[0, 0][3, 3]["weight"] = 10
+	assert place.shortest_path_length((3, 3)) == 1
+	assert place.shortest_path_length((3, 3), "weight") == 6
+	phys.portal[0, 0][3, 3]["weight"] = 2
+	assert place.shortest_path((3, 3), "weight") == [(0, 0), (3, 3)]
+	engy.turn = 0
+	assert paths.version() == version
+	assert place.shortest_path_length((3, 3)) == 6
+	engy.turn = 1
+	del phys.place[1, 0]
+	del phys.place[0, 1]
+	assert place.shortest_path((0, 3), "weight") == [
+		(0, 0),
+		(3, 3),
+		(2, 3),
+		(1, 3),
+		(0, 3),
+	]
+	del phys.portal[0, 0][3, 3]
+	with pytest.raises(nx.NetworkXNoPath):
+		place.shortest_path((0, 3), "weight")
+	paths.maxsize = 2
+	for i in range(4):
+		phys.place[3, i].shortest_path((3, 3))
+	assert len(paths._weights[None][2]) == 2
+
+
+def test_path_weight_function(engy):
+	phys = engy.new_character("physical", data=nx.grid_2d_graph(4, 4))
+	place = phys.place[0, 0]
+	phys.portal[0, 0][1, 0]["terrain"] = "swamp"
+
+	def cost(orig, dest, stats):
+		return 10 if stats.get("terrain") == "swamp" else 1
+
+	assert place.shortest_path((1, 0), cost) == [
+		(0, 0),
+		(0, 1),
+		(1, 1),
+		(1, 0),
+	]
+	assert place.shortest_path_length((1, 0), cost) == 3
+	thing = place.new_thing("thing")
+	assert thing.travel_to((1, 0), cost) == 3
+	with pytest.raises(TypeError, match="non-numeric 'terrain'"):
+		place.shortest_path((1, 0), "terrain")
@@ -39,7 +39,18 @@ from contextlib import contextmanager
 from textwrap import dedent
 from time import monotonic
 from types import MethodType, FunctionType
-from typing import Mapping, Sequence, Iterable, Union, Callable, Dict, Hashable
+from threading import local
+from typing import (
+	Any,
+	Callable,
+	Dict,
+	Hashable,
+	Iterable,
+	List,
+	Mapping,
+	Sequence,
+	Union,
+)
 
 import msgpack
 import networkx as nx
@@ -60,6 +71,9 @@ class FinalRule:
 
 final_rule = FinalRule()
 
+PACKED_STR_CACHE_SIZE = 4096
+"""How many packed strings to remember before starting over"""
+
 
 class MsgpackExtensionType(Enum):
 	"""Type codes for packing special LiSE types into msgpack"""
@@ -100,6 +114,9 @@ class get_rando:
 		def remembering_rando_state(*args, **kwargs):
 			if instance._planning:
 				raise exc.PlanError("Don't use randomization in a plan")
+			reads = getattr(instance, "_trigger_reads", None)
+			if reads is not None:
+				reads.unrecordable()
 			ret = retfun(*args, **kwargs)
 			instance.universal["rando_state"] = instance._rando.getstate()
 			return ret
@@ -325,6 +342,28 @@ def sort_set(s):
 	return _sort_set_memo[s]
 
 
+def set_bit(bitmap: bytearray, i: int) -> None:
+	"""Set the ``i``-th bit of the bitmap, lengthening it if need be"""
+	byte = i >> 3
+	if byte >= len(bitmap):
+		bitmap.extend(bytes(byte + 1 - len(bitmap)))
+	bitmap[byte] |= 1 << (i & 7)
+
+
+def has_bit(bitmap: bytes, i: int) -> bool:
+	byte = i >> 3
+	return byte < len(bitmap) and bool(bitmap[byte] >> (i & 7) & 1)
+
+
+def iter_bits(bitmap: bytes):
+	"""Iterate over the indices of the bits that are set"""
+	for byte, b in enumerate(bitmap):
+		while b:
+			low = b & -b
+			yield (byte << 3) + low.bit_length() - 1
+			b ^= low
+
+
 def fake_submit(func, *args, **kwargs):
 	"""A replacement for `concurrent.futures.Executor.submit` that works in serial
 
@@ -364,11 +403,20 @@ class AbstractEngine(ABC):
 	char_cls: type
 
 	@cached_property
-	def pack(self):
+	def pack(self) -> Callable[[Any], bytes]:
+		return self._pack_funcs[0]
+
+	@cached_property
+	def pack_many(self) -> Callable[[Iterable], List[bytes]]:
+		"""Pack each of some objects, sharing one packer among them"""
+		return self._pack_funcs[1]
+
+	@cached_property
+	def _pack_funcs(self):
 		try:
 			from lise_ormsgpack import packb
 
-			return packb
+			return packb, lambda objs: list(map(packb, objs))
 		except ImportError:
 			pass
 		handlers = {
@@ -437,13 +485,60 @@ class AbstractEngine(ABC):
 				return dict(obj)
 			raise TypeError("Can't pack {}".format(typ))
 
-		packer = partial(
-			msgpack.packb,
-			default=pack_handler,
-			strict_types=True,
-			use_bin_type=True,
-		)
-		return packer
+		# Packers are quicker to reuse than to make, but can't be shared
+		# between threads, nor used by pack_handler while packing
+		thread_data = local()
+		# Names of characters, nodes, and stats get packed over and over
+		packed_strs = {}
+
+		def take_packer() -> msgpack.Packer:
+			try:
+				idle = thread_data.idle
+			except AttributeError:
+				idle = thread_data.idle = []
+			if idle:
+				return idle.pop()
+			return msgpack.Packer(
+				default=pack_handler, strict_types=True, use_bin_type=True
+			)
+
+		def pack_str(s: str, pakr: msgpack.Packer) -> bytes:
+			ret = packed_strs.get(s)
+			if ret is None:
+				if len(packed_strs) >= PACKED_STR_CACHE_SIZE:
+					packed_strs.clear()
+				ret = packed_strs[s] = pakr.pack(s)
+			return ret
+
+		def packer(obj) -> bytes:
+			if type(obj) is str:
+				ret = packed_strs.get(obj)
+				if ret is not None:
+					return ret
+			pakr = take_packer()
+			try:
+				if type(obj) is str:
+					return pack_str(obj, pakr)
+				return pakr.pack(obj)
+			finally:
+				thread_data.idle.append(pakr)
+
+		def pack_many(objs: Iterable) -> List[bytes]:
+			pakr = take_packer()
+			ret = []
+			append = ret.append
+			try:
+				for obj in objs:
+					if type(obj) is str:
+						packed = packed_strs.get(obj)
+						append(packed or pack_str(obj, pakr))
+					else:
+						append(pakr.pack(obj))
+			finally:
+				thread_data.idle.append(pakr)
+			return ret
+
+		return packer, pack_many
 
 	@cached_property
 	def unpack(self):
@@ -0,0 +1,395 @@
+# This file is part of LiSE, a framework for life simulation games.
+# Copyright (c) Zachary Spector, public@zacharyspector.com
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Evaluate trigger functions in worker processes
+
+Used when the engine is started with ``parallel_triggers="process"``.
+Each worker keeps its own in-memory copy of the world, which the main
+process brings up to date with a snapshot, or a delta, before asking
+it to check triggers. Workers only ever see the present; triggers that
+look at history, or use the engine's random number generator, won't
+get the same results there that they would in the main process.
+
+"""
+
+import os
+import sys
+from multiprocessing import get_context
+from types import ModuleType
+from typing import List, Tuple
+
+from .node import Node
+from .portal import Portal
+
+CHARACTER_RULEBOOK_KEYS = {
+	"character_rulebook",
+	"unit_rulebook",
+	"character_thing_rulebook",
+	"character_place_rulebook",
+	"character_portal_rulebook",
+}
+FUNCTION_STORE_NAMES = ("trigger", "function", "method")
+
+
+def _make_engine(prefix, kwargs):
+	from .engine import Engine
+
+	for store in FUNCTION_STORE_NAMES:
+		modname = kwargs.get(store)
+		if isinstance(modname, str) and modname.endswith(".py"):
+			modname = os.path.basename(modname)[:-3]
+		if isinstance(modname, str) and modname in sys.modules:
+			# make sure we get the code as it is on disk now
+			del sys.modules[modname]
+	kwargs = kwargs.copy()
+	for store in FUNCTION_STORE_NAMES:
+		if store not in kwargs:
+			continue
+		if kwargs[store].endswith(".py"):
+			from .xcollections import FunctionStore
+
+			kwargs[store] = FunctionStore(kwargs[store])
+		else:
+			from importlib import import_module
+
+			kwargs[store] = import_module(kwargs[store])
+	return Engine(
+		prefix,
+		connect_string="sqlite:///:memory:",
+		keyframe_interval=None,
+		keyframe_on_close=False,
+		enforce_end_of_time=False,
+		parallel_triggers=False,
+		**kwargs,
+	)
+
+
+def _skip_to_turn(engine, turn: int) -> None:
+	# Workers don't need the turns in between, so don't insist on them
+	end_plan = engine._branch_end_plan
+	end_plan[engine.branch] = max((end_plan[engine.branch], turn - 1))
+	engine.turn = turn
+
+
+def _set_stats(mapping, stats: dict) -> None:
+	for k, v in stats.items():
+		if v is None:
+			if k in mapping:
+				del mapping[k]
+		else:
+			mapping[k] = v
+
+
+def apply_delta(engine, delta: dict) -> None:
+	"""Make the world in ``engine`` look like ``delta`` says
+
+	``delta`` is in the format of :meth:`LiSE.Engine.get_delta`. Changes
+	to rules and rulebooks are ignored.
+
+	"""
+	delta = delta.copy()
+	delta.pop("rulebooks", None)
+	delta.pop("rules", None)
+	delta.pop("eternal", None)
+	_set_stats(engine.universal, delta.pop("universal", {}))
+	characters = engine.character
+	units = {}
+	for charn, chardelta in delta.items():
+		if chardelta is None:
+			if charn in characters:
+				del characters[charn]
+			continue
+		if charn not in characters:
+			engine.add_character(charn)
+		char = characters[charn]
+		chardelta = chardelta.copy()
+		chardelta.pop("name", None)
+		for key in CHARACTER_RULEBOOK_KEYS:
+			chardelta.pop(key, None)
+		if "units" in chardelta:
+			units[charn] = chardelta.pop("units")
+		for node, ex in chardelta.pop("nodes", {}).items():
+			if ex:
+				if node not in char.node:
+					char.add_place(node)
+			elif node in char.node:
+				char.remove_node(node)
+		for (orig, dest), ex in chardelta.pop("edges", {}).items():
+			if ex:
+				if not char.has_edge(orig, dest):
+					char.add_portal(orig, dest)
+			elif char.has_edge(orig, dest):
+				char.remove_edge(orig, dest)
+		for node, stats in chardelta.pop("node_val", {}).items():
+			if node not in char.node:
+				continue
+			stats = stats.copy()
+			stats.pop("rulebook", None)
+			stats.pop("name", None)
+			if "location" in stats:
+				engine._set_thing_loc(charn, node, stats.pop("location"))
+				# it may have turned from a thing to a place or back
+				engine._node_objs.pop((charn, node), None)
+			_set_stats(char.node[node], stats)
+		for orig, dests in chardelta.pop("edge_val", {}).items():
+			for dest, stats in dests.items():
+				if not char.has_edge(orig, dest):
+					continue
+				stats = stats.copy()
+				for key in ("rulebook", "origin", "destination", "character"):
+					stats.pop(key, None)
+				_set_stats(char.portal[orig][dest], stats)
+		_set_stats(char.stat, chardelta)
+	for charn, graphs in units.items():
+		char = characters[charn]
+		for graph, nodes in graphs.items():
+			for node, isunit in nodes.items():
+				if isunit:
+					char.add_unit(graph, node)
+				elif graph in char.unit and node in char.unit[graph]:
+					char.remove_unit(graph, node)
+
+
+def snapshot(engine) -> dict:
+	"""Describe the whole world as it is now, in the format of a delta
+
+	This doesn't snap a keyframe, so it's safe to call while the rules
+	engine is running.
+
+	"""
+	delta = {"universal": dict(engine.universal)}
+	for charn, char in engine.character.items():
+		chardelta = delta[charn] = dict(char.stat)
+		chardelta["nodes"] = dict.fromkeys(char.node, True)
+		chardelta["node_val"] = {
+			noden: dict(node) for (noden, node) in char.node.items()
+		}
+		edges = chardelta["edges"] = {}
+		edge_val = chardelta["edge_val"] = {}
+		for orig, dests in char.portal.items():
+			for dest, portal in dests.items():
+				edges[orig, dest] = True
+				edge_val.setdefault(orig, {})[dest] = dict(portal)
+		chardelta["units"] = {
+			graph: dict.fromkeys(nodes, True)
+			for (graph, nodes) in char.unit.items()
+		}
+	return delta
+
+
+def get_entity(engine, spec: tuple):
+	"""Get the entity identified by a tuple from :func:`entity_spec`"""
+	kind, charn, *rest = spec
+	char = engine.character[charn]
+	if kind == "character":
+		return char
+	elif kind == "node":
+		return char.node[rest[0]]
+	else:
+		orig, dest = rest
+		return char.portal[orig][dest]
+
+
+def entity_spec(entity) -> tuple:
+	"""Identify an entity in a way that a worker can look up"""
+	if isinstance(entity, Portal):
+		return (
+			"portal",
+			entity.character.name,
+			entity.origin.name,
+			entity.destination.name,
+		)
+	elif isinstance(entity, Node):
+		return "node", entity.character.name, entity.name
+	else:
+		return "character", entity.name
+
+
+def check_triggers(engine, jobs: List[Tuple[tuple, List[str]]]) -> List[bool]:
+	"""Return whether any of the named triggers fire on each entity"""
+	trigger = engine.trigger
+	ret = []
+	for spec, trigger_names in jobs:
+		entity = get_entity(engine, spec)
+		for name in trigger_names:
+			if getattr(trigger, name)(entity):
+				ret.append(True)
+				break
+		else:
+			ret.append(False)
+	return ret
+
+
+def worker(prefix, kwargs, conn):
+	"""Loop to handle one command at a time and pipe results back"""
+	engine = _make_engine(prefix, kwargs)
+	fresh = True
+	while True:
+		inst = conn.recv_bytes()
+		if inst == b"shutdown":
+			engine.query.close()
+			conn.close()
+			return 0
+		cmd, turn, payload = engine.unpack(inst)
+		try:
+			if cmd == "reset":
+				if not fresh:
+					engine.query.close()
+					engine = _make_engine(prefix, kwargs)
+				fresh = False
+				_skip_to_turn(engine, turn)
+				apply_delta(engine, engine.unpack(payload))
+				resp = True
+			elif cmd == "sync":
+				fresh = False
+				_skip_to_turn(engine, turn)
+				apply_delta(engine, engine.unpack(payload))
+				resp = True
+			elif cmd == "check":
+				resp = check_triggers(engine, engine.unpack(payload))
+			else:
+				raise ValueError(f"Unknown command: {cmd}")
+		except Exception as ex:
+			resp = ex
+		conn.send_bytes(engine.pack(resp))
+
+
+class TriggerProcessPool:
+	"""Worker processes that check triggers on copies of an engine's world
+
+	Workers get started the first time they're needed, and
+	restarted from scratch when the trigger, function, or method
+	stores change.
+
+	"""
+
+	def __init__(self, engine, processes: int = None):
+		self.engine = engine
+		self.processes = processes or os.cpu_count() or 1
+		self._conns = []
+		self._procs = []
+		self._synced = None
+		self._stale = False
+		for store in FUNCTION_STORE_NAMES:
+			funcstore = getattr(engine, store)
+			if hasattr(funcstore, "connect"):
+				funcstore.connect(self._mark_stale, weak=False)
+
+	def _mark_stale(self, *args, **kwargs):
+		self._stale = True
+
+	def _worker_kwargs(self) -> dict:
+		kwargs = {}
+		for store in FUNCTION_STORE_NAMES:
+			funcstore = getattr(self.engine, store)
+			if isinstance(funcstore, ModuleType):
+				kwargs[store] = funcstore.__name__
+			else:
+				if funcstore._need_save:
+					funcstore.save()
+				kwargs[store] = funcstore._filename
+		return kwargs
+
+	def _start(self) -> None:
+		ctx = get_context("spawn")
+		kwargs = self._worker_kwargs()
+		for i in range(self.processes):
+			parent_conn, child_conn = ctx.Pipe()
+			proc = ctx.Process(
+				name=f"LiSE trigger worker {i}",
+				target=worker,
+				args=(
+					self.engine._prefix,
+					kwargs,
+					child_conn,
+				),
+				daemon=True,
+			)
+			proc.start()
+			self._conns.append(parent_conn)
+			self._procs.append(proc)
+
+	def _broadcast(self, msg) -> list:
+		pack = self.engine.pack
+		for conn in self._conns:
+			conn.send_bytes(pack(msg))
+		return [self._receive(conn) for conn in self._conns]
+
+	def _receive(self, conn):
+		resp = self.engine.unpack(conn.recv_bytes())
+		if isinstance(resp, Exception):
+			raise resp
+		return resp
+
+	def _sync(self) -> None:
+		engine = self.engine
+		branch, turn, tick = now = engine._btt()
+		if self._stale:
+			self.shutdown()
+			self._stale = False
+		if not self._procs:
+			self._start()
+		elif self._synced == now:
+			return
+		pack = engine.pack
+		if (
+			self._synced is None
+			or self._synced[0] != branch
+			or self._synced[1:] > (turn, tick)
+		):
+			delta = snapshot(engine)
+			self._broadcast(("reset", turn, pack(delta)))
+		else:
+			_, turn_from, tick_from = self._synced
+			delta = engine.get_delta(branch, turn_from, tick_from, turn, tick)
+			self._broadcast(("sync", turn, pack(delta)))
+		self._synced = now
+
+	def check_triggers(self, jobs: list) -> List[bool]:
+		"""Return whether each ``(rule, entity)`` pair's triggers fire
+
+		Jobs get divided evenly among the workers.
+
+		"""
+		if not jobs:
+			return []
+		self._sync()
+		pack = self.engine.pack
+		specs = [
+			(entity_spec(entity), [trig.__name__ for trig in rule.triggers])
+			for (rule, entity) in jobs
+		]
+		n = len(self._conns)
+		used = []
+		for i, conn in enumerate(self._conns):
+			chunk = specs[i::n]
+			if not chunk:
+				break
+			conn.send_bytes(pack(("check", None, pack(chunk))))
+			used.append(conn)
+		ret = [None] * len(specs)
+		for i, conn in enumerate(used):
+			ret[i::n] = self._receive(conn)
+		return ret
+
+	def shutdown(self) -> None:
+		for conn in self._conns:
+			conn.send_bytes(b"shutdown")
+		for proc in self._procs:
+			proc.join()
+		for conn in self._conns:
+			conn.close()
+		self._conns = []
+		self._procs = []
+		self._synced = None
@@ -302,15 +302,24 @@ class UniversalMapping(MutableMapping, Signal):
 		self.engine = engine
 
 	def __iter__(self):
+		self._unrecordable()
 		return self.engine._universal_cache.iter_keys(*self.engine._btt())
 
 	def __len__(self):
+		self._unrecordable()
 		return self.engine._universal_cache.count_keys(*self.engine._btt())
 
 	def __getitem__(self, k):
 		"""Get the current value of this key"""
+		self._unrecordable()
 		return self.engine._universal_cache.retrieve(k, *self.engine._btt())
 
+	def _unrecordable(self):
+		# triggers reading universal variables can't be skipped
+		reads = self.engine._trigger_reads
+		if reads is not None:
+			reads.unrecordable()
+
 	def __setitem__(self, k, v):
 		"""Set k=v at the current branch and tick"""
 		branch, turn, tick = self.engine._nbtt()
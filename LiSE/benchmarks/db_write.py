@@ -0,0 +1,56 @@
+"""Measure how fast node stats get written to an SQLite database
+
+Run with ``python benchmarks/db_write.py``. Writes a million node_val
+rows through the query engine, flushing every so often, like the
+engine does while simulating, and then commits. It does this once
+with the default SQLite pragmas and once without any.
+
+"""
+import os
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+from LiSE.allegedb.query import ConnectionHolder, QueryEngine
+
+
+class PlainConnectionHolder(ConnectionHolder):
+	sqlite_pragmas = {}
+
+
+class PlainQueryEngine(QueryEngine):
+	holder_cls = PlainConnectionHolder
+
+
+def write(qe: QueryEngine, rows: int, nodes: int, flush_every: int):
+	node_val_set = qe.node_val_set
+	for i in range(rows):
+		turn, tick = divmod(i, nodes)
+		node_val_set("g", tick, "stat", "trunk", turn, tick, i)
+		if i % flush_every == 0:
+			qe.flush()
+	qe.commit()
+
+
+def main(rows: int, nodes: int, flush_every: int):
+	for qe_cls in (QueryEngine, PlainQueryEngine):
+		with TemporaryDirectory() as tmp:
+			qe = qe_cls("sqlite:///" + os.path.join(tmp, "world.db"), {})
+			qe.initdb()
+			start = monotonic()
+			write(qe, rows, nodes, flush_every)
+			qe.close()
+			elapsed = monotonic() - start
+			label = ("default pragmas"
+						if qe_cls.holder_cls.sqlite_pragmas else "no pragmas")
+			print(f"{label}: {rows:,} rows in {elapsed:.2f}s, "
+					f"{rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--rows", type=int, default=1_000_000)
+	parser.add_argument("--nodes", type=int, default=1000)
+	parser.add_argument("--flush-every", type=int, default=1000)
+	args = parser.parse_args()
+	main(args.rows, args.nodes, args.flush_every)
@@ -0,0 +1,47 @@
+"""Measure node stat history's memory with and without ``columnar_history``
+
+Run with ``python benchmarks/history_memory.py``. Every node gets a new value
+for every stat on every turn, stored straight into the node_val cache,
+and ``tracemalloc`` measures how much memory that took.
+
+"""
+import tracemalloc
+from argparse import ArgumentParser
+
+from LiSE.allegedb import ORM
+
+
+def fill(orm: ORM, nodes: int, stats: int, turns: int):
+	store = orm._node_val_cache.store
+	for turn in range(turns):
+		for node in range(nodes):
+			for stat in range(stats):
+				store("g",
+						node,
+						stat,
+						"trunk",
+						turn,
+						0,
+						turn * stat,
+						loading=True)
+
+
+def main(nodes: int, stats: int, turns: int):
+	for columnar in (False, True):
+		with ORM("sqlite:///:memory:", columnar_history=columnar) as orm:
+			orm._no_kc = True
+			tracemalloc.start()
+			fill(orm, nodes, stats, turns)
+			used, _ = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			print(f"columnar_history={columnar}: {used / 2**20:,.1f} MiB for "
+					f"{nodes} nodes, {stats} stats, {turns} turns")
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--nodes", type=int, default=1000)
+	parser.add_argument("--stats", type=int, default=12)
+	parser.add_argument("--turns", type=int, default=20)
+	args = parser.parse_args()
+	main(args.nodes, args.stats, args.turns)
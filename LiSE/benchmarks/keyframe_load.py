@@ -0,0 +1,54 @@
+"""Time loading a keyframe with lots of node stats, and then using some
+
+Run with ``python benchmarks/keyframe_load.py``. Node stats in
+keyframes are only unpacked when something reads them, so fetching a
+keyframe should take about as long no matter how many stats there are.
+
+"""
+import os
+from argparse import ArgumentParser
+from functools import partial
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+import networkx as nx
+from msgpack import packb, unpackb
+
+from LiSE.allegedb import ORM
+
+
+class MsgpackORM(ORM):
+	pack = staticmethod(packb)
+	unpack = staticmethod(partial(unpackb, strict_map_key=False))
+
+
+def main(nodes: int, stats: int):
+	with TemporaryDirectory() as tmp:
+		dbstring = "sqlite:///" + os.path.join(tmp, "world.db")
+		with MsgpackORM(dbstring) as orm:
+			g = orm.new_digraph("g", nx.empty_graph(nodes))
+			for node in range(nodes):
+				g.node[node].update({f"stat{i}": i for i in range(stats)})
+			orm.snap_keyframe()
+			branch, turn, tick = orm._btt()
+		orm = MsgpackORM(dbstring)
+		start = monotonic()
+		orm.query.get_keyframe("g", branch, turn, tick)
+		print(f"fetched a keyframe of {nodes:,} nodes with {stats} stats "
+				f"each in {monotonic() - start:.3f}s")
+		start = monotonic()
+		assert orm.graph["g"].node[0]["stat0"] == 0
+		print(f"read one node in {monotonic() - start:.4f}s")
+		start = monotonic()
+		for node in orm.graph["g"].node.values():
+			dict(node)
+		print(f"read every node in {monotonic() - start:.2f}s")
+		orm.close()
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--nodes", type=int, default=10000)
+	parser.add_argument("--stats", type=int, default=20)
+	args = parser.parse_args()
+	main(args.nodes, args.stats)
@@ -0,0 +1,46 @@
+"""Compare how fast each storage backend loads a window of node stats
+
+Run with ``python benchmarks/load.py``. Fills one graph with node_val
+rows for many turns, then times loading every turn back, through SQLite
+and through the in-memory key-value store.
+
+"""
+import os
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+from msgpack import packb, unpackb
+
+from LiSE.allegedb.query import QueryEngine
+
+
+def fill(qe: QueryEngine, nodes: int, turns: int):
+	for turn in range(turns):
+		for node in range(nodes):
+			qe.node_val_set("g", node, "stat", "trunk", turn, node, turn)
+		qe.flush()
+	qe.commit()
+
+
+def main(nodes: int, turns: int):
+	with TemporaryDirectory() as tmp:
+		for dbstring in ("sqlite:///" + os.path.join(tmp, "world.db"),
+							"memory://"):
+			qe = QueryEngine(dbstring, {}, packb, unpackb)
+			qe.initdb()
+			fill(qe, nodes, turns)
+			start = monotonic()
+			n = sum(1 for _ in qe.load_node_val("g", "trunk", 0, 0))
+			elapsed = monotonic() - start
+			print(f"{dbstring.split(':')[0]}: loaded {n:,} rows "
+					f"in {elapsed:.2f}s")
+			qe.close()
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--nodes", type=int, default=1000)
+	parser.add_argument("--turns", type=int, default=100)
+	args = parser.parse_args()
+	main(args.nodes, args.turns)
@@ -0,0 +1,68 @@
+"""Time packing the delta of a wolfsheep world, as sent to the proxy
+
+Run with ``python benchmarks/pack_delta.py``. Sets up the wolfsheep
+example, runs it for a few turns, and describes the whole world in a
+delta, then packs that the way ``EngineHandle`` does, many times over.
+Then it packs the delta's keys and values on their own, one at a time
+and with ``pack_many``.
+
+"""
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+from LiSE.examples import wolfsheep
+from LiSE.handle import EngineHandle
+from LiSE.util import kf2delta
+
+
+def flatten(delta, into: list):
+	for k, v in delta.items():
+		into.append(k)
+		if isinstance(v, dict):
+			flatten(v, into)
+		else:
+			into.append(v)
+	return into
+
+
+def main(size: int, turns: int, reps: int):
+	with TemporaryDirectory() as tmp:
+		hand = EngineHandle((tmp, ), {
+			"connect_string": "sqlite:///:memory:",
+			"random_seed": 69105
+		})
+		eng = hand._real
+		with eng.advancing():
+			wolfsheep.install(eng, map_size=(size, size), seed=69105)
+		for _ in range(turns):
+			eng.next_turn()
+		eng.snap_keyframe()
+		delta = kf2delta(eng._get_kf(*eng._btt()))
+		start = monotonic()
+		for _ in range(reps):
+			hand._pack_delta(delta)
+		print(f"packed a {size}x{size} wolfsheep world {reps} times "
+				f"in {monotonic() - start:.3f}s")
+		flat = flatten(delta, [])
+		pack = eng.pack
+		start = monotonic()
+		for _ in range(reps):
+			[pack(obj) for obj in flat]
+		print(f"{len(flat):,} keys and values one at a time: "
+				f"{monotonic() - start:.3f}s")
+		start = monotonic()
+		for _ in range(reps):
+			eng.pack_many(flat)
+		print(f"{len(flat):,} keys and values with pack_many: "
+				f"{monotonic() - start:.3f}s")
+		hand.close()
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--size", type=int, default=25)
+	parser.add_argument("--turns", type=int, default=10)
+	parser.add_argument("--reps", type=int, default=100)
+	args = parser.parse_args()
+	main(args.size, args.turns, args.reps)
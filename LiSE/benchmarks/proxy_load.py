@@ -0,0 +1,42 @@
+"""Time getting big results from the core into an ``EngineProxy``
+
+Run with ``python benchmarks/proxy_load.py``. Puts a list of
+``--size`` random floats in the universal variables, then fetches a
+copy of them ``--reps`` times through each way an ``EngineProxy`` can
+talk to its core: the pipe, compressed; the pipe, uncompressed; and
+the pipe with shared memory for big messages.
+
+"""
+from argparse import ArgumentParser
+from random import Random
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+from LiSE.proxy import EngineProcessManager
+
+
+def main(size: int, reps: int):
+	rando = Random(69105)
+	big = [rando.random() for _ in range(size)]
+	with TemporaryDirectory() as tmp:
+		for label, kwargs in [
+			("compressed pipe", {}),
+			("uncompressed pipe", {"compress_threshold": float("inf")}),
+			("shared memory", {"shared_memory": True}),
+		]:
+			manager = EngineProcessManager()
+			proxy = manager.start(tmp, loglevel="warning", **kwargs)
+			proxy.universal["big"] = big
+			start = monotonic()
+			for _ in range(reps):
+				proxy.handle("universal_copy")
+			print(f"{label}: {reps} copies in {monotonic() - start:.3f}s")
+			manager.shutdown()
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--size", type=int, default=500000)
+	parser.add_argument("--reps", type=int, default=10)
+	args = parser.parse_args()
+	main(args.size, args.reps)
@@ -0,0 +1,79 @@
+"""Compare pathfinding on a live character and on a snapshot
+
+Run with ``python benchmarks/travel_to.py``. Makes a ``--size`` by
+``--size`` grid of places, connected eight ways, with a random weight
+on each portal. Then sends ``--things`` things to random places with
+``Thing.travel_to``, finding paths on the character itself, then on a
+snapshot of it, then with the character's path cache; and finds the
+least weighted paths for the same trips, without travelling them.
+
+"""
+from argparse import ArgumentParser
+from random import Random
+from tempfile import TemporaryDirectory
+from time import monotonic
+
+import networkx as nx
+
+from LiSE import Engine
+from LiSE.character import grid_2d_8graph
+
+
+def main(size: int, things: int):
+	rando = Random(69105)
+	with TemporaryDirectory() as tmp, Engine(
+		tmp,
+		connect_string="sqlite:///:memory:",
+		enforce_end_of_time=False,
+	) as eng:
+		grid = grid_2d_8graph(size, size)
+		for u, v in grid.edges:
+			grid.edges[u, v]["weight"] = rando.randint(1, 5)
+		phys = eng.new_character("physical", grid)
+		places = list(grid.nodes)
+		trips = [
+			(rando.choice(places), rando.choice(places)) for _ in range(things)
+		]
+		start = monotonic()
+		snap = phys.snapshot("weight")
+		print(f"snapshot of {size}x{size} grid: {monotonic() - start:.3f}s")
+		for label, graph in [
+			("character", phys),
+			("snapshot", snap),
+			("path cache", None),
+		]:
+			start = monotonic()
+			turns = 0
+			for i, (orig, dest) in enumerate(trips):
+				if orig == dest:
+					continue
+				thing = phys.place[orig].new_thing((label, i))
+				turns += thing.travel_to(dest, graph=graph)
+			print(
+				f"travel_to on {label}: {things} trips, {turns} turns, "
+				f"in {monotonic() - start:.3f}s"
+			)
+		start = monotonic()
+		for orig, dest in trips:
+			nx.shortest_path(phys, orig, dest, "weight")
+		print(f"weighted paths on character: {monotonic() - start:.3f}s")
+		start = monotonic()
+		for orig, dest in trips:
+			snap.shortest_path(orig, dest, "weight")
+		print(f"weighted paths on snapshot: {monotonic() - start:.3f}s")
+		for attempt in ("first", "second"):
+			start = monotonic()
+			for orig, dest in trips:
+				phys.place[orig].shortest_path(dest, "weight")
+			print(
+				f"weighted paths with path cache, {attempt} time: "
+				f"{monotonic() - start:.3f}s"
+			)
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--size", type=int, default=100)
+	parser.add_argument("--things", type=int, default=10)
+	args = parser.parse_args()
+	main(args.size, args.things)
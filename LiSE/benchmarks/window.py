@@ -0,0 +1,37 @@
+"""Compare WindowDict and BisectWindowDict lookups
+
+Run with ``python benchmarks/window.py``. Each dict gets one value per turn
+for ``--turns`` turns, then gets read in sequence, and in random order.
+
+"""
+import random
+from argparse import ArgumentParser
+from timeit import timeit
+
+from LiSE.allegedb.window import WindowDict, BisectWindowDict
+
+
+def read_all(wd, revs):
+	for rev in revs:
+		wd[rev]
+
+
+def main(turns: int, reads: int, number: int):
+	data = [(turn, turn) for turn in range(turns)]
+	seq = [i % turns for i in range(reads)]
+	rand = [random.randrange(turns) for _ in range(reads)]
+	for cls in (WindowDict, BisectWindowDict):
+		wd = cls(data)
+		for name, revs in (("sequential", seq), ("random", rand)):
+			t = timeit(lambda: read_all(wd, revs), number=number)
+			print(f"{cls.__name__:>16} {name:>10}: {t / number:.4f}s "
+					f"for {reads} reads of {turns} turns")
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description=__doc__)
+	parser.add_argument("--turns", type=int, default=10_000)
+	parser.add_argument("--reads", type=int, default=10_000)
+	parser.add_argument("--number", type=int, default=3)
+	args = parser.parse_args()
+	main(args.turns, args.reads, args.number)